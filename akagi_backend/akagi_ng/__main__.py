@@ -1,9 +1,20 @@
+import multiprocessing
 import sys
 
-from akagi_ng.application import AkagiApp
-
 
 def main() -> int:
+    # 打包后的可执行文件中，spawn 出的子进程（多进程 DataServer、分析进程池）会重新执行入口；
+    # freeze_support 使其直接运行子进程任务，而不是再启动一遍整个应用
+    multiprocessing.freeze_support()
+
+    # Headless 模式不导入 DataServer / MITM 相关模块
+    if "--headless" in sys.argv[1:]:
+        from akagi_ng.headless import main as headless_main
+
+        return headless_main([arg for arg in sys.argv[1:] if arg != "--headless"])
+
+    from akagi_ng.application import AkagiApp
+
     app = AkagiApp()
     app.initialize()
     app.start()
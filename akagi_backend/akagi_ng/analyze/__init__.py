@@ -0,0 +1,23 @@
+"""批量牌谱分析。
+
+将一批 MJAI 牌谱（或经 Bridge 转换的录制文件）分片到多个工作进程，每个进程只加载一份
+MortalModelResource，并把同时推进的多局对局的决策合并为大批量 react_batch 推理，
+输出逐决策的 q 值与模型/实际动作一致率。
+"""
+
+from akagi_ng.analyze.batching import BatchingEngine
+from akagi_ng.analyze.decisions import AgreementStats, DecisionColumns, action_label, actual_action
+from akagi_ng.analyze.worker import AnalyzeOptions, GameAnalyzer, analyze_logs, discover_logs, load_game
+
+__all__ = [
+    "AgreementStats",
+    "AnalyzeOptions",
+    "BatchingEngine",
+    "DecisionColumns",
+    "GameAnalyzer",
+    "action_label",
+    "actual_action",
+    "analyze_logs",
+    "discover_logs",
+    "load_game",
+]
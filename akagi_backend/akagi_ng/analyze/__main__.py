@@ -0,0 +1,54 @@
+"""批量牌谱分析命令行入口。
+
+用法::
+
+    python -m akagi_ng.analyze logs/ -o results --jobs 4
+    python -m akagi_ng.analyze game.jsonl -o results --seats 0
+
+输出目录包含 decisions_NNNN.npz（列：game/seat/event/chosen/actual/agree/mask_bits/q_values，
+动作下标与模型动作空间一致）与 summary.json（对局列表与一致率统计）。
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from akagi_ng.analyze.worker import AnalyzeOptions, analyze_logs
+from akagi_ng.core.logging import configure_logging
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m akagi_ng.analyze", description="Batch game-log analyzer")
+    parser.add_argument("inputs", nargs="+", type=Path, help="MJAI logs, capture files or directories")
+    parser.add_argument("-o", "--output-dir", type=Path, required=True)
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes")
+    parser.add_argument("--games-per-shard", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=64, help="games in flight per worker")
+    parser.add_argument("--max-batch", type=int, default=256, help="max rows per react_batch call")
+    parser.add_argument("--seats", type=int, nargs="+", help="seats to analyze (default: all)")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_level, console=False)
+    options = AnalyzeOptions(
+        output_dir=args.output_dir,
+        jobs=args.jobs,
+        games_per_shard=args.games_per_shard,
+        concurrency=args.concurrency,
+        max_batch=args.max_batch,
+        seats=tuple(args.seats) if args.seats else None,
+        log_level=args.log_level,
+    )
+    summary = analyze_logs(args.inputs, options)
+
+    agreement = summary["agreement"]
+    print(f"games: {len(summary['games'])}, decisions: {agreement['decisions']}, agreement: {agreement['rate']:.2%}")
+    for kind, stats in agreement["by_kind"].items():
+        print(f"  {kind:<10} {stats['decisions']:>8} {stats['rate']:.2%}")
+    if summary["failed"]:
+        print(f"failed: {len(summary['failed'])} (see summary.json)", file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""跨对局合批推理引擎。"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Self
+
+import numpy as np
+
+from akagi_ng.mjai_bot.engine.base import BaseEngine
+from akagi_ng.mjai_bot.status import BotStatusContext
+
+type BatchResult = tuple[list[int], list[list[float]], list[list[bool]], list[bool]]
+
+
+@dataclass
+class _BatchRequest:
+    obs: np.ndarray
+    masks: np.ndarray
+    invisible_obs: np.ndarray | None
+    taken: bool = False
+    done: bool = False
+    result: BatchResult | None = None
+    error: BaseException | None = None
+    rows: int = field(init=False)
+
+    def __post_init__(self):
+        self.rows = len(self.obs)
+
+
+class BatchingEngine(BaseEngine):
+    """将多个线程上的 Bot 发起的推理请求合并为一次大批量 react_batch。
+
+    libriichi 的 Bot 在 react() 内同步回调引擎，单局每次只产生 1 行观测。
+    分析器为每局对局开一个线程，各线程通过 client() 登记；当所有登记线程都在等待推理、
+    累计行数达到 max_batch 或最早的请求等待超过 max_wait 时，由触发的线程代表全部
+    请求执行一次推理并分发结果，不需要额外的调度线程。
+    """
+
+    def __init__(self, engine: BaseEngine, max_batch: int = 256, max_wait: float = 0.05):
+        super().__init__(
+            status=engine.status,
+            is_3p=engine.is_3p,
+            version=engine.version,
+            name=f"Batching({engine.name})",
+            is_oracle=engine.is_oracle,
+        )
+        self.engine = engine
+        self.engine_type = engine.engine_type
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._pending: list[_BatchRequest] = []
+        self._pending_rows = 0
+        self._clients = 0
+
+        # 统计信息
+        self.batches = 0
+        self.rows = 0
+
+    def fork(self, status: BotStatusContext | None = None) -> Self:
+        """合批引擎在工作进程内共享，不创建副本。"""
+        return self
+
+    @contextmanager
+    def client(self) -> Iterator[None]:
+        """登记一个会调用 react_batch 的工作线程，用于判断何时所有线程都已在等待。"""
+        with self._cond:
+            self._clients += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._clients -= 1
+                self._cond.notify_all()
+
+    def _ready(self) -> bool:
+        return self._pending_rows >= self.max_batch or len(self._pending) >= self._clients
+
+    def _take(self) -> list[_BatchRequest]:
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        for request in batch:
+            request.taken = True
+        return batch
+
+    def react_batch(
+        self,
+        obs: np.ndarray,
+        masks: np.ndarray,
+        invisible_obs: np.ndarray | None = None,
+    ) -> BatchResult:
+        request = _BatchRequest(np.asanyarray(obs), np.asanyarray(masks), invisible_obs)
+        deadline = time.monotonic() + self.max_wait
+
+        with self._cond:
+            self._pending.append(request)
+            self._pending_rows += request.rows
+            self._cond.notify_all()
+            while not request.taken:
+                remaining = deadline - time.monotonic()
+                if self._ready() or remaining <= 0:
+                    batch = self._take()
+                    break
+                self._cond.wait(remaining)
+            else:
+                batch = None
+                while not request.done:
+                    self._cond.wait()
+
+        if batch is not None:
+            self._run(batch)
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run(self, batch: list[_BatchRequest]):
+        try:
+            obs = np.concatenate([r.obs for r in batch])
+            masks = np.concatenate([r.masks for r in batch])
+            invisible = None
+            if all(r.invisible_obs is not None for r in batch):
+                invisible = np.concatenate([np.asanyarray(r.invisible_obs) for r in batch])
+            actions, q_out, clean_masks, is_greedy = self.engine.react_batch(obs, masks, invisible)
+
+            start = 0
+            for request in batch:
+                end = start + request.rows
+                request.result = (actions[start:end], q_out[start:end], clean_masks[start:end], is_greedy[start:end])
+                start = end
+        except Exception as e:
+            for request in batch:
+                request.error = e
+
+        with self._cond:
+            self.batches += 1
+            self.rows += sum(r.rows for r in batch)
+            for request in batch:
+                request.done = True
+            self._cond.notify_all()
@@ -0,0 +1,180 @@
+"""决策记录：动作标签映射、列式存储与一致率统计。"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from akagi_ng.mjai_bot.utils import mask_unicode_3p, mask_unicode_4p
+
+_LABEL_INDEX_4P = {label: i for i, label in enumerate(mask_unicode_4p)}
+_LABEL_INDEX_3P = {label: i for i, label in enumerate(mask_unicode_3p)}
+
+_KAN_TYPES = frozenset({"daiminkan", "ankan", "kakan"})
+
+# 实际动作的分类，用于分项统计一致率
+_ACTION_KIND = {
+    "reach": "riichi",
+    "chi_low": "call",
+    "chi_mid": "call",
+    "chi_high": "call",
+    "pon": "call",
+    "kan_select": "kan",
+    "hora": "agari",
+    "ryukyoku": "ryukyoku",
+    "nukidora": "nukidora",
+    "none": "pass",
+}
+
+
+def label_index(label: str, is_3p: bool) -> int:
+    """返回动作标签在模型动作空间中的下标，未知标签返回 -1。"""
+    return (_LABEL_INDEX_3P if is_3p else _LABEL_INDEX_4P).get(label, -1)
+
+
+def action_kind(label: str) -> str:
+    return _ACTION_KIND.get(label, "discard")
+
+
+def _chi_label(pai: str, consumed: list[str]) -> str:
+    called = int(pai[0])
+    low, high = sorted(int(tile[0]) for tile in consumed)
+    if called < low:
+        return "chi_low"
+    if called > high:
+        return "chi_high"
+    return "chi_mid"
+
+
+def action_label(action: dict) -> str:
+    """将 MJAI 动作（Bot 响应或牌谱事件）映射为模型动作空间中的标签。"""
+    match action:
+        case {"type": "dahai", "pai": pai}:
+            return pai
+        case {"type": "chi", "pai": pai, "consumed": consumed}:
+            return _chi_label(pai, consumed)
+        case {"type": kan} if kan in _KAN_TYPES:
+            return "kan_select"
+        case {"type": "reach" | "pon" | "hora" | "ryukyoku" | "nukidora" as kind}:
+            return kind
+        case _:
+            return "none"
+
+
+def actual_action(events: list[dict], index: int, seat: int) -> str:
+    """推断 seat 在第 index 条事件之后实际采取的动作。
+
+    下一条事件由 seat 发起时即为其动作；多家荣和时连续的 hora 中任意一条属于 seat 也计入。
+    其余情况视为选择了跳过 (none)。
+    """
+    for event in events[index + 1 :]:
+        if event.get("actor") == seat and event.get("type") != "tsumo":
+            return action_label(event)
+        if event.get("type") != "hora":
+            break
+    return "none"
+
+
+@dataclass
+class DecisionColumns:
+    """按列累积的决策记录。q_values 按完整动作空间展开，非法动作为 NaN。"""
+
+    game: list[int] = field(default_factory=list)
+    seat: list[int] = field(default_factory=list)
+    event: list[int] = field(default_factory=list)
+    chosen: list[int] = field(default_factory=list)
+    actual: list[int] = field(default_factory=list)
+    mask_bits: list[int] = field(default_factory=list)
+    q_values: list[np.ndarray] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.game)
+
+    def append(  # noqa: PLR0913
+        self,
+        *,
+        game: int,
+        seat: int,
+        event: int,
+        chosen: int,
+        actual: int,
+        mask_bits: int,
+        q_values: list[float],
+        action_dims: int,
+    ):
+        row = np.full(action_dims, np.nan, dtype=np.float32)
+        legal = [i for i in range(action_dims) if mask_bits & (1 << i)]
+        row[legal] = q_values[: len(legal)]
+
+        self.game.append(game)
+        self.seat.append(seat)
+        self.event.append(event)
+        self.chosen.append(chosen)
+        self.actual.append(actual)
+        self.mask_bits.append(mask_bits)
+        self.q_values.append(row)
+
+    def extend(self, other: "DecisionColumns"):
+        for name in ("game", "seat", "event", "chosen", "actual", "mask_bits", "q_values"):
+            getattr(self, name).extend(getattr(other, name))
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        chosen = np.asarray(self.chosen, dtype=np.int16)
+        actual = np.asarray(self.actual, dtype=np.int16)
+        width = max((len(row) for row in self.q_values), default=0)
+        q_values = np.full((len(self), width), np.nan, dtype=np.float32)
+        for i, row in enumerate(self.q_values):
+            q_values[i, : len(row)] = row
+        return {
+            "game": np.asarray(self.game, dtype=np.int32),
+            "seat": np.asarray(self.seat, dtype=np.int8),
+            "event": np.asarray(self.event, dtype=np.int32),
+            "chosen": chosen,
+            "actual": actual,
+            "agree": chosen == actual,
+            "mask_bits": np.asarray(self.mask_bits, dtype=np.uint64),
+            "q_values": q_values,
+        }
+
+    def save(self, path: Path):
+        """以 npz 列式格式写出，每列一个数组，可用 numpy.load 直接读取。"""
+        np.savez_compressed(path, **self.to_arrays())
+
+
+@dataclass
+class AgreementStats:
+    """模型选择与实际动作的一致率统计，可跨分片合并。"""
+
+    decisions: int = 0
+    agreed: int = 0
+    by_kind: dict[str, list[int]] = field(default_factory=dict)
+
+    def add(self, kind: str, agreed: bool):
+        self.decisions += 1
+        self.agreed += agreed
+        counts = self.by_kind.setdefault(kind, [0, 0])
+        counts[0] += 1
+        counts[1] += agreed
+
+    def merge(self, other: "AgreementStats"):
+        self.decisions += other.decisions
+        self.agreed += other.agreed
+        for kind, (total, agreed) in other.by_kind.items():
+            counts = self.by_kind.setdefault(kind, [0, 0])
+            counts[0] += total
+            counts[1] += agreed
+
+    @property
+    def rate(self) -> float:
+        return self.agreed / self.decisions if self.decisions else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "decisions": self.decisions,
+            "agreed": self.agreed,
+            "rate": self.rate,
+            "by_kind": {
+                kind: {"decisions": total, "agreed": agreed, "rate": agreed / total if total else 0.0}
+                for kind, (total, agreed) in sorted(self.by_kind.items())
+            },
+        }
@@ -0,0 +1,3 @@
+from akagi_ng.core.logging import logger
+
+logger = logger.bind(module="analyze")
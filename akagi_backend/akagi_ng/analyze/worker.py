@@ -0,0 +1,281 @@
+"""批量牌谱分析：牌谱加载、工作进程内的逐局分析与进程池调度。"""
+
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from akagi_ng.analyze.batching import BatchingEngine
+from akagi_ng.analyze.decisions import (
+    AgreementStats,
+    DecisionColumns,
+    action_kind,
+    action_label,
+    actual_action,
+    label_index,
+)
+from akagi_ng.analyze.logger import logger
+from akagi_ng.core.capture import CAPTURE_SUFFIX
+from akagi_ng.core.logging import configure_logging
+from akagi_ng.core.paths import get_models_dir
+from akagi_ng.mjai_bot.engine import MortalEngine, load_mortal_resource
+from akagi_ng.mjai_bot.status import BotStatusContext
+from akagi_ng.mjai_bot.utils import parse_mjai_event, serialize_mjai_event
+from akagi_ng.schema.constants import MahjongConstants, ModelConstants
+from akagi_ng.schema.protocols import MJAIBotProtocol
+from akagi_ng.schema.types import MJAIEventBase
+from akagi_ng.settings import local_settings
+
+LOG_SUFFIXES = frozenset({".jsonl", ".json", ".mjson", CAPTURE_SUFFIX})
+
+
+@dataclass(frozen=True, slots=True)
+class AnalyzeOptions:
+    output_dir: Path
+    jobs: int = 1
+    games_per_shard: int = 64
+    concurrency: int = 64  # 每个工作进程同时推进的对局视角数，决定合批规模
+    max_batch: int = 256
+    seats: tuple[int, ...] | None = None  # None 表示分析全部座位（捕获文件只分析录制者）
+    log_level: str = "INFO"
+
+
+@dataclass(slots=True)
+class GameLog:
+    events: list[dict]
+    is_3p: bool
+    seats: list[int]
+    lines: list[int] | None = None  # 各事件在牌谱文件中的行号；录制文件为 None
+
+
+@dataclass
+class ShardResult:
+    shard: int
+    output: Path | None
+    stats: AgreementStats = field(default_factory=AgreementStats)
+    games: dict[int, dict] = field(default_factory=dict)
+    failed: list[str] = field(default_factory=list)
+
+
+def discover_logs(inputs: list[Path]) -> list[Path]:
+    """展开目录并按路径排序，保证分片与游戏编号可复现。"""
+    paths: list[Path] = []
+    for path in inputs:
+        if path.is_dir():
+            paths.extend(p for p in path.rglob("*") if p.is_file() and p.suffix in LOG_SUFFIXES)
+        else:
+            paths.append(path)
+    return sorted(paths)
+
+
+def load_game(path: Path, seats: tuple[int, ...] | None = None) -> GameLog:
+    """读取 MJAI jsonl 牌谱或录制的平台原始帧（经对应 Bridge 转换为 MJAI 事件）。"""
+    if path.suffix == CAPTURE_SUFFIX:
+        # 延迟导入：仅分析录制文件时才需要加载各平台 Bridge
+        from akagi_ng.bridge.replay import replay_capture
+
+        events = [json.loads(serialize_mjai_event(e)) for e in replay_capture([path]) if isinstance(e, MJAIEventBase)]
+        start = next((e for e in events if e["type"] == "start_game"), None)
+        if start is None:
+            raise ValueError("capture contains no start_game")
+        # 录制文件只包含录制者视角的信息
+        return GameLog(events=events, is_3p=start["is_3p"], seats=[start["id"]])
+
+    events: list[dict] = []
+    lines: list[int] = []
+    with path.open(encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid JSON at {path}:{lineno}")
+                continue
+            lines.append(lineno)
+    start = next((e for e in events if isinstance(e, dict) and e.get("type") == "start_game"), None)
+    if start is None:
+        raise ValueError("log contains no start_game")
+    is_3p = start.get("is_3p", len(start.get("names", ())) == MahjongConstants.SEATS_3P)
+    players = MahjongConstants.SEATS_3P if is_3p else MahjongConstants.SEATS_4P
+    return GameLog(
+        events=events,
+        is_3p=is_3p,
+        seats=[s for s in range(players) if seats is None or s in seats],
+        lines=lines,
+    )
+
+
+class GameAnalyzer:
+    """工作进程内的分析器。
+
+    三麻/四麻各持有一份模型资源与一个合批引擎，由该进程内的全部对局线程共享。
+    """
+
+    def __init__(self, options: AnalyzeOptions):
+        self.options = options
+        self.status = BotStatusContext()
+        self._batchers: dict[bool, BatchingEngine] = {}
+        self._lock = threading.Lock()
+
+    def batcher(self, is_3p: bool) -> BatchingEngine:
+        with self._lock:
+            if is_3p not in self._batchers:
+                self._batchers[is_3p] = BatchingEngine(self._load_engine(is_3p), max_batch=self.options.max_batch)
+            return self._batchers[is_3p]
+
+    def _load_engine(self, is_3p: bool) -> MortalEngine:
+        if is_3p:
+            from akagi_ng.core.lib_loader import libriichi3p as libs
+
+            model_filename = local_settings.model_config.model_3p
+        else:
+            from akagi_ng.core.lib_loader import libriichi as libs
+
+            model_filename = local_settings.model_config.model_4p
+
+        resource = load_mortal_resource(get_models_dir() / model_filename, libs.consts, is_3p)
+        if resource is None:
+            raise RuntimeError(f"Failed to load model {model_filename}")
+        return MortalEngine(self.status, resource, is_3p)
+
+    def create_bot(self, is_3p: bool, seat: int) -> MJAIBotProtocol:
+        if is_3p:
+            from akagi_ng.core.lib_loader import libriichi3p as libs
+        else:
+            from akagi_ng.core.lib_loader import libriichi as libs
+        return libs.mjai.Bot(self.batcher(is_3p), seat)
+
+    def analyze_seat(self, game_id: int, game: GameLog, seat: int) -> tuple[DecisionColumns, AgreementStats]:
+        """以 seat 视角重放整局，记录每个决策点的模型输出与实际动作。"""
+        columns = DecisionColumns()
+        stats = AgreementStats()
+        bot = self.create_bot(game.is_3p, seat)
+        action_dims = ModelConstants.ACTION_DIMS_3P if game.is_3p else ModelConstants.ACTION_DIMS_4P
+
+        with self.batcher(game.is_3p).client():
+            for index, data in enumerate(game.events):
+                if isinstance(data, dict) and data.get("type") == "start_game":
+                    data = {**data, "id": seat, "is_3p": game.is_3p}
+                try:
+                    event = parse_mjai_event(data, game.lines[index] if game.lines else None)
+                except ValueError as e:
+                    logger.warning(f"Game {game_id} seat {seat}: skipping {e}")
+                    continue
+                if event is None:
+                    continue
+                can_act = not (isinstance(event, MJAIEventBase) and event.sync)
+                res = bot.react(serialize_mjai_event(event), can_act=can_act)
+                if not res:
+                    continue
+                response = json.loads(res)
+                meta = response.get("meta")
+                if not meta or "q_values" not in meta:
+                    continue
+
+                chosen = action_label(response)
+                actual = actual_action(game.events, index, seat)
+                columns.append(
+                    game=game_id,
+                    seat=seat,
+                    event=index,
+                    chosen=label_index(chosen, game.is_3p),
+                    actual=label_index(actual, game.is_3p),
+                    mask_bits=meta.get("mask_bits", 0),
+                    q_values=meta["q_values"],
+                    action_dims=action_dims,
+                )
+                stats.add(action_kind(actual), chosen == actual)
+
+        return columns, stats
+
+    def analyze_shard(self, shard: int, games: list[tuple[int, Path]]) -> ShardResult:
+        result = ShardResult(shard=shard, output=None)
+        tasks: list[tuple[int, GameLog, int]] = []
+        for game_id, path in games:
+            try:
+                game = load_game(path, self.options.seats)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping {path}: {e}")
+                result.failed.append(str(path))
+                continue
+            result.games[game_id] = {"path": str(path), "is_3p": game.is_3p, "seats": game.seats}
+            tasks.extend((game_id, game, seat) for seat in game.seats)
+
+        columns = DecisionColumns()
+        with ThreadPoolExecutor(max_workers=max(1, self.options.concurrency)) as executor:
+            futures = [executor.submit(self.analyze_seat, *task) for task in tasks]
+            for (game_id, _game, seat), future in zip(tasks, futures, strict=True):
+                try:
+                    seat_columns, seat_stats = future.result()
+                except Exception:
+                    logger.exception(f"Failed to analyze game {game_id} seat {seat}")
+                    result.failed.append(f"{result.games[game_id]['path']}#{seat}")
+                    continue
+                columns.extend(seat_columns)
+                result.stats.merge(seat_stats)
+                game_stats = result.games[game_id].setdefault("agreement", {})
+                game_stats[str(seat)] = seat_stats.rate
+
+        if len(columns):
+            result.output = self.options.output_dir / f"decisions_{shard:04d}.npz"
+            columns.save(result.output)
+        for batcher in self._batchers.values():
+            logger.info(f"Shard {shard}: {batcher.rows} decisions in {batcher.batches} batches ({batcher.name})")
+        return result
+
+
+# 每个工作进程一个分析器，模型资源在进程生命周期内只加载一次
+_analyzer: GameAnalyzer | None = None
+
+
+def _init_worker(options: AnalyzeOptions):
+    global _analyzer
+    configure_logging(options.log_level, console=False)
+    # 多进程并行时限制每个进程的 torch 线程数，避免 CPU 超额订阅
+    import torch
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // max(1, options.jobs)))
+    _analyzer = GameAnalyzer(options)
+
+
+def _run_shard(args: tuple[int, list[tuple[int, Path]]]) -> ShardResult:
+    shard, games = args
+    return _analyzer.analyze_shard(shard, games)
+
+
+def analyze_logs(inputs: list[Path], options: AnalyzeOptions) -> dict:
+    """分析全部牌谱，写出列式决策文件与 summary.json，返回汇总结果。"""
+    paths = discover_logs(inputs)
+    options.output_dir.mkdir(parents=True, exist_ok=True)
+    games = list(enumerate(paths))
+    size = max(1, options.games_per_shard)
+    shards = [(i // size, games[i : i + size]) for i in range(0, len(games), size)]
+    logger.info(f"Analyzing {len(paths)} logs in {len(shards)} shards with {options.jobs} worker(s)")
+
+    if options.jobs <= 1 or len(shards) <= 1:
+        analyzer = GameAnalyzer(options)
+        results = [analyzer.analyze_shard(shard, shard_games) for shard, shard_games in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=options.jobs, initializer=_init_worker, initargs=(options,)) as executor:
+            results = list(executor.map(_run_shard, shards))
+
+    stats = AgreementStats()
+    summary_games: dict[int, dict] = {}
+    failed: list[str] = []
+    for result in results:
+        stats.merge(result.stats)
+        summary_games.update(result.games)
+        failed.extend(result.failed)
+
+    summary = {
+        "games": {str(k): v for k, v in sorted(summary_games.items())},
+        "shards": [result.output.name for result in results if result.output],
+        "agreement": stats.to_dict(),
+        "failed": failed,
+    }
+    with (options.output_dir / "summary.json").open("w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
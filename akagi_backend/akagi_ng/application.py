@@ -1,7 +1,9 @@
 import importlib
+import os
 import queue
 import signal
 import threading
+import time
 from types import FrameType
 
 from akagi_ng import AKAGI_VERSION
@@ -10,11 +12,13 @@ from akagi_ng.core.context import (
     get_app_context,
     set_app_context,
 )
+from akagi_ng.core.decision_log import DecisionSink, open_decision_sink
 from akagi_ng.core.logging import (
     configure_logging,
     logger,
 )
-from akagi_ng.dataserver import DataServer
+from akagi_ng.core.metrics import MESSAGE_QUEUE_DEPTH
+from akagi_ng.dataserver import DataServer, DataServerProcess
 from akagi_ng.electron_client import create_electron_client
 from akagi_ng.mitm_client import MitmClient
 from akagi_ng.mjai_bot import Controller, StateTracker
@@ -41,9 +45,11 @@ logger = logger.bind(module="akagi")
 class AkagiApp:
     def __init__(self):
         self._stop_event = threading.Event()
-        self.ds: DataServer | None = None
+        self.ds: DataServer | DataServerProcess | None = None
         self.status: BotStatusContext | None = None
         self.frontend_url = ""
+        self.decision_sink: DecisionSink | None = None
+        self._event_index = 0
         self.message_queue: queue.Queue[AkagiEvent] = queue.Queue(maxsize=ServerConstants.MESSAGE_QUEUE_MAXSIZE)
 
     def initialize(self):
@@ -53,7 +59,11 @@ class AkagiApp:
         configure_logging(settings.log_level)
 
         host, port = settings.server.host, settings.server.port
-        self.ds = DataServer(host=host, external_port=port)
+        # AKAGI_DATASERVER_PROCESS=1 时前端服务运行在独立进程，避免与推理争用 GIL
+        if os.environ.get("AKAGI_DATASERVER_PROCESS") == "1":
+            self.ds = DataServerProcess(host=host, external_port=port)
+        else:
+            self.ds = DataServer(host=host, external_port=port)
 
         target_host = "127.0.0.1" if host == "0.0.0.0" else host
         self.frontend_url = f"http://{target_host}:{port}/"
@@ -81,6 +91,11 @@ class AkagiApp:
 
         set_app_context(app_context)
 
+        # 队列深度仅在抓取 /metrics 时求值，不给 Reactor 热路径增加开销
+        MESSAGE_QUEUE_DEPTH.set_function(self.message_queue.qsize)
+
+        self.decision_sink = open_decision_sink()
+
     def start(self):
         self.ds.start()
         logger.info(f"DataServer started at {self.frontend_url}")
@@ -219,12 +234,23 @@ class AkagiApp:
                     continue
 
                 try:
+                    started = time.perf_counter()
+                    self._event_index += 1
+
                     # 阶段 2：PROCESS - 处理事件
                     result = self._process_event(msg, tracker, controller)
 
                     # 阶段 3：OUTPUT - 分发结果
                     self._emit_outputs(result, tracker)
 
+                    if self.decision_sink and result.response and not result.is_sync:
+                        self.decision_sink.record(
+                            self._event_index,
+                            result.response,
+                            time.perf_counter() - started,
+                            is_3p=bool(tracker and tracker.is_3p),
+                        )
+
                 except Exception as e:
                     logger.exception(f"Critical error in main loop dispatch: {e}")
                     self._stop_event.wait(1.0)
@@ -247,6 +273,10 @@ class AkagiApp:
             except Exception as e:
                 logger.error(f"Error stopping {source.__class__.__name__}: {e}")
 
+        if self.decision_sink:
+            logger.info("Flushing decision log...")
+            self.decision_sink.close()
+
         # 停止 DataServer
         if self.ds:
             try:
@@ -13,7 +13,7 @@ from akagi_ng.bridge.amatsuki.consts import (
 )
 from akagi_ng.bridge.base import BaseBridge
 from akagi_ng.bridge.logger import logger
-from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.schema.constants import MahjongConstants, Platform
 from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.types import AkagiEvent, MJAIEvent
 
@@ -85,6 +85,8 @@ class STOMP:
 
 
 class AmatsukiBridge(BaseBridge):
+    platform = Platform.AMATSUKI
+
     def __init__(self):
         super().__init__()
         # 流程是否有效
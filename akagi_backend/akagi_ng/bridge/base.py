@@ -1,3 +1,6 @@
+from collections.abc import Iterator
+
+from akagi_ng.schema.constants import Platform
 from akagi_ng.schema.types import (
     AkagiEvent,
     AnkanEvent,
@@ -28,6 +31,9 @@ class BaseBridge:
     各平台继承此类并实现 `parse()` 方法。
     """
 
+    # 平台标识，用于指标标签
+    platform: Platform | None = None
+
     def __init__(self):
         self.seat = 0
 
@@ -49,6 +55,15 @@ class BaseBridge:
         """
         raise NotImplementedError
 
+    def iter_parse(self, content: bytes) -> Iterator[AkagiEvent]:
+        """
+        逐个产出解析得到的 MJAI 指令。
+
+        默认一次性调用 `parse()`；单条消息会展开为大量事件的平台（如雀魂断线重连的对局恢复）
+        可覆盖此方法边解码边产出，消费者无需等待整条消息解析完毕。
+        """
+        yield from self.parse(content) or ()
+
     # ===== MJAI 消息构建器 =====
 
     def _resolve_sync(self, sync: bool | None = None) -> bool:
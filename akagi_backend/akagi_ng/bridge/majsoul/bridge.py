@@ -1,21 +1,60 @@
 import base64
 import contextlib
-from functools import cmp_to_key
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from typing import ClassVar
 
 from akagi_ng.bridge.base import BaseBridge
 from akagi_ng.bridge.logger import logger
 from akagi_ng.bridge.majsoul.consts import OperationAnGangAddGang, OperationChiPengGang
+from akagi_ng.bridge.majsoul.hand import HandCounts
+from akagi_ng.bridge.majsoul.lazy import LazyMessage
 from akagi_ng.bridge.majsoul.liqi import LiqiProto, MsgType
-from akagi_ng.bridge.majsoul.tile_mapping import MS_TILE_2_MJAI_TILE, compare_pai
-from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.bridge.majsoul.tile_mapping import MS_TILE_2_MJAI_TILE
+from akagi_ng.core.metrics import majsoul_method_timer
+from akagi_ng.schema.constants import MahjongConstants, Platform
 from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.types import AkagiEvent, MJAIEvent
 
 
 class MajsoulBridge(BaseBridge):
+    platform = Platform.MAJSOUL
+
+    # (方法名, 消息类型) -> 处理方法名；消息类型为 None 时不区分类型。
+    # 保存方法名而非绑定方法，便于按实例替换处理方法
+    LIQI_HANDLERS: ClassVar[dict[tuple[str, MsgType | None], str]] = {
+        (".lq.FastTest.syncGame", MsgType.Res): "_parse_sync_game",
+        (".lq.FastTest.enterGame", MsgType.Res): "_parse_enter_game",
+        (".lq.FastTest.authGame", MsgType.Req): "_parse_auth_game_req",
+        (".lq.FastTest.authGame", MsgType.Res): "_parse_auth_game_res",
+        (".lq.ActionPrototype", None): "_handle_action_prototype",
+        (".lq.NotifyGameEndResult", None): "_handle_game_end",
+        (".lq.NotifyGameTerminate", None): "_handle_game_end",
+    }
+    # 同步/进入对局响应的流式处理方法，供 iter_liqi 使用
+    STREAMING_HANDLERS: ClassVar[dict[str, str]] = {
+        ".lq.FastTest.syncGame": "_iter_sync_game",
+        ".lq.FastTest.enterGame": "_iter_enter_game",
+    }
+    # 有处理方法的方法名，其余消息由 LiqiProto 读取方法名后直接跳过
+    LIQI_METHODS = frozenset(sys.intern(method) for method, _ in LIQI_HANDLERS)
+
+    # 动作名 -> 处理方法名
+    ACTION_HANDLERS: ClassVar[dict[str, str]] = {
+        "ActionNewRound": "_handle_action_new_round",
+        "ActionDealTile": "_handle_action_deal_tile",
+        "ActionDiscardTile": "_handle_action_discard_tile",
+        "ActionChiPengGang": "_handle_action_chi_peng_gang",
+        "ActionAnGangAddGang": "_handle_action_an_gang_add_gang",
+        "ActionBaBei": "_handle_action_ba_bei",
+    }
+    # 本局结束的动作
+    END_KYOKU_ACTIONS = frozenset({"ActionHule", "ActionNoTile", "ActionLiuJu"})
+
     def __init__(self):
         super().__init__()
-        self.liqi_proto = LiqiProto()
+        self.liqi_proto = LiqiProto(interested_methods=self.LIQI_METHODS)
         self._init_state()
 
     def _init_state(self):
@@ -26,7 +65,8 @@ class MajsoulBridge(BaseBridge):
         self.reach = False
         self.accept_reach = None
         self.doras = []
-        self.my_tehais = ["?"] * MahjongConstants.TEHAI_SIZE
+        # 自家手牌（不含摸牌），按牌种计数保存
+        self.hand = HandCounts(["?"] * MahjongConstants.TEHAI_SIZE)
         self.my_tsumohai = "?"
         self.syncing = False
 
@@ -40,6 +80,15 @@ class MajsoulBridge(BaseBridge):
     def reset(self):
         self._init_state()
 
+    @property
+    def my_tehais(self) -> list[str]:
+        """自家手牌（不含摸牌），按理牌顺序展开"""
+        return self.hand.to_list()
+
+    @my_tehais.setter
+    def my_tehais(self, tiles: Iterable[str]):
+        self.hand = HandCounts(tiles)
+
     def parse(self, content: bytes) -> list[AkagiEvent]:
         """解析内容并返回 MJAI 指令。
 
@@ -49,53 +98,64 @@ class MajsoulBridge(BaseBridge):
         Returns:
             list[AkagiEvent]: MJAI 指令。
         """
+        return list(self.iter_parse(content))
+
+    def iter_parse(self, content: bytes) -> Iterator[AkagiEvent]:
+        """解析内容并逐个产出 MJAI 指令；对局恢复消息边解码边产出。"""
         try:
             liqi_message = self.liqi_proto.parse(content)
-            parsed = self.parse_liqi(liqi_message)
-
-            if parsed:
-                logger.trace(f"<- {liqi_message}")
-                logger.trace(f"-> {parsed}")
-
-            return parsed
+            traced = False
+            for event in self.iter_liqi(liqi_message):
+                if not traced:
+                    # 延迟格式化：仅在启用 TRACE 时才物化消息
+                    logger.trace("<- {}", liqi_message)
+                    traced = True
+                logger.trace("-> {}", event)
+                yield event
         except Exception as e:
             logger.error(f"Error parsing Majsoul message: {e}")
-            return [self.make_system_event(NotificationCode.PARSE_ERROR)]
+            yield self.make_system_event(NotificationCode.PARSE_ERROR)
+
+    def iter_liqi(self, liqi_message: dict) -> Iterator[AkagiEvent]:
+        """与 parse_liqi 相同，但同步/进入对局消息按动作逐个解码并产出。"""
+        match liqi_message:
+            case {"method": method, "type": MsgType.Res} if method in self.STREAMING_HANDLERS:
+                events = getattr(self, self.STREAMING_HANDLERS[method])(liqi_message)
+                yield from _timed_iter(events, method)
+            case _:
+                yield from self.parse_liqi(liqi_message)
 
     def _parse_sync_game(self, liqi_message: dict) -> list[AkagiEvent]:
         """处理游戏同步消息（重连后的同步）"""
-        self._pre_scan_mode_from_sync_msg(liqi_message)
+        return list(self._iter_sync_game(liqi_message))
 
-        sync_game_msgs = self._parse_sync_game_raw(liqi_message)
-        parsed_list: list[AkagiEvent] = [self.make_system_event(NotificationCode.GAME_SYNCING)]
+    def _iter_sync_game(self, liqi_message: dict) -> Iterator[AkagiEvent]:
+        self._pre_scan_mode_from_sync_msg(liqi_message)
+        yield self.make_system_event(NotificationCode.GAME_SYNCING)
 
+        msgs = iter(self._parse_sync_game_raw(liqi_message))
         try:
-            for i, msg in enumerate(sync_game_msgs):
+            # 预读一个动作以判断当前动作是否为最后一个
+            current = next(msgs, None)
+            while current is not None:
+                following = next(msgs, None)
                 # 只有最后一个动作不打 sync 标签，以便触发一次真实推荐展示
-                is_last_msg = i == len(sync_game_msgs) - 1
-                self.syncing = not is_last_msg
-                parsed = self._handle_action_prototype(msg)
-                if parsed:
-                    parsed_list.extend(parsed)
+                self.syncing = following is not None
+                yield from self._handle_action_prototype(current) or ()
+                current = following
         finally:
             self.syncing = False
 
-        return parsed_list
-
     def _parse_enter_game(self, liqi_message: dict) -> list[AkagiEvent]:
         """处理进入对局消息（首次连接，无需同步）"""
+        return list(self._iter_enter_game(liqi_message))
+
+    def _iter_enter_game(self, liqi_message: dict) -> Iterator[AkagiEvent]:
         self.syncing = False
         self._pre_scan_mode_from_sync_msg(liqi_message)
 
-        sync_game_msgs = self._parse_sync_game_raw(liqi_message)
-        parsed_list: list[AkagiEvent] = []
-
-        for msg in sync_game_msgs:
-            parsed = self._handle_action_prototype(msg)
-            if parsed:
-                parsed_list.extend(parsed)
-
-        return parsed_list
+        for msg in self._parse_sync_game_raw(liqi_message):
+            yield from self._handle_action_prototype(msg) or ()
 
     def _pre_scan_mode_from_sync_msg(self, msg_dict: dict):
         """从同步/进入房间消息中预扫描游戏模式"""
@@ -106,35 +166,40 @@ class MajsoulBridge(BaseBridge):
             case _:
                 pass
 
-    def _parse_sync_game_raw(self, msg_dict: dict) -> list[dict]:
-        """从后端同步字典中解析出原始消息列表"""
-        msgs = []
+    def _parse_sync_game_raw(self, msg_dict: dict) -> Iterator[dict]:
+        """从后端同步字典中逐个解析出原始消息，按需解码，不预先构建完整列表"""
         try:
             data = msg_dict.get("data", {})
             restore = data.get("gameRestore")
             if not restore:
-                return []
+                return
 
-            actions = restore.get("actions", [])
-            for action in actions:
+            for action in restore.get("actions", []):
                 if item := self._parse_sync_game_action_item(action):
-                    msgs.append(item)
+                    yield item
         except Exception as e:
             logger.error(f"Error parsing sync game: {e}")
-        return msgs
 
     def _parse_sync_game_action_item(self, action_dict: dict) -> dict:
         """解析同步消息中的单个动作项"""
         inner_name = action_dict["name"]
-        # 同步消息中的 data 为 base64 字符串，且由于是历史录像数据，不经过 XOR 加密。
-        raw_data = base64.b64decode(action_dict["data"])
+        # 同步消息中的 data 为历史录像数据，不经过 XOR 加密。
+        # LazyMessage 直接取原始 bytes，省去 base64 编码再解码；普通 dict 中为 base64 字符串
+        if isinstance(action_dict, LazyMessage):
+            raw_data = action_dict.message.data
+        else:
+            raw_data = base64.b64decode(action_dict["data"])
         inner_dict = self.liqi_proto.parse_wrapper(inner_name, raw_data, use_xor=False)
 
         if inner_dict is None:
             return {}
 
-        action_dict["data"] = inner_dict
-        return {"id": -1, "type": MsgType.Notify, "method": ".lq.ActionPrototype", "data": action_dict}
+        return {
+            "id": -1,
+            "type": MsgType.Notify,
+            "method": ".lq.ActionPrototype",
+            "data": {"name": inner_name, "data": inner_dict},
+        }
 
     def _parse_auth_game_req(self, liqi_message: dict) -> list[MJAIEvent]:
         """处理游戏认证请求"""
@@ -154,36 +219,23 @@ class MajsoulBridge(BaseBridge):
         self.seat = seat_list.index(self.accountId)
         return [self.make_start_game(self.seat, is_3p=self.is_3p)]
 
-    def _setup_new_round_tehais(self, tiles: list[str]) -> tuple[list[list[str]], list[str], str | None]:
+    def _setup_new_round_tehais(self, tiles: list[str]) -> tuple[list[list[str]], HandCounts, str | None]:
         """初始化新一局的手牌
 
         Returns:
-            tuple: (tehais_display, my_tehais, my_tsumohai)
+            tuple: (tehais_display, hand, my_tsumohai)
         """
-        tehais = [["?"] * MahjongConstants.TEHAI_SIZE for _ in range(MahjongConstants.SEATS_4P)]
-        my_tehais = ["?"] * MahjongConstants.TEHAI_SIZE
-        my_tsumohai = None
-
-        for hai in range(MahjongConstants.TEHAI_SIZE):
-            my_tehais[hai] = MS_TILE_2_MJAI_TILE[tiles[hai]]
-
-        if len(tiles) == MahjongConstants.TEHAI_SIZE:
-            sorted_tehais = sorted(my_tehais, key=cmp_to_key(compare_pai))
-            tehais[self.seat] = list(sorted_tehais)
-            my_tehais = sorted_tehais
-        elif len(tiles) == MahjongConstants.TSUMO_TEHAI_SIZE:
-            # 将14张牌排序后，前13张作为手牌，最后1张作为摸牌
-            all_tiles = sorted(
-                [*my_tehais, MS_TILE_2_MJAI_TILE[tiles[MahjongConstants.TEHAI_SIZE]]], key=cmp_to_key(compare_pai)
-            )
-            my_tehais = all_tiles[: MahjongConstants.TEHAI_SIZE]
-            my_tsumohai = all_tiles[MahjongConstants.TEHAI_SIZE]
-            tehais[self.seat] = list(my_tehais)
-        else:
+        if len(tiles) not in {MahjongConstants.TEHAI_SIZE, MahjongConstants.TSUMO_TEHAI_SIZE}:
             logger.error(f"Unexpected tile count in ActionNewRound: {len(tiles)}")
-            return [], [], None
+            return [], HandCounts(), None
+
+        hand = HandCounts(MS_TILE_2_MJAI_TILE[tile] for tile in tiles)
+        # 14 张时，理牌顺序中的最后一张作为摸牌，其余 13 张作为手牌
+        my_tsumohai = hand.pop_last() if len(tiles) == MahjongConstants.TSUMO_TEHAI_SIZE else None
 
-        return tehais, my_tehais, my_tsumohai
+        tehais = [["?"] * MahjongConstants.TEHAI_SIZE for _ in range(MahjongConstants.SEATS_4P)]
+        tehais[self.seat] = hand.to_list()
+        return tehais, hand, my_tsumohai
 
     def _handle_action_new_round(self, action_data: dict) -> list[MJAIEvent]:
         """处理ActionNewRound动作"""
@@ -201,7 +253,7 @@ class MajsoulBridge(BaseBridge):
         if self.is_3p:
             scores = [*scores, 0]
 
-        tehais, self.my_tehais, self.my_tsumohai = self._setup_new_round_tehais(data["tiles"])
+        tehais, self.hand, self.my_tsumohai = self._setup_new_round_tehais(data["tiles"])
         if not tehais:
             return []
 
@@ -232,24 +284,14 @@ class MajsoulBridge(BaseBridge):
         以防止 my_tsumohai 被后续的摸牌事件覆盖而丢失。
         """
         if self.my_tsumohai:
-            self.my_tehais.append(self.my_tsumohai)
-            self.my_tehais.sort(key=cmp_to_key(compare_pai))
+            self.hand.add(self.my_tsumohai)
             self.my_tsumohai = None
 
     def _remove_tile_from_hand(self, tile: str):
         """从手牌中移除指定牌（支持赤宝牌匹配）。
         优先移除完全匹配的牌，否则移除基础相同的牌。
         """
-        if tile in self.my_tehais:
-            self.my_tehais.remove(tile)
-            return
-
-        # 尝试基础牌名匹配（处理赤 5 / 普通 5 的交叉移除情况）
-        base = tile.rstrip("r")
-        for h in self.my_tehais:
-            if h.rstrip("r") == base:
-                self.my_tehais.remove(h)
-                break
+        self.hand.remove_like(tile)
 
     def _update_hand_discard(self, actor: int, pai: str, tsumogiri: bool):
         """更新打牌后的手牌状态"""
@@ -258,8 +300,8 @@ class MajsoulBridge(BaseBridge):
 
         if tsumogiri:
             self.my_tsumohai = None
-        elif pai in self.my_tehais:
-            self.my_tehais.remove(pai)
+        elif pai in self.hand:
+            self.hand.remove(pai)
         elif self.my_tsumohai == pai:
             self.my_tsumohai = None
         else:
@@ -396,8 +438,8 @@ class MajsoulBridge(BaseBridge):
 
         # 更新手牌：移除北风
         if actor == self.seat:
-            if "N" in self.my_tehais:
-                self.my_tehais.remove("N")
+            if "N" in self.hand:
+                self.hand.remove("N")
             elif self.my_tsumohai == "N":
                 self.my_tsumohai = None
             else:
@@ -414,28 +456,10 @@ class MajsoulBridge(BaseBridge):
         action_data = liqi_message["data"]
         action_name = action_data["name"]
 
-        match action_name:
-            # 本局开始
-            case "ActionNewRound":
-                ret.extend(self._handle_action_new_round(action_data))
-            # 摸牌
-            case "ActionDealTile":
-                ret.extend(self._handle_action_deal_tile(action_data))
-            # 打牌
-            case "ActionDiscardTile":
-                ret.extend(self._handle_action_discard_tile(action_data))
-            # 吃碰杠
-            case "ActionChiPengGang":
-                ret.extend(self._handle_action_chi_peng_gang(action_data))
-            # 暗杠/加杠
-            case "ActionAnGangAddGang":
-                ret.extend(self._handle_action_an_gang_add_gang(action_data))
-            # 拔北
-            case "ActionBaBei":
-                ret.extend(self._handle_action_ba_bei(action_data))
-            # 本局结束
-            case "ActionHule" | "ActionNoTile" | "ActionLiuJu":
-                return [self.make_end_kyoku()]
+        if action_name in self.END_KYOKU_ACTIONS:
+            return [self.make_end_kyoku()]
+        if handler := self.ACTION_HANDLERS.get(action_name):
+            ret.extend(getattr(self, handler)(action_data))
 
         # 立直确认
         if accept_reach := self.accept_reach:
@@ -447,52 +471,50 @@ class MajsoulBridge(BaseBridge):
 
         return ret
 
-    def _handle_game_end(self, data: dict) -> list[MJAIEvent]:
+    def _handle_game_end(self, liqi_message: dict) -> list[MJAIEvent]:
         """处理游戏结束"""
         with contextlib.suppress(Exception):
-            for idx, player in enumerate(data["result"]["players"]):
+            for idx, player in enumerate(liqi_message["data"]["result"]["players"]):
                 if player["seat"] == self.seat:
                     self.rank = idx + 1
                     self.score = player["partPoint1"]
         self.game_ended = True
         return [self.make_end_game()]
 
-    def _handle_auth_game(self, liqi_message: dict, msg_type: MsgType) -> list[MJAIEvent]:
-        """处理游戏认证消息"""
-        if msg_type == MsgType.Req:
-            return self._parse_auth_game_req(liqi_message)
-        if msg_type == MsgType.Res:
-            return self._parse_auth_game_res(liqi_message)
-        return []
-
     def parse_liqi(self, liqi_message: dict) -> list[MJAIEvent]:
-        """解析Liqi协议消息"""
+        """解析Liqi协议消息，按 (方法名, 消息类型) 查表分派"""
         if not liqi_message:
             return []
 
         match liqi_message:
-            case {"method": method, "type": msg_type, "data": data}:
+            case {"method": method, "type": msg_type, "data": _}:
                 pass
             case _:
                 return []
 
-        result: list[MJAIEvent] = []
-
-        match (method, msg_type):
-            # 游戏同步（重连）
-            case (".lq.FastTest.syncGame", MsgType.Res):
-                result = self._parse_sync_game(liqi_message)
-            # 进入对局（首次连接）
-            case (".lq.FastTest.enterGame", MsgType.Res):
-                result = self._parse_enter_game(liqi_message)
-            # 游戏认证
-            case (".lq.FastTest.authGame", m_type):
-                result = self._handle_auth_game(liqi_message, m_type)
-            # 游戏动作
-            case (".lq.ActionPrototype", _):
-                result = self._handle_action_prototype(liqi_message)
-            # 游戏结束
-            case (".lq.NotifyGameEndResult" | ".lq.NotifyGameTerminate", _):
-                result = self._handle_game_end(data)
-
-        return result
+        handler = self.LIQI_HANDLERS.get((method, msg_type)) or self.LIQI_HANDLERS.get((method, None))
+        if handler is None:
+            return []
+
+        start = time.perf_counter()
+        try:
+            return getattr(self, handler)(liqi_message)
+        finally:
+            majsoul_method_timer(method, "handle").observe(time.perf_counter() - start)
+
+
+def _timed_iter(events: Iterator[AkagiEvent], method: str) -> Iterator[AkagiEvent]:
+    """逐个转发事件，只累计生成事件本身的耗时（不含下游消费），结束时按方法名记录一次。"""
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                event = next(events)
+            except StopIteration:
+                return
+            finally:
+                elapsed += time.perf_counter() - start
+            yield event
+    finally:
+        majsoul_method_timer(method, "handle").observe(elapsed)
@@ -0,0 +1,192 @@
+"""liqi.json 协议定义到 Protobuf 描述池的编译与缓存。
+
+编译结果按 liqi.json 内容的 SHA-256 缓存两级：
+- 进程内：同一份定义只构建一个 DescriptorPool，所有 LiqiProto 共享。
+- 磁盘：序列化的 FileDescriptorProto 写入 cache 目录，重启后跳过逐类型构建。
+定义文件更新后摘要变化，自动重新编译并清理旧的缓存文件。
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from google.protobuf import descriptor_pb2 as _descriptor_pb2
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf.message import DecodeError
+
+from akagi_ng.bridge.logger import logger
+from akagi_ng.core.paths import ensure_dir, get_assets_dir, get_cache_dir
+
+_FDP = _descriptor_pb2.FieldDescriptorProto
+_SCALAR_TYPES = {
+    "double": _FDP.TYPE_DOUBLE,
+    "float": _FDP.TYPE_FLOAT,
+    "int64": _FDP.TYPE_INT64,
+    "uint64": _FDP.TYPE_UINT64,
+    "int32": _FDP.TYPE_INT32,
+    "uint32": _FDP.TYPE_UINT32,
+    "bool": _FDP.TYPE_BOOL,
+    "string": _FDP.TYPE_STRING,
+    "bytes": _FDP.TYPE_BYTES,
+}
+_CACHE_PREFIX = "liqi-"
+_CACHE_SUFFIX = ".desc"
+
+type _Parent = _descriptor_pb2.FileDescriptorProto | _descriptor_pb2.DescriptorProto
+
+
+@dataclass(frozen=True, slots=True)
+class LiqiSchema:
+    """一份 liqi.json 编译后的结果，只读，可在多个解析器间共享。"""
+
+    digest: str
+    json_proto: dict
+    pool: _descriptor_pool.DescriptorPool
+
+
+class _TypeIndex:
+    """类型注册表：全名 -> 是否为枚举，以及任意点分后缀 -> 首个匹配的全名。"""
+
+    def __init__(self):
+        self.is_enum: dict[str, bool] = {}
+        self.by_suffix: dict[str, str] = {}
+
+    def register(self, nested_data: dict, prefix: str):
+        for name, obj in nested_data.items():
+            full_name = f"{prefix}.{name}"
+            if "fields" in obj:
+                self._add(full_name, False)
+                if "nested" in obj:
+                    self.register(obj["nested"], full_name)
+            elif "values" in obj:
+                self._add(full_name, True)
+
+    def _add(self, full_name: str, is_enum: bool):
+        self.is_enum[full_name] = is_enum
+        # setdefault 保留注册顺序上的首个匹配，与逐个 endswith 扫描的结果一致
+        parts = full_name.split(".")
+        for i in range(1, len(parts)):
+            self.by_suffix.setdefault(".".join(parts[i:]), full_name)
+
+    def resolve(self, p_type: str) -> str:
+        resolved = f".lq.{p_type}"
+        if resolved in self.is_enum:
+            return resolved
+        return self.by_suffix.get(p_type, resolved)
+
+
+def build_file_descriptor(json_proto: dict) -> _descriptor_pb2.FileDescriptorProto:
+    """根据 liqi.json 构建 FileDescriptorProto。"""
+    fd = _descriptor_pb2.FileDescriptorProto()
+    fd.name = "protocol.proto"
+    fd.package = "lq"
+    fd.syntax = "proto3"
+
+    lq_data = json_proto["nested"]["lq"]["nested"]
+    index = _TypeIndex()
+    index.register(lq_data, ".lq")
+
+    for name, obj in lq_data.items():
+        _build_type(fd, name, obj, index)
+    return fd
+
+
+def _build_type(parent_proto: _Parent, name: str, obj: dict, index: _TypeIndex):
+    if "fields" in obj:
+        _build_message(parent_proto, name, obj, index)
+    elif "values" in obj:
+        _build_enum(parent_proto, name, obj)
+
+
+def _build_message(parent_proto: _Parent, name: str, obj: dict, index: _TypeIndex):
+    if hasattr(parent_proto, "nested_type"):
+        msg_desc = parent_proto.nested_type.add()
+    else:
+        msg_desc = parent_proto.message_type.add()
+    msg_desc.name = name
+
+    for f_name, f_obj in obj["fields"].items():
+        _build_field(msg_desc, f_name, f_obj, index)
+
+    for n_name, n_obj in obj.get("nested", {}).items():
+        _build_type(msg_desc, n_name, n_obj, index)
+
+
+def _build_field(msg_desc: _descriptor_pb2.DescriptorProto, f_name: str, f_obj: dict, index: _TypeIndex):
+    field = msg_desc.field.add()
+    field.name = f_name
+    field.number = f_obj["id"]
+    field.label = _FDP.LABEL_REPEATED if f_obj.get("rule") == "repeated" else _FDP.LABEL_OPTIONAL
+
+    p_type = f_obj["type"]
+    if p_type in _SCALAR_TYPES:
+        field.type = _SCALAR_TYPES[p_type]
+    else:
+        resolved = index.resolve(p_type)
+        field.type_name = resolved
+        field.type = _FDP.TYPE_ENUM if index.is_enum.get(resolved, False) else _FDP.TYPE_MESSAGE
+
+
+def _build_enum(parent_proto: _Parent, name: str, obj: dict):
+    enum_desc = parent_proto.enum_type.add()
+    enum_desc.name = name
+    for v_name, v_id in obj["values"].items():
+        val = enum_desc.value.add()
+        val.name = v_name
+        val.number = v_id
+
+
+def _cache_path(digest: str) -> Path:
+    return get_cache_dir() / f"{_CACHE_PREFIX}{digest}{_CACHE_SUFFIX}"
+
+
+def _read_cached(digest: str) -> _descriptor_pb2.FileDescriptorProto | None:
+    try:
+        return _descriptor_pb2.FileDescriptorProto.FromString(_cache_path(digest).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, DecodeError) as e:
+        logger.warning(f"Ignoring unreadable liqi descriptor cache: {e}")
+        return None
+
+
+def _write_cached(digest: str, fd: _descriptor_pb2.FileDescriptorProto):
+    path = _cache_path(digest)
+    try:
+        ensure_dir(path.parent)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(fd.SerializeToString())
+        tmp.replace(path)
+        for stale in path.parent.glob(f"{_CACHE_PREFIX}*{_CACHE_SUFFIX}"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Failed to write liqi descriptor cache: {e}")
+
+
+_lock = threading.Lock()
+_current: LiqiSchema | None = None
+
+
+def load_schema(path: Path | None = None) -> LiqiSchema:
+    """加载 liqi.json 的编译结果；内容未变化时返回进程内共享的同一份。"""
+    global _current
+    raw = (path or get_assets_dir() / "liqi.json").read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    with _lock:
+        if _current is not None and _current.digest == digest:
+            return _current
+
+        json_proto = json.loads(raw)
+        fd = _read_cached(digest)
+        if fd is None:
+            fd = build_file_descriptor(json_proto)
+            _write_cached(digest, fd)
+            logger.debug(f"Compiled liqi descriptors ({len(fd.message_type)} root messages)")
+
+        pool = _descriptor_pool.DescriptorPool()
+        pool.Add(fd)
+        _current = LiqiSchema(digest=digest, json_proto=json_proto, pool=pool)
+        return _current
@@ -0,0 +1,110 @@
+"""按牌种计数的手牌。
+
+手牌以 PAI_ORDER_INDEX 为下标的 38 格计数数组保存（含 3 种赤五与未知牌 '?'），
+增删与查询均为 O(1)；需要有序列表时按下标顺序展开，天然就是理牌顺序，无需排序。
+不在 PAI_ORDER 中的牌名（正常流程不会出现）另行计数，展开时排在最后，与原先排序的行为一致。
+"""
+
+from collections.abc import Iterable, Iterator
+
+from akagi_ng.bridge.majsoul.tile_mapping import PAI_ORDER_INDEX
+from akagi_ng.schema.constants import MahjongConstants
+
+_PAI_ORDER = MahjongConstants.PAI_ORDER
+
+
+def _red_counterpart(tile: str) -> str | None:
+    """赤五与普通五互为替代牌；其他牌没有替代牌。"""
+    if tile.endswith("r"):
+        return tile[:-1]
+    red = f"{tile}r"
+    return red if red in PAI_ORDER_INDEX else None
+
+
+class HandCounts:
+    """手牌计数数组。"""
+
+    __slots__ = ("_counts", "_others", "_size")
+
+    def __init__(self, tiles: Iterable[str] = ()):
+        self._counts = [0] * len(_PAI_ORDER)
+        self._others: dict[str, int] = {}
+        self._size = 0
+        for tile in tiles:
+            self.add(tile)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, tile: object) -> bool:
+        return self.count(tile) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        for index, count in enumerate(self._counts):
+            for _ in range(count):
+                yield _PAI_ORDER[index]
+        for tile, count in self._others.items():
+            for _ in range(count):
+                yield tile
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, HandCounts):
+            return self._counts == other._counts and self._others == other._others
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"HandCounts({self.to_list()!r})"
+
+    def count(self, tile: object) -> int:
+        index = PAI_ORDER_INDEX.get(tile)
+        return self._others.get(tile, 0) if index is None else self._counts[index]
+
+    def add(self, tile: str):
+        index = PAI_ORDER_INDEX.get(tile)
+        if index is None:
+            self._others[tile] = self._others.get(tile, 0) + 1
+        else:
+            self._counts[index] += 1
+        self._size += 1
+
+    def remove(self, tile: str) -> bool:
+        """移除一张指定的牌；手中没有时返回 False。"""
+        index = PAI_ORDER_INDEX.get(tile)
+        if index is None:
+            if not self._others.get(tile):
+                return False
+            self._others[tile] -= 1
+            if not self._others[tile]:
+                del self._others[tile]
+        elif self._counts[index]:
+            self._counts[index] -= 1
+        else:
+            return False
+        self._size -= 1
+        return True
+
+    def remove_like(self, tile: str) -> bool:
+        """移除一张牌，优先完全匹配，否则移除赤五/普通五的替代牌。"""
+        if self.remove(tile):
+            return True
+        counterpart = _red_counterpart(tile)
+        return counterpart is not None and self.remove(counterpart)
+
+    def pop_last(self) -> str | None:
+        """移除并返回理牌顺序中最后一张牌。"""
+        if self._others:
+            tile = next(reversed(self._others))
+            self.remove(tile)
+            return tile
+        for index in range(len(self._counts) - 1, -1, -1):
+            if self._counts[index]:
+                self._counts[index] -= 1
+                self._size -= 1
+                return _PAI_ORDER[index]
+        return None
+
+    def to_list(self) -> list[str]:
+        """按理牌顺序展开为列表。"""
+        return list(self)
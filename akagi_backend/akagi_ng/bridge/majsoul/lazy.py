@@ -0,0 +1,129 @@
+"""Protobuf 消息的惰性只读映射视图。
+
+LazyMessage 的键与取值语义与
+``MessageToDict(message, always_print_fields_with_no_presence=True)`` 保持一致（camelCase 键、
+int64 转字符串、枚举转名称、bytes 转 base64），但只在访问某个字段时才转换该字段，
+嵌套消息同样按需包装。Bridge 只读取少数字段，无需把整条消息物化为嵌套 dict。
+"""
+
+import base64
+import functools
+import math
+from collections.abc import Iterator, Mapping
+
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from google.protobuf.internal import type_checkers
+
+_FD = _descriptor.FieldDescriptor
+_INT64_TYPES = frozenset((_FD.CPPTYPE_INT64, _FD.CPPTYPE_UINT64))
+_FLOAT_TYPES = frozenset((_FD.CPPTYPE_FLOAT, _FD.CPPTYPE_DOUBLE))
+
+
+@functools.cache
+def _json_fields(desc: _descriptor.Descriptor) -> dict[str, _descriptor.FieldDescriptor]:
+    return {field.json_name: field for field in desc.fields}
+
+
+def _is_map(field: _descriptor.FieldDescriptor) -> bool:
+    return field.message_type is not None and field.message_type.GetOptions().map_entry
+
+
+def _convert_float(cpp_type: int, value: float) -> float | str:
+    if math.isinf(value):
+        return "-Infinity" if value < 0 else "Infinity"
+    if math.isnan(value):
+        return "NaN"
+    if cpp_type == _FD.CPPTYPE_FLOAT:
+        return type_checkers.ToShortestFloat(value)
+    return value
+
+
+def _convert_scalar(field: _descriptor.FieldDescriptor, value: object) -> object:
+    cpp_type = field.cpp_type
+    if cpp_type == _FD.CPPTYPE_MESSAGE:
+        return LazyMessage(value)
+    if cpp_type == _FD.CPPTYPE_ENUM:
+        enum_value = field.enum_type.values_by_number.get(value)
+        return enum_value.name if enum_value is not None else value
+    if cpp_type == _FD.CPPTYPE_STRING and field.type == _FD.TYPE_BYTES:
+        return base64.b64encode(value).decode("utf-8")
+    if cpp_type in _INT64_TYPES:
+        return str(value)
+    if cpp_type in _FLOAT_TYPES:
+        return _convert_float(cpp_type, value)
+    return value
+
+
+def _convert_field(field: _descriptor.FieldDescriptor, value: object) -> object:
+    if _is_map(field):
+        value_field = field.message_type.fields_by_name["value"]
+        return {
+            ("true" if key else "false") if isinstance(key, bool) else str(key): _convert_scalar(value_field, item)
+            for key, item in value.items()
+        }
+    if field.is_repeated:
+        return [_convert_scalar(field, item) for item in value]
+    return _convert_scalar(field, value)
+
+
+class LazyMessage(Mapping):
+    """Protobuf 消息的惰性只读映射。
+
+    - 通过 ``message`` 属性可直接访问底层 Protobuf 对象（按字段属性读取，最快的路径）。
+    - ``to_dict()`` 物化为与 MessageToDict 相同的普通 dict。
+    """
+
+    __slots__ = ("_cache", "_fields", "_message")
+
+    def __init__(self, message: _message.Message):
+        self._message = message
+        self._fields = _json_fields(message.DESCRIPTOR)
+        self._cache: dict[str, object] = {}
+
+    @property
+    def message(self) -> _message.Message:
+        return self._message
+
+    def _present(self, field: _descriptor.FieldDescriptor) -> bool:
+        # 与 always_print_fields_with_no_presence=True 一致：有显式存在性的字段仅在设置时出现
+        return not field.has_presence or self._message.HasField(field.name)
+
+    def __getitem__(self, key: str) -> object:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        field = self._fields.get(key)
+        if field is None or not self._present(field):
+            raise KeyError(key)
+        value = _convert_field(field, getattr(self._message, field.name))
+        self._cache[key] = value
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        field = self._fields.get(key)
+        return field is not None and self._present(field)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, field in self._fields.items() if self._present(field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict[str, object]:
+        """递归物化为普通 dict。"""
+        return {key: _materialize(value) for key, value in self.items()}
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+
+def _materialize(value: object) -> object:
+    if isinstance(value, LazyMessage):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_materialize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _materialize(item) for key, item in value.items()}
+    return value
@@ -1,6 +1,9 @@
-import json
+import functools
+import math
 import struct
+import sys
 import time
+from collections.abc import Iterable, Mapping
 from enum import IntEnum
 
 from google.protobuf import descriptor_pb2 as _descriptor_pb2
@@ -11,7 +14,10 @@ from google.protobuf.json_format import MessageToDict
 
 from akagi_ng.bridge.logger import logger
 from akagi_ng.bridge.majsoul.consts import LiqiProtocolConstants
-from akagi_ng.core.paths import get_assets_dir
+from akagi_ng.bridge.majsoul.descriptors import load_schema
+from akagi_ng.bridge.majsoul.lazy import LazyMessage
+from akagi_ng.bridge.majsoul.pending import PendingRequests
+from akagi_ng.core.metrics import majsoul_method_timer, timed
 from akagi_ng.schema.protocols import MessageWithContent
 
 
@@ -21,141 +27,63 @@ class MsgType(IntEnum):
     Res = 3
 
 
+def _build_frame_class() -> type[_message.Message]:
+    """外层包装的固定结构，与 liqi.json 中的 Wrapper 一致，但不依赖协议定义的加载。"""
+    fd = _descriptor_pb2.FileDescriptorProto(name="liqi_frame.proto", package="akagi", syntax="proto3")
+    msg = fd.message_type.add(name="LiqiFrame")
+    for number, name in enumerate(("name", "data"), start=1):
+        msg.field.add(
+            name=name,
+            number=number,
+            type=_descriptor_pb2.FieldDescriptorProto.TYPE_BYTES,
+            label=_descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+        )
+    pool = _descriptor_pool.DescriptorPool()
+    pool.Add(fd)
+    return _message_factory.GetMessageClass(pool.FindMessageTypeByName("akagi.LiqiFrame"))
+
+
+LiqiFrame = _build_frame_class()
+_MSG_ID = struct.Struct("<H")
+# 方法名缓存上限；协议中的方法名有限，上限只用于防御畸形数据
+_METHOD_NAME_CACHE_SIZE = 4096
+
+
 keys = [0x84, 0x5E, 0x4E, 0x42, 0x39, 0xA2, 0x1F, 0x60, 0x1C]
 
+# 第 i 字节的密钥为 ((23 ^ len) + 5 * i + keys[i % 9]) & 255。
+# 去掉与长度相关的偏移后只与 i 有关，且以 lcm(256, 9) 为周期，预先生成一个周期
+_KEYSTREAM_PERIOD = math.lcm(256, len(keys))
+_KEYSTREAM_BASE = bytes((5 * i + keys[i % len(keys)]) & 255 for i in range(_KEYSTREAM_PERIOD))
+
 
 class LiqiProto:
-    def __init__(self):
+    """雀魂 Liqi 协议解析器。
+
+    指定 interested_methods 后进入快速路径：其余方法只读取方法名块即跳过，返回的 data 为 None；
+    关注的方法以 LazyMessage 惰性映射返回，而不是经 MessageToDict 物化的嵌套 dict，
+    其解码耗时按方法名记录到 akagi_majsoul_method_latency_seconds{phase="decode"}。
+    未指定时保持完整解析。
+    """
+
+    def __init__(self, interested_methods: Iterable[str] | None = None):
+        self.interested_methods = frozenset(interested_methods) if interested_methods is not None else None
         self.msg_id = 1
         self.parsed_msg_count = 0
         self.last_heartbeat_time = 0.0
-        self.res_type = {}
+        self.res_type = PendingRequests()
         self._msg_cls_cache: dict[str, type[_message.Message]] = {}
-
-        # 动态构建 Protobuf 描述池
-        self.pool = _descriptor_pool.DescriptorPool()
-
-        self.jsonProto = json.loads((get_assets_dir() / "liqi.json").read_text(encoding="utf-8"))
+        self._method_names: dict[bytes, str] = {}
+        self.pool: _descriptor_pool.DescriptorPool | None = None
+        self.jsonProto: dict = {}
 
         self._build_descriptors()
 
     def _build_descriptors(self):
-        """根据 liqi.json 构建 FileDescriptorProto 并注册到描述池。"""
-        fd = _descriptor_pb2.FileDescriptorProto()
-        fd.name = "protocol.proto"
-        fd.package = "lq"
-        fd.syntax = "proto3"
-
-        lq_data = self.jsonProto["nested"]["lq"]["nested"]
-
-        # 类型注册表：full_name -> 是否为枚举
-        type_info: dict[str, bool] = {}
-        self._register_types(lq_data, ".lq", type_info)
-
-        # 构建根级类型
-        for name, obj in lq_data.items():
-            self._build_type(fd, name, obj, type_info)
-
-        self.pool.Add(fd)
-
-    def _register_types(self, nested_data: dict, prefix: str, type_info: dict[str, bool]):
-        for name, obj in nested_data.items():
-            full_name = f"{prefix}.{name}"
-            if "fields" in obj:
-                type_info[full_name] = False
-                if "nested" in obj:
-                    self._register_types(obj["nested"], full_name, type_info)
-            elif "values" in obj:
-                type_info[full_name] = True
-
-    def _build_type(
-        self,
-        parent_proto: _descriptor_pb2.FileDescriptorProto | _descriptor_pb2.DescriptorProto,
-        name: str,
-        obj: dict,
-        type_info: dict[str, bool],
-    ):
-        if "fields" in obj:
-            self._build_message(parent_proto, name, obj, type_info)
-        elif "values" in obj:
-            self._build_enum(parent_proto, name, obj)
-
-    def _build_message(
-        self,
-        parent_proto: _descriptor_pb2.FileDescriptorProto | _descriptor_pb2.DescriptorProto,
-        name: str,
-        obj: dict,
-        type_info: dict[str, bool],
-    ):
-        if hasattr(parent_proto, "nested_type"):
-            msg_desc = parent_proto.nested_type.add()
-        else:
-            msg_desc = parent_proto.message_type.add()
-        msg_desc.name = name
-
-        for f_name, f_obj in obj["fields"].items():
-            self._build_field(msg_desc, f_name, f_obj, type_info)
-
-        if "nested" in obj:
-            for n_name, n_obj in obj["nested"].items():
-                self._build_type(msg_desc, n_name, n_obj, type_info)
-
-    def _build_field(
-        self, msg_desc: _descriptor_pb2.DescriptorProto, f_name: str, f_obj: dict, type_info: dict[str, bool]
-    ):
-        field = msg_desc.field.add()
-        field.name = f_name
-        field.number = f_obj["id"]
-        field.label = (
-            _descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
-            if f_obj.get("rule") == "repeated"
-            else _descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
-        )
-
-        type_map = {
-            "double": _descriptor_pb2.FieldDescriptorProto.TYPE_DOUBLE,
-            "float": _descriptor_pb2.FieldDescriptorProto.TYPE_FLOAT,
-            "int64": _descriptor_pb2.FieldDescriptorProto.TYPE_INT64,
-            "uint64": _descriptor_pb2.FieldDescriptorProto.TYPE_UINT64,
-            "int32": _descriptor_pb2.FieldDescriptorProto.TYPE_INT32,
-            "uint32": _descriptor_pb2.FieldDescriptorProto.TYPE_UINT32,
-            "bool": _descriptor_pb2.FieldDescriptorProto.TYPE_BOOL,
-            "string": _descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
-            "bytes": _descriptor_pb2.FieldDescriptorProto.TYPE_BYTES,
-        }
-
-        p_type = f_obj["type"]
-        if p_type in type_map:
-            field.type = type_map[p_type]
-        else:
-            resolved = self._resolve_type_name(p_type, type_info)
-            field.type_name = resolved
-            field.type = (
-                _descriptor_pb2.FieldDescriptorProto.TYPE_ENUM
-                if type_info.get(resolved, False)
-                else _descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE
-            )
-
-    def _resolve_type_name(self, p_type: str, type_info: dict[str, bool]) -> str:
-        resolved = f".lq.{p_type}"
-        if resolved in type_info:
-            return resolved
-
-        suffix = f".{p_type}"
-        for k in type_info:
-            if k.endswith(suffix):
-                return k
-        return resolved
-
-    def _build_enum(
-        self, parent_proto: _descriptor_pb2.FileDescriptorProto | _descriptor_pb2.DescriptorProto, name: str, obj: dict
-    ):
-        enum_desc = parent_proto.enum_type.add()
-        enum_desc.name = name
-        for v_name, v_id in obj["values"].items():
-            val = enum_desc.value.add()
-            val.name = v_name
-            val.number = v_id
+        """获取 liqi.json 对应的描述池；定义未变化时与其他解析器共享同一份。"""
+        schema = load_schema()
+        self.pool = schema.pool
+        self.jsonProto = schema.json_proto
 
     def get_message_class(self, name: str) -> type[_message.Message] | None:
         """按消息名查找动态生成的 Protobuf 消息类。"""
@@ -174,16 +102,36 @@ class LiqiProto:
         self.msg_id = 1
         self.res_type.clear()
 
-    def _parse_notify(self, msg_block: list[dict]) -> tuple[str, dict]:
+    def _method_name(self, frame: _message.Message) -> str:
+        """方法名块 -> 驻留的方法名字符串；同名方法复用同一对象，下游查表按身份比较即可命中。"""
+        raw = frame.name
+        name = self._method_names.get(raw)
+        if name is None:
+            name = sys.intern(str(raw, "utf-8"))
+            if len(self._method_names) < _METHOD_NAME_CACHE_SIZE:
+                self._method_names[raw] = name
+        return name
+
+    def _wants(self, method_name: str) -> bool:
+        return self.interested_methods is None or method_name in self.interested_methods
+
+    def _to_mapping(self, proto_obj: _message.Message) -> Mapping:
+        if self.interested_methods is None:
+            return MessageToDict(proto_obj, always_print_fields_with_no_presence=True)
+        return LazyMessage(proto_obj)
+
+    def _parse_notify(self, frame: _message.Message) -> tuple[str, Mapping | None]:
         """解析 Notify 类型消息"""
-        method_name = msg_block[0]["data"].decode()
+        method_name = self._method_name(frame)
+        if not self._wants(method_name):
+            return method_name, None
         message_name = method_name.split(".")[-1]
 
         msg_cls = self.get_message_class(message_name)
         if not msg_cls:
             raise AttributeError(f"Unknown Notify Message: {message_name}")
 
-        proto_obj = msg_cls.FromString(msg_block[1]["data"])
+        proto_obj = msg_cls.FromString(frame.data)
 
         # 如果是 ActionPrototype 包装器，避免对外部包装器执行昂贵的实例 Dict 转换。
         if message_name == "ActionPrototype" or (hasattr(proto_obj, "name") and hasattr(proto_obj, "data")):
@@ -196,10 +144,9 @@ class LiqiProto:
                 return method_name, res_dict
 
         # 通用路径
-        dict_obj = MessageToDict(proto_obj, always_print_fields_with_no_presence=True)
-        return method_name, dict_obj
+        return method_name, self._to_mapping(proto_obj)
 
-    def parse_wrapper(self, name: str, data: bytes, use_xor: bool = True) -> dict | None:
+    def parse_wrapper(self, name: str, data: bytes, use_xor: bool = True) -> Mapping | None:
         """解析包装器中的嵌套数据。"""
         cls = self.get_message_class(name)
         if not cls:
@@ -207,21 +154,11 @@ class LiqiProto:
 
         raw_data = decode(data) if use_xor else data
         proto = cls.FromString(raw_data)
-        return MessageToDict(proto, always_print_fields_with_no_presence=True)
+        return self._to_mapping(proto)
 
-    def _parse_request(self, msg_id: int, msg_block: list[dict]) -> tuple[str, dict]:
+    def _parse_request(self, msg_id: int, frame: _message.Message) -> tuple[str, Mapping | None]:
         """解析 Request 类型消息"""
-        if msg_id >= 1 << 16:
-            raise ValueError(f"msg_id {msg_id} exceeds max value")
-        if len(msg_block) != LiqiProtocolConstants.MSG_BLOCK_SIZE:
-            raise ValueError(
-                f"Invalid msg_block size: {len(msg_block)}, expected {LiqiProtocolConstants.MSG_BLOCK_SIZE}"
-            )
-        if msg_id in self.res_type:
-            logger.debug(f"Duplicate msg_id {msg_id}, overwriting previous request")
-            del self.res_type[msg_id]
-
-        method_name = msg_block[0]["data"].decode()
+        method_name = self._method_name(frame)
         parts = method_name.split(".")
         lq = parts[1]
         service = parts[2]
@@ -230,6 +167,12 @@ class LiqiProto:
         if service == "Route" and rpc == "heartbeat":
             self.last_heartbeat_time = time.time()
 
+        if not self._wants(method_name):
+            # 仍需登记 msg_id，对应的响应据此识别并跳过
+            self.res_type[msg_id] = (method_name, None)
+            self.msg_id = msg_id
+            return method_name, None
+
         proto_domain = self.jsonProto["nested"][lq]["nested"][service]["methods"][rpc]
         req_cls = self.get_message_class(proto_domain["requestType"])
         if not req_cls:
@@ -237,53 +180,59 @@ class LiqiProto:
             self.res_type[msg_id] = (method_name, None)
             raise AttributeError(f"Unknown Request Message: {proto_domain['requestType']}")
 
-        proto_obj = req_cls.FromString(msg_block[1]["data"])
-        dict_obj = MessageToDict(proto_obj, always_print_fields_with_no_presence=True)
+        proto_obj = req_cls.FromString(frame.data)
+        dict_obj = self._to_mapping(proto_obj)
 
         res_cls = self.get_message_class(proto_domain["responseType"])
         self.res_type[msg_id] = (method_name, res_cls)
         self.msg_id = msg_id
         return method_name, dict_obj
 
-    def _parse_response(self, msg_id: int, msg_block: list[dict]) -> tuple[str, dict]:
+    def _parse_response(self, msg_id: int, frame: _message.Message) -> tuple[str, Mapping | None]:
         """解析 Response 类型消息"""
-        if len(msg_block[0]["data"]) != LiqiProtocolConstants.EMPTY_DATA_LEN:
-            raise ValueError(f"Response first block not empty, got {len(msg_block[0]['data'])} bytes")
-        if msg_id not in self.res_type:
+        if len(frame.name) != LiqiProtocolConstants.EMPTY_DATA_LEN:
+            raise ValueError(f"Response first block not empty, got {len(frame.name)} bytes")
+        pending = self.res_type.pop(msg_id)
+        if pending is None:
             raise ValueError(f"Response msg_id {msg_id} not found in pending requests")
 
-        method_name, res_cls = self.res_type.pop(msg_id)
+        method_name, res_cls = pending
+        if not self._wants(method_name):
+            return method_name, None
         if res_cls is None:
             logger.warning(f"Unknown Response Message: {method_name}")
             raise AttributeError(f"Unknown Response Message: {method_name}")
 
-        proto_obj = res_cls.FromString(msg_block[1]["data"])
-        dict_obj = MessageToDict(proto_obj, always_print_fields_with_no_presence=True)
-        return method_name, dict_obj
+        proto_obj = res_cls.FromString(frame.data)
+        return method_name, self._to_mapping(proto_obj)
 
+    @timed("liqi.parse")
     def parse(self, flow_msg: bytes | MessageWithContent) -> dict:
         buf: bytes = flow_msg if isinstance(flow_msg, bytes) else flow_msg.content
+        start = time.perf_counter()
         result = {}
         msg_id = -1
         try:
             msg_type = MsgType(buf[0])
             if msg_type == MsgType.Notify:
-                msg_block = from_protobuf(buf[1:])
-                method_name, dict_obj = self._parse_notify(msg_block)
+                frame = split_frame(buf, 1)
+                method_name, dict_obj = self._parse_notify(frame)
                 msg_id = -1
             else:
-                msg_id = struct.unpack("<H", buf[1:3])[0]
-                msg_block = from_protobuf(buf[3:])
+                msg_id = _MSG_ID.unpack_from(buf, 1)[0]
+                frame = split_frame(buf, 3)
                 if msg_type == MsgType.Req:
                     self.msg_id = msg_id
-                    method_name, dict_obj = self._parse_request(msg_id, msg_block)
+                    method_name, dict_obj = self._parse_request(msg_id, frame)
                 elif msg_type == MsgType.Res:
-                    method_name, dict_obj = self._parse_response(msg_id, msg_block)
+                    method_name, dict_obj = self._parse_response(msg_id, frame)
                 else:
                     logger.warning(f"unknown msg type: {buf[0]}")
                     return result
             result = {"id": msg_id, "type": msg_type, "method": method_name, "data": dict_obj}
             self.parsed_msg_count += 1
+            if dict_obj is not None and self.interested_methods is not None:
+                majsoul_method_timer(method_name, "decode").observe(time.perf_counter() - start)
         except Exception as e:
             logger.debug(
                 f"Decode skipped: {type(e).__name__}: {e!s} (msg_id: {msg_id}, type: {buf[0] if buf else 'empty'})"
@@ -292,43 +241,27 @@ class LiqiProto:
         return result
 
 
+@functools.cache
+def _offset_table(offset: int) -> bytes:
+    """bytes.translate 用的查表：每个字节加上 offset (mod 256)。"""
+    return bytes((b + offset) & 255 for b in range(256))
+
+
+def _keystream(length: int) -> bytes:
+    base = _KEYSTREAM_BASE * (length // _KEYSTREAM_PERIOD + 1) if length > _KEYSTREAM_PERIOD else _KEYSTREAM_BASE
+    return base[:length].translate(_offset_table((23 ^ length) & 255))
+
+
 def decode(data: bytes) -> bytes:
-    data = bytearray(data)
-    for i in range(len(data)):
-        u = (23 ^ len(data)) + 5 * i + keys[i % len(keys)] & 255
-        data[i] ^= u
-    return bytes(data)
-
-
-def parse_varint(buf: bytes, p: int) -> tuple[int, int]:
-    data = 0
-    base = 0
-    while p < len(buf):
-        data += (buf[p] & 127) << base
-        base += 7
-        p += 1
-        if buf[p - 1] >> 7 == 0:
-            break
-    return data, p
-
-
-def from_protobuf(buf: bytes) -> list[dict]:
-    p = 0
-    result = []
-    while p < len(buf):
-        block_begin = p
-        block_type = buf[p] & 7
-        block_id = buf[p] >> 3
-        p += 1
-        if block_type == LiqiProtocolConstants.BLOCK_TYPE_VARINT:
-            block_type = "varint"
-            data, p = parse_varint(buf, p)
-        elif block_type == LiqiProtocolConstants.BLOCK_TYPE_STRING:
-            block_type = "string"
-            s_len, p = parse_varint(buf, p)
-            data = buf[p : p + s_len]
-            p += s_len
-        else:
-            raise ValueError(f"unknown pb block type: {block_type}")
-        result.append({"id": block_id, "type": block_type, "data": data, "begin": block_begin})
-    return result
+    """XOR 解码（编码与解码相同）。密钥流由查表生成，异或以大整数一次完成，不逐字节循环。"""
+    length = len(data)
+    stream = int.from_bytes(_keystream(length), "little")
+    return (int.from_bytes(data, "little") ^ stream).to_bytes(length, "little")
+
+
+def split_frame(buf: bytes, start: int = 0) -> _message.Message:
+    """拆分 buf[start:] 处的外层包装，返回 LiqiFrame（name 为方法名，data 为消息体）。
+
+    由 Protobuf 原生解析器完成，输入以 memoryview 切片传入不做拷贝，也不为每个块分配 dict。
+    """
+    return LiqiFrame.FromString(memoryview(buf)[start:])
@@ -0,0 +1,82 @@
+"""Liqi 请求/响应配对表。
+
+请求登记 msg_id -> (方法名, 响应类)，响应到达时按 msg_id 取出。msg_id 为 16 位且会回绕，
+丢失的响应（断线、服务器不回包）若不清理会在全天运行中不断累积，因此：
+- 条目按登记顺序保存在 OrderedDict 中，TTL 固定，所以最早登记的总是最先过期，清理只看表头，均摊 O(1)；
+- 表容量固定，满时淘汰最早的条目；
+- 过期、挤出与同一 msg_id 被覆盖的请求都计为孤儿请求，按原因计数。
+"""
+
+import time
+from collections import OrderedDict
+
+from google.protobuf import message as _message
+
+from akagi_ng.bridge.logger import logger
+from akagi_ng.core.metrics import LIQI_ORPHANED_REQUESTS
+
+MSG_ID_LIMIT = 1 << 16
+DEFAULT_CAPACITY = 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+type PendingEntry = tuple[str, type[_message.Message] | None]
+
+
+class PendingRequests:
+    """容量与存活时间受限的待响应请求表。"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, ttl: float = DEFAULT_TTL_SECONDS):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.orphaned = 0
+        # msg_id -> (登记时间, 方法名, 响应类)；表头即最早登记的条目
+        self._entries: OrderedDict[int, tuple[float, str, type[_message.Message] | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, msg_id: object) -> bool:
+        return msg_id in self._entries
+
+    def __getitem__(self, msg_id: int) -> PendingEntry:
+        _, method_name, res_cls = self._entries[msg_id]
+        return method_name, res_cls
+
+    def __setitem__(self, msg_id: int, entry: PendingEntry):
+        self.put(msg_id, *entry)
+
+    def put(self, msg_id: int, method_name: str, res_cls: type[_message.Message] | None):
+        """登记一个请求；同一 msg_id 尚未响应时旧请求作废。"""
+        if not 0 <= msg_id < MSG_ID_LIMIT:
+            raise ValueError(f"msg_id {msg_id} exceeds max value")
+        now = time.monotonic()
+        self._expire(now)
+        if self._entries.pop(msg_id, None) is not None:
+            logger.debug(f"Duplicate msg_id {msg_id}, overwriting previous request")
+            self._orphan("overwritten")
+        while len(self._entries) >= self.capacity:
+            self._entries.popitem(last=False)
+            self._orphan("evicted")
+        self._entries[msg_id] = (now, method_name, res_cls)
+
+    def pop(self, msg_id: int) -> PendingEntry | None:
+        """取出并移除 msg_id 对应的请求；不存在或已过期时返回 None。"""
+        self._expire(time.monotonic())
+        entry = self._entries.pop(msg_id, None)
+        if entry is None:
+            return None
+        _, method_name, res_cls = entry
+        return method_name, res_cls
+
+    def clear(self):
+        self._entries.clear()
+
+    def _expire(self, now: float):
+        deadline = now - self.ttl
+        while self._entries and self._entries[next(iter(self._entries))][0] <= deadline:
+            self._entries.popitem(last=False)
+            self._orphan("expired")
+
+    def _orphan(self, reason: str):
+        self.orphaned += 1
+        LIQI_ORPHANED_REQUESTS.labels(reason).inc()
@@ -0,0 +1,74 @@
+"""录制帧回放器。
+
+将 `akagi_ng.core.capture` 录制的原始帧按原顺序重新送入同平台的 Bridge，
+可按原始节奏（speed=1.0）、倍速或最大速度（speed=None）回放，用于复现问题与压测。
+"""
+
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from akagi_ng.bridge.amatsuki import AmatsukiBridge
+from akagi_ng.bridge.base import BaseBridge
+from akagi_ng.bridge.logger import logger
+from akagi_ng.bridge.majsoul import MajsoulBridge
+from akagi_ng.bridge.riichi_city import RiichiCityBridge
+from akagi_ng.bridge.tenhou import TenhouBridge
+from akagi_ng.core.capture import CaptureFrame, capture_platform, iter_capture
+from akagi_ng.schema.constants import Platform
+from akagi_ng.schema.types import AkagiEvent
+
+BRIDGE_CLASSES: dict[Platform, type[BaseBridge]] = {
+    Platform.MAJSOUL: MajsoulBridge,
+    Platform.TENHOU: TenhouBridge,
+    Platform.AMATSUKI: AmatsukiBridge,
+    Platform.RIICHI_CITY: RiichiCityBridge,
+}
+
+
+def create_bridge(platform: Platform | str) -> BaseBridge:
+    """根据平台创建对应的 Bridge 实例。"""
+    bridge_cls = BRIDGE_CLASSES.get(Platform(platform))
+    if bridge_cls is None:
+        raise ValueError(f"Unsupported platform: {platform}")
+    return bridge_cls()
+
+
+def iter_frames(paths: Iterable[Path], speed: float | None = None) -> Iterator[CaptureFrame]:
+    """按顺序读取多个分片；speed 不为 None 时按录制时间间隔（除以 speed）休眠。"""
+    first_ts: float | None = None
+    started = time.perf_counter()
+    for path in paths:
+        for frame in iter_capture(path):
+            if speed is not None and speed > 0:
+                if first_ts is None:
+                    first_ts = frame.timestamp
+                delay = (frame.timestamp - first_ts) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            yield frame
+
+
+def replay_capture(
+    paths: Iterable[Path],
+    bridge: BaseBridge | None = None,
+    speed: float | None = None,
+) -> Iterator[AkagiEvent]:
+    """将录制帧送入 Bridge 并逐个产出解析得到的事件。
+
+    Args:
+        paths: 同一连接的分片文件，按顺序排列
+        bridge: 目标 Bridge；为 None 时根据首个分片 header 中的平台自动创建
+        speed: None 表示最大速度，1.0 表示原速
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    if bridge is None:
+        bridge = create_bridge(capture_platform(paths[0]))
+
+    frames = 0
+    for frame in iter_frames(paths, speed):
+        frames += 1
+        yield from bridge.iter_parse(frame.data)
+    logger.info(f"Replayed {frames} frames from {len(paths)} capture file(s).")
@@ -3,7 +3,7 @@ import json
 from akagi_ng.bridge.base import BaseBridge
 from akagi_ng.bridge.logger import logger
 from akagi_ng.bridge.riichi_city.consts import CARD2MJAI, RCAction, RCProtocol
-from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.schema.constants import MahjongConstants, Platform
 from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.types import AkagiEvent, MJAIEvent
 
@@ -37,6 +37,8 @@ class GameStatus:
 
 
 class RiichiCityBridge(BaseBridge):
+    platform = Platform.RIICHI_CITY
+
     def __init__(self):
         super().__init__()
         self.uid: int = -1
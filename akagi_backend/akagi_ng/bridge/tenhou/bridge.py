@@ -13,12 +13,14 @@ from akagi_ng.bridge.tenhou.utils.converter import (
 from akagi_ng.bridge.tenhou.utils.decoder import Meld, MeldType, parse_sc_tag
 from akagi_ng.bridge.tenhou.utils.judrdy import isrh
 from akagi_ng.bridge.tenhou.utils.state import State
-from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.schema.constants import MahjongConstants, Platform
 from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.types import AkagiEvent, MJAIEvent, RyukyokuEvent
 
 
 class TenhouBridge(BaseBridge):
+    platform = Platform.TENHOU
+
     def __init__(self):
         super().__init__()
         self.state = State()
@@ -0,0 +1,239 @@
+"""原始 WebSocket 帧录制格式。
+
+用于复现性能问题：按到达顺序记录送入 Bridge 的原始帧，之后可通过
+`akagi_ng.bridge.replay` 以原速或最大速度回放。
+
+文件格式（小端序）::
+
+    header : MAGIC(4) | version u8 | flags u8 | platform_len u16 | platform utf-8
+    record : timestamp f64 | direction u8 | length u32 | payload
+
+flags 的 bit0 表示 header 之后的记录流整体经过 zstd 流式压缩。
+单个文件写入的未压缩字节数超过上限时滚动到下一个分片（`_001`、`_002` ...），
+每个分片都带有完整 header，可以独立读取。
+写入失败（磁盘已满、权限等）时记录一次错误并停止录制，不影响 Bridge 解析。
+
+通过环境变量开启录制：
+
+- AKAGI_CAPTURE=1           开启录制
+- AKAGI_CAPTURE_DIR         输出目录（默认 logs/captures）
+- AKAGI_CAPTURE_MAX_MB      单个分片上限（默认 64）
+- AKAGI_CAPTURE_ZSTD=1      使用 zstd 压缩（需要 zstandard）
+"""
+
+import contextlib
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import BinaryIO, NamedTuple
+
+from akagi_ng.core.logging import logger
+from akagi_ng.core.paths import ensure_dir, get_logs_dir
+
+logger = logger.bind(module="capture")
+
+MAGIC = b"AKCP"
+VERSION = 1
+FLAG_ZSTD = 0x01
+CAPTURE_SUFFIX = ".akcap"
+
+_HEADER = struct.Struct("<4sBBH")
+_RECORD = struct.Struct("<dBI")
+
+DIRECTION_INBOUND = 0  # 服务端 -> 客户端
+DIRECTION_OUTBOUND = 1  # 客户端 -> 服务端
+
+
+class CaptureFrame(NamedTuple):
+    timestamp: float
+    outbound: bool
+    data: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class CaptureConfig:
+    directory: Path
+    max_bytes: int = 64 * 1024 * 1024
+    compress: bool = False
+
+
+def capture_config_from_env() -> CaptureConfig | None:
+    """从环境变量读取录制配置，未开启时返回 None。"""
+    if os.environ.get("AKAGI_CAPTURE") != "1":
+        return None
+    directory = Path(os.environ.get("AKAGI_CAPTURE_DIR") or get_logs_dir() / "captures")
+    max_mb = float(os.environ.get("AKAGI_CAPTURE_MAX_MB", "64"))
+    compress = os.environ.get("AKAGI_CAPTURE_ZSTD") == "1"
+    return CaptureConfig(directory=directory, max_bytes=int(max_mb * 1024 * 1024), compress=compress)
+
+
+def _load_zstd() -> ModuleType | None:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class CaptureWriter:
+    """线程安全的帧录制器。写入路径只做一次 struct 打包与缓冲写；写入出错后自动停用。"""
+
+    def __init__(self, config: CaptureConfig, platform: str, tag: str = ""):
+        self.config = config
+        self.platform = str(platform)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.prefix = f"{self.platform}_{stamp}" + (f"_{tag}" if tag else "")
+        self.paths: list[Path] = []
+        self.frames = 0
+        self.disabled = False
+
+        self._compress = config.compress
+        if self._compress and _load_zstd() is None:
+            logger.warning("zstandard is not installed, capture will be written uncompressed.")
+            self._compress = False
+
+        self._lock = threading.Lock()
+        self._file: BinaryIO | None = None
+        self._stream: BinaryIO | None = None
+        self._written = 0
+        ensure_dir(config.directory)
+        self._open_next()
+
+    def _open_next(self):
+        path = self.config.directory / f"{self.prefix}_{len(self.paths):03d}{CAPTURE_SUFFIX}"
+        platform = self.platform.encode()
+        flags = FLAG_ZSTD if self._compress else 0
+
+        self._file = path.open("wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, flags, len(platform)) + platform)
+        if self._compress:
+            self._stream = _load_zstd().ZstdCompressor(level=3).stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+        self._written = 0
+        self.paths.append(path)
+        logger.info(f"Capture recording to {path}")
+
+    def _close_current(self):
+        stream, file = self._stream, self._file
+        self._stream = None
+        self._file = None
+        try:
+            if stream is not None and stream is not file:
+                stream.close()
+        finally:
+            if file is not None:
+                file.close()
+
+    def _disable(self):
+        """写入失败后停止录制。调用方持有 _lock。"""
+        logger.exception(f"Capture write to {self.paths[-1] if self.paths else self.prefix} failed, recording disabled")
+        self.disabled = True
+        with contextlib.suppress(OSError):
+            self._close_current()
+
+    def write(self, data: bytes, outbound: bool = False, timestamp: float | None = None):
+        record = _RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            DIRECTION_OUTBOUND if outbound else DIRECTION_INBOUND,
+            len(data),
+        )
+        with self._lock:
+            if self._stream is None:
+                return
+            try:
+                if self._written and self._written + len(record) + len(data) > self.config.max_bytes:
+                    self._close_current()
+                    self._open_next()
+                self._stream.write(record)
+                self._stream.write(data)
+            except OSError:
+                self._disable()
+                return
+            self._written += len(record) + len(data)
+            self.frames += 1
+
+    def close(self):
+        with self._lock:
+            try:
+                self._close_current()
+            except OSError:
+                self._disable()
+
+
+def open_capture(platform: str, tag: str = "") -> CaptureWriter | None:
+    """按环境变量配置创建录制器；未开启或创建失败时返回 None，不影响主流程。"""
+    config = capture_config_from_env()
+    if config is None:
+        return None
+    try:
+        return CaptureWriter(config, platform, tag)
+    except OSError:
+        logger.exception("Failed to open capture file")
+        return None
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes | None:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_capture_header(f: BinaryIO) -> tuple[str, int]:
+    """读取并校验 header，返回 (platform, flags)。"""
+    head = _read_exact(f, _HEADER.size)
+    if head is None:
+        raise ValueError("Truncated capture header")
+    magic, version, flags, platform_len = _HEADER.unpack(head)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not an Akagi capture file (magic={magic!r}, version={version})")
+    platform = _read_exact(f, platform_len)
+    if platform is None:
+        raise ValueError("Truncated capture header")
+    return platform.decode(), flags
+
+
+def iter_capture(path: Path) -> Iterator[CaptureFrame]:
+    """按顺序读取单个分片中的帧。尾部不完整的记录（进程被强制终止时）会被忽略。"""
+    with path.open("rb") as f:
+        _, flags = read_capture_header(f)
+        if not flags & FLAG_ZSTD:
+            yield from _iter_records(f)
+            return
+
+        zstd = _load_zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read compressed captures")
+        try:
+            yield from _iter_records(zstd.ZstdDecompressor().stream_reader(f))
+        except zstd.ZstdError:
+            logger.warning(f"Capture {path} ends with an incomplete zstd frame.")
+
+
+def _iter_records(stream: BinaryIO) -> Iterator[CaptureFrame]:
+    while True:
+        head = _read_exact(stream, _RECORD.size)
+        if head is None:
+            return
+        timestamp, direction, length = _RECORD.unpack(head)
+        data = _read_exact(stream, length)
+        if data is None:
+            return
+        yield CaptureFrame(timestamp, direction == DIRECTION_OUTBOUND, data)
+
+
+def capture_platform(path: Path) -> str:
+    with path.open("rb") as f:
+        return read_capture_header(f)[0]
@@ -0,0 +1,233 @@
+"""决策日志：以列式格式追加记录每次决策，供赛后分析。
+
+Reactor 线程只把 (时间戳, 事件序号, 耗时, meta) 放入队列；列的展开、攒批与写盘都在后台线程完成。
+
+文件格式::
+
+    header : MAGIC(4) | version u8 | header_len u32 | header JSON (列名、dtype、形状)
+    batch  : 按 header 中的列顺序依次写入的 .npy 数组（numpy.lib.format），每列一个
+
+每个 batch 是一组等长的列（类似 Arrow 的 record batch），读取端逐批 np.load 即可，
+无需解析文本日志。进程异常退出时尾部不完整的 batch 会被忽略。
+
+三麻与四麻的动作空间维度和标签不同（三麻 44 维，拔北位于四麻吃/杠的位置），
+每行以 is_3p 列区分；q_values 列按四麻的 46 维存储，三麻行多出的维度为 NaN。
+header 中记录两种模式的维度与标签，top_k 下标需按所在行的模式解读（见 top_k_labels）。
+
+通过环境变量开启：
+
+- AKAGI_DECISION_LOG=1        开启记录
+- AKAGI_DECISION_LOG_DIR      输出目录（默认 logs/decisions）
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from akagi_ng.core.logging import logger
+from akagi_ng.core.paths import ensure_dir, get_logs_dir
+from akagi_ng.schema.constants import ModelConstants
+from akagi_ng.schema.types import MJAIResponse
+
+logger = logger.bind(module="decision_log")
+
+MAGIC = b"AKDL"
+VERSION = 2
+DECISION_LOG_SUFFIX = ".akdl"
+TOP_K = 3
+
+_HEADER = struct.Struct("<4sBI")
+_ACTION_DIMS = max(ModelConstants.ACTION_DIMS_4P, ModelConstants.ACTION_DIMS_3P)
+_ACTION_SPACES: dict[bool, tuple[int, tuple[str, ...]]] = {
+    False: (ModelConstants.ACTION_DIMS_4P, ModelConstants.ACTION_LABELS_4P),
+    True: (ModelConstants.ACTION_DIMS_3P, ModelConstants.ACTION_LABELS_3P),
+}
+
+# (列名, dtype, 每行形状)
+COLUMNS: tuple[tuple[str, str, tuple[int, ...]], ...] = (
+    ("timestamp", "<f8", ()),
+    ("event", "<i8", ()),
+    ("latency_ms", "<f4", ()),
+    ("action", "<U12", ()),
+    ("engine_type", "<U8", ()),
+    ("fallback_used", "|b1", ()),
+    ("circuit_open", "|b1", ()),
+    ("is_greedy", "|b1", ()),
+    ("shanten", "|i1", ()),
+    ("is_3p", "|b1", ()),
+    ("mask_bits", "<u8", ()),
+    ("top_k", "<i2", (TOP_K,)),
+    ("q_values", "<f4", (_ACTION_DIMS,)),
+)
+
+
+def _expand_q_values(q_values: list[float], mask_bits: int, is_3p: bool = False) -> np.ndarray:
+    """meta 中的 q_values 只包含合法动作，按 mask_bits 展开到该模式的完整动作空间，非法动作为 NaN。"""
+    dims, _ = _ACTION_SPACES[is_3p]
+    row = np.full(_ACTION_DIMS, np.nan, dtype=np.float32)
+    legal = [i for i in range(dims) if mask_bits >> i & 1]
+    count = min(len(legal), len(q_values))
+    row[legal[:count]] = q_values[:count]
+    return row
+
+
+def _top_k(row: np.ndarray) -> np.ndarray:
+    result = np.full(TOP_K, -1, dtype=np.int16)
+    legal = np.flatnonzero(~np.isnan(row))
+    order = legal[np.argsort(row[legal])[::-1][:TOP_K]]
+    result[: len(order)] = order
+    return result
+
+
+class DecisionSink:
+    """后台线程攒批写入的决策日志。record() 不做任何 IO，可在 Reactor 热路径调用。"""
+
+    def __init__(self, path: Path, flush_rows: int = 1024, flush_interval: float = 2.0):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+
+        self._queue: queue.SimpleQueue[tuple | None] = queue.SimpleQueue()
+        self._rows: list[tuple] = []
+        self._file: BinaryIO = path.open("wb")
+        self._write_header()
+        self._thread = threading.Thread(target=self._run, name="DecisionSink", daemon=True)
+        self._thread.start()
+        logger.info(f"Decision log recording to {path}")
+
+    def _write_header(self):
+        header = json.dumps(
+            {
+                "columns": [{"name": name, "dtype": dtype, "shape": list(shape)} for name, dtype, shape in COLUMNS],
+                "action_dims": {"4p": _ACTION_SPACES[False][0], "3p": _ACTION_SPACES[True][0]},
+                "action_labels": {"4p": _ACTION_SPACES[False][1], "3p": _ACTION_SPACES[True][1]},
+            }
+        ).encode()
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(header)) + header)
+        self._file.flush()
+
+    def record(self, event: int, response: MJAIResponse, latency: float, is_3p: bool = False):
+        """登记一次决策。response 需包含 meta，否则忽略。"""
+        if meta := response.get("meta"):
+            self._queue.put((time.time(), event, latency, response.get("type", "none"), meta, is_3p))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    pass
+                else:
+                    if item is None:
+                        break
+                    self._rows.append(item)
+                if len(self._rows) >= self.flush_rows or (
+                    self._rows and time.monotonic() - last_flush >= self.flush_interval
+                ):
+                    self._flush()
+                    last_flush = time.monotonic()
+        except Exception:
+            logger.exception("Decision log writer failed")
+        finally:
+            try:
+                self._flush()
+            finally:
+                self._file.close()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        columns = self._build_columns(rows)
+        for name, _dtype, _shape in COLUMNS:
+            np.lib.format.write_array(self._file, columns[name], allow_pickle=False)
+        self._file.flush()
+        self.rows_written += len(rows)
+
+    @staticmethod
+    def _build_columns(rows: list[tuple]) -> dict[str, np.ndarray]:
+        columns = {name: np.zeros((len(rows), *shape), dtype=dtype) for name, dtype, shape in COLUMNS}
+        for i, (timestamp, event, latency, action, meta, is_3p) in enumerate(rows):
+            mask_bits = meta.get("mask_bits", 0)
+            q_values = _expand_q_values(meta.get("q_values", []), mask_bits, is_3p)
+            columns["timestamp"][i] = timestamp
+            columns["event"][i] = event
+            columns["latency_ms"][i] = latency * 1000.0
+            columns["action"][i] = action
+            columns["engine_type"][i] = meta.get("engine_type", "unknown")
+            columns["fallback_used"][i] = meta.get("fallback_used", False)
+            columns["circuit_open"][i] = meta.get("online_service_reconnecting", False)
+            columns["is_greedy"][i] = meta.get("is_greedy", True)
+            columns["shanten"][i] = meta.get("shanten", -1)
+            columns["is_3p"][i] = is_3p
+            columns["mask_bits"][i] = mask_bits
+            columns["q_values"][i] = q_values
+            columns["top_k"][i] = _top_k(q_values)
+        return columns
+
+
+def open_decision_sink() -> DecisionSink | None:
+    """按环境变量创建决策日志；未开启或创建失败时返回 None。"""
+    if os.environ.get("AKAGI_DECISION_LOG") != "1":
+        return None
+    directory = ensure_dir(Path(os.environ.get("AKAGI_DECISION_LOG_DIR") or get_logs_dir() / "decisions"))
+    path = directory / f"decisions_{datetime.now():%Y%m%d_%H%M%S}{DECISION_LOG_SUFFIX}"
+    try:
+        return DecisionSink(path)
+    except OSError:
+        logger.exception("Failed to open decision log")
+        return None
+
+
+def iter_decision_batches(path: Path) -> Iterator[dict[str, np.ndarray]]:
+    """逐批读取决策日志，每批为 {列名: 数组}。"""
+    with path.open("rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            raise ValueError("Truncated decision log header")
+        magic, version, header_len = _HEADER.unpack(head)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an Akagi decision log (magic={magic!r}, version={version})")
+        names = [column["name"] for column in json.loads(f.read(header_len))["columns"]]
+
+        while True:
+            batch = {}
+            try:
+                for name in names:
+                    batch[name] = np.lib.format.read_array(f, allow_pickle=False)
+            except ValueError:
+                # EOF 或尾部不完整的 batch
+                return
+            yield batch
+
+
+def read_decision_log(path: Path) -> dict[str, np.ndarray]:
+    """读取全部批次并按列拼接。"""
+    batches = list(iter_decision_batches(path))
+    if not batches:
+        return {name: np.zeros((0, *shape), dtype=dtype) for name, dtype, shape in COLUMNS}
+    return {name: np.concatenate([b[name] for b in batches]) for name in batches[0]}
+
+
+def top_k_labels(data: dict[str, np.ndarray]) -> list[list[str]]:
+    """按每行所属模式（三麻/四麻）的动作标签解读 top_k 列。"""
+    return [
+        [_ACTION_SPACES[bool(is_3p)][1][index] for index in row if index >= 0]
+        for row, is_3p in zip(data["top_k"], data["is_3p"], strict=True)
+    ]
@@ -13,7 +13,7 @@ log_file = LOG_DIR / f"akagi_{datetime.now():%Y%m%d_%H%M%S}.log"
 LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | {extra[module]} | {message}"
 
 
-def configure_logging(level: str = "INFO"):
+def configure_logging(level: str = "INFO", console: bool | None = None):
     """配置日志系统
 
     日志行为说明:
@@ -26,6 +26,9 @@ def configure_logging(level: str = "INFO"):
     2. Electron 环境可以实时捕获日志,包括退出日志
     3. 遵循 Unix 惯例: stdout 用于正常输出,stderr 用于错误
     4. 开发调试时可以通过设置环境变量来控制行为
+
+    console 显式指定是否输出到 stdout；为 None 时按 AKAGI_GUI_MODE 判断。
+    Headless 模式下 stdout 用于输出数据，传入 False。
     """
     logger.remove()
 
@@ -39,7 +42,9 @@ def configure_logging(level: str = "INFO"):
     # 仅在 GUI 模式下输出到 stdout (供 Electron 捕获)
     # 使用 stdout 而不是 stderr,因为这些是正常的日志输出,不是错误
     # 生产环境或直接运行时不会设置此环境变量,因此不会输出到 stdout
-    if os.getenv("AKAGI_GUI_MODE") == "1":
+    if console is None:
+        console = os.getenv("AKAGI_GUI_MODE") == "1"
+    if console:
         logger.add(
             sys.stdout,
             level=level,
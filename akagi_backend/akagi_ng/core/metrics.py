@@ -0,0 +1,427 @@
+"""进程内轻量指标注册表，按 Prometheus 文本格式导出。
+
+热路径只写入当前线程独占的分片，不持有任何锁；抓取 /metrics 时再汇总各线程分片。
+"""
+
+import bisect
+import functools
+import math
+import threading
+import time
+from collections.abc import Callable
+
+type LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class _ShardedCells:
+    """按线程分片的累加单元。
+
+    每个线程只修改自己的分片（dict.setdefault 在 GIL 下是原子的），
+    读取方对所有分片求和，因此写入路径完全无锁。
+    """
+
+    __slots__ = ("_shards", "_size")
+
+    def __init__(self, size: int = 1):
+        self._size = size
+        self._shards: dict[int, list[float]] = {}
+
+    def cells(self) -> list[float]:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, [0.0] * self._size)
+        return shard
+
+    def snapshot(self) -> list[float]:
+        total = [0.0] * self._size
+        for shard in list(self._shards.values()):
+            for i, value in enumerate(shard):
+                total[i] += value
+        return total
+
+
+class _CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _ShardedCells()
+
+    def inc(self, amount: float = 1.0):
+        self._cells.cells()[0] += amount
+
+    def get(self) -> float:
+        return self._cells.snapshot()[0]
+
+
+class _GaugeChild:
+    __slots__ = ("_function", "_value")
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Callable[[], float] | None):
+        """注册在抓取时求值的回调，热路径无需维护该值。"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is not None:
+            return float(self._function())
+        return self._value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        # 布局：[count, sum, bucket_0, ..., bucket_n(+Inf)]
+        self._cells = _ShardedCells(len(bounds) + 3)
+
+    def observe(self, value: float):
+        cells = self._cells.cells()
+        cells[0] += 1
+        cells[1] += value
+        cells[2 + bisect.bisect_left(self._bounds, value)] += 1
+
+    def snapshot(self) -> tuple[float, float, list[float]]:
+        """返回 (count, sum, 累积桶计数)。"""
+        total = self._cells.snapshot()
+        cumulative = []
+        running = 0.0
+        for bucket in total[2:]:
+            running += bucket
+            cumulative.append(running)
+        return total[0], total[1], cumulative
+
+
+type _Child = _CounterChild | _GaugeChild | _HistogramChild
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[LabelValues, _Child] = {}
+        if not labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> _Child:
+        raise NotImplementedError
+
+    def _child(self, values: tuple[object, ...]) -> _Child:
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self):
+        """移除所有带标签的子项（用于按抓取时刻重建的动态标签）。"""
+        if self.labelnames:
+            self._children.clear()
+
+    def _unlabeled(self) -> _Child:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self._children[()]
+
+    def _items(self) -> list[tuple[LabelValues, _Child]]:
+        return list(self._children.items())
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self._items():
+            lines.extend(self._render_child(self._format_labels(key), child))
+        return lines
+
+    def _render_child(self, labels: str, child: _Child) -> list[str]:
+        raise NotImplementedError
+
+    def _format_labels(self, key: LabelValues, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = [*zip(self.labelnames, key, strict=True), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def labels(self, *values: object) -> _CounterChild:
+        return self._child(values)
+
+    def inc(self, amount: float = 1.0):
+        self._unlabeled().inc(amount)
+
+    def get(self) -> float:
+        return self._unlabeled().get()
+
+    def _render_child(self, labels: str, child: _CounterChild) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def labels(self, *values: object) -> _GaugeChild:
+        return self._child(values)
+
+    def set(self, value: float):
+        self._unlabeled().set(value)
+
+    def set_function(self, function: Callable[[], float] | None):
+        self._unlabeled().set_function(function)
+
+    def get(self) -> float:
+        return self._unlabeled().get()
+
+    def _render_child(self, labels: str, child: _GaugeChild) -> list[str]:
+        return [f"{self.name}{labels} {_format_value(child.get())}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values: object) -> _HistogramChild:
+        return self._child(values)
+
+    def observe(self, value: float):
+        self._unlabeled().observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self._items():
+            count, total, cumulative = child.snapshot()
+            for bound, value in zip((*self.buckets, math.inf), cumulative, strict=True):
+                labels = self._format_labels(key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(value)}")
+            labels = self._format_labels(key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表。同名指标重复声明时返回已有实例，便于各模块在导入时声明。"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[_Metric], name: str, *args: object) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """注册抓取前回调，用于刷新只在抓取时才需要计算的指标。"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """以 Prometheus 文本格式 (0.0.4) 导出所有指标。"""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+
+        for collector in collectors:
+            collector()
+
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def merge_exposition(*texts: str) -> str:
+    """合并多个注册表导出的 Prometheus 文本（多进程模式下各进程各有一份注册表）。
+
+    同一指标族只保留一份 HELP/TYPE，名称与标签完全相同的样本取和：计数器、直方图桶与连接数
+    都是可加量，某进程未使用的指标恒为 0，求和即为整体取值。
+    """
+    families: dict[str, tuple[list[str], dict[str, float]]] = {}
+    header, samples = families.setdefault("", ([], {}))
+    for text in texts:
+        for line in text.splitlines():
+            if line.startswith("# "):
+                header, samples = families.setdefault(line.split(" ", 3)[2], ([], {}))
+                if line not in header:
+                    header.append(line)
+            elif line:
+                key, _, value = line.rpartition(" ")
+                samples[key] = samples.get(key, 0.0) + float(value)
+
+    lines: list[str] = []
+    for header, samples in families.values():
+        lines.extend(header)
+        lines.extend(f"{key} {_format_value(value)}" for key, value in samples.items())
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# ==========================================================
+# 核心指标定义
+
+MESSAGE_QUEUE_DEPTH = registry.gauge("akagi_message_queue_depth", "Pending events in the reactor message queue.")
+BRIDGE_EVENTS = registry.counter(
+    "akagi_bridge_events_total", "Events produced by platform bridges.", labelnames=("platform",)
+)
+EVENTS_DROPPED = registry.counter(
+    "akagi_events_dropped_total", "Events dropped because a queue was full.", labelnames=("source",)
+)
+INFERENCE_LATENCY = registry.histogram(
+    "akagi_inference_latency_seconds", "Engine react_batch latency.", labelnames=("engine_type",)
+)
+OT_CIRCUIT_OPEN = registry.gauge("akagi_ot_circuit_open", "AkagiOT circuit breaker state (1 = open).")
+ENGINE_FALLBACKS = registry.counter("akagi_engine_fallback_total", "Online engine failures that fell back to local.")
+SSE_CLIENTS = registry.gauge("akagi_sse_clients", "Connected SSE clients.")
+SSE_CLIENT_QUEUE_FILL = registry.gauge(
+    "akagi_sse_client_queue_fill_ratio", "Fill ratio of each SSE client queue.", labelnames=("client_id",)
+)
+WS_CLIENTS = registry.gauge("akagi_ws_clients", "Connected WebSocket clients.", labelnames=("format",))
+LIQI_ORPHANED_REQUESTS = registry.counter(
+    "akagi_liqi_orphaned_requests_total", "Majsoul requests dropped without a response.", labelnames=("reason",)
+)
+MAJSOUL_METHOD_LATENCY = registry.histogram(
+    "akagi_majsoul_method_latency_seconds",
+    "Majsoul per-method decode/handle latency.",
+    labelnames=("method", "phase"),
+)
+STAGE_LATENCY = registry.histogram(
+    "akagi_stage_latency_seconds", "Latency of instrumented hot-path stages.", labelnames=("stage",)
+)
+
+
+def timed[**P, R](stage: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """热路径耗时装饰器，结果记录到 akagi_stage_latency_seconds{stage=...}。
+
+    异常调用同样计入，便于观察失败路径的耗时。
+    """
+    child = STAGE_LATENCY.labels(stage)
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@functools.cache
+def majsoul_method_timer(method: str, phase: str) -> _HistogramChild:
+    """雀魂按方法名的耗时直方图子项，缓存标签查找。方法名来自协议定义，数量有限。"""
+    return MAJSOUL_METHOD_LATENCY.labels(method, phase)
+
+
+__all__ = [
+    "BRIDGE_EVENTS",
+    "ENGINE_FALLBACKS",
+    "EVENTS_DROPPED",
+    "INFERENCE_LATENCY",
+    "LIQI_ORPHANED_REQUESTS",
+    "MAJSOUL_METHOD_LATENCY",
+    "MESSAGE_QUEUE_DEPTH",
+    "OT_CIRCUIT_OPEN",
+    "SSE_CLIENTS",
+    "SSE_CLIENT_QUEUE_FILL",
+    "STAGE_LATENCY",
+    "WS_CLIENTS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "majsoul_method_timer",
+    "registry",
+    "timed",
+]
@@ -0,0 +1,122 @@
+"""进程内采样分析器。
+
+周期性读取 `sys._current_frames()` 获取所有线程的调用栈，按线程名聚合为
+collapsed-stack 文本（每行 `线程;帧;帧;... 次数`），可直接交给 flamegraph.pl /
+speedscope 等工具生成火焰图。无需重启进程即可在运行时开启与关闭。
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from akagi_ng.core.logging import logger
+
+logger = logger.bind(module="profiler")
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+MAX_DURATION_SECONDS = 300.0
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def _collapse(frame: FrameType | None) -> list[str]:
+    stack: list[str] = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """线程感知的采样分析器。
+
+    采样线程自身不计入结果；同一时刻只允许一次采样会话。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._samples: Counter[str] = Counter()
+        self._sample_count = 0
+        self._started_at = 0.0
+        self._finished_at = 0.0
+        self.interval = DEFAULT_INTERVAL_SECONDS
+        self.duration = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float, interval: float = DEFAULT_INTERVAL_SECONDS) -> bool:
+        """开始采样，持续 duration 秒后自动停止。已在运行时返回 False。"""
+        with self._lock:
+            if self.running:
+                return False
+
+            self.duration = min(max(duration, 0.0), MAX_DURATION_SECONDS)
+            self.interval = max(interval, 0.001)
+            self._samples = Counter()
+            self._sample_count = 0
+            self._started_at = time.time()
+            self._finished_at = 0.0
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self._thread.start()
+
+        logger.info(f"Sampling profiler started (duration={self.duration}s, interval={self.interval}s)")
+        return True
+
+    def stop(self):
+        """提前结束采样并等待采样线程退出。"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + self.duration
+        try:
+            while not self._stop_event.is_set() and time.monotonic() < deadline:
+                self._sample(own_ident)
+                self._stop_event.wait(self.interval)
+        finally:
+            self._finished_at = time.time()
+            logger.info(f"Sampling profiler stopped ({self._sample_count} samples)")
+
+    def _sample(self, own_ident: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            thread_name = names.get(ident, f"thread-{ident}")
+            key = ";".join([thread_name, *_collapse(frame)])
+            self._samples[key] += 1
+        self._sample_count += 1
+
+    def collapsed(self) -> str:
+        """返回 collapsed-stack 格式的结果文本。"""
+        samples = list(self._samples.items())
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(samples))
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "samples": self._sample_count,
+            "duration": self.duration,
+            "interval": self.interval,
+            "started_at": self._started_at,
+            "finished_at": self._finished_at,
+        }
+
+
+profiler = SamplingProfiler()
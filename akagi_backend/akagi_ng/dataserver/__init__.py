@@ -1,3 +1,4 @@
 from akagi_ng.dataserver.dataserver import DataServer
+from akagi_ng.dataserver.process import DataServerProcess
 
-__all__ = ["DataServer"]
+__all__ = ["DataServer", "DataServerProcess"]
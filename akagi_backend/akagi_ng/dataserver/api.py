@@ -1,17 +1,25 @@
-import json
+import asyncio
 import queue
-from collections.abc import Callable
 
 from aiohttp import web
 
 from akagi_ng.core.context import get_app_context
 from akagi_ng.core.logging import configure_logging
 from akagi_ng.core.paths import get_models_dir
+from akagi_ng.core.profiler import DEFAULT_INTERVAL_SECONDS, profiler
+from akagi_ng.dataserver.handlers import (
+    _json_response,
+    get_models_handler,
+    get_settings_handler,
+    metrics_handler,
+)
 from akagi_ng.dataserver.logger import logger
-from akagi_ng.mjai_bot.engine import clear_resource_cache
+from akagi_ng.mjai_bot.engine import evict_stale_resources, start_model_swap
+from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.types import (
     DebuggerDetachedMessage,
     LiqiDefinitionMessage,
+    SystemEvent,
     SystemShutdownEvent,
     WebSocketClosedMessage,
     WebSocketCreatedMessage,
@@ -24,55 +32,30 @@ from akagi_ng.settings import (
     verify_settings,
 )
 
-# CORS 响应头配置
-# 桌面端仅允许本机来源访问
-CORS_HEADERS = {
-    "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
-    "Access-Control-Allow-Headers": "Content-Type",
-}
-
-
-def _is_allowed_origin(origin: str | None) -> bool:
-    """检查来源是否为 localhost/127.0.0.1。"""
-    if not origin:
-        return True  # 允许无 Origin 的本地请求（如 EventSource）
-    return "localhost" in origin or "127.0.0.1" in origin
-
 
-@web.middleware
-async def cors_middleware(request: web.Request, handler: Callable[[web.Request], web.StreamResponse]) -> web.Response:
-    """为响应添加 CORS 头，仅允许本机来源。"""
-    origin = request.headers.get("Origin")
+def _start_model_swaps(old_settings: dict, new_settings: dict):
+    """模型文件变化时在后台热切换，进行中的对局从下一次决策起使用新模型。"""
+    old_model = old_settings.get("model_config", {})
+    new_model = new_settings.get("model_config", {})
+    changed = [
+        (new_model[key], is_3p)
+        for key, is_3p in (("model_4p", False), ("model_3p", True))
+        if new_model.get(key) and new_model.get(key) != old_model.get(key)
+    ]
+    if not changed:
+        return
 
-    # 仅允许 localhost/127.0.0.1 或无 Origin 的本地请求
-    if not _is_allowed_origin(origin):
-        logger.warning(f"Blocked CORS request from unauthorized origin: {origin}")
-        return web.Response(status=403, text="Forbidden: Invalid origin")
+    shared_queue = get_app_context().shared_queue
 
-    # 设置允许来源（有 Origin 时回显，否则使用 *）
-    allow_origin = origin if origin else "*"
+    def notify(code: NotificationCode):
+        try:
+            shared_queue.put(SystemEvent(code=code), block=False)
+        except queue.Full:
+            logger.warning(f"Message queue is full, {code} notification dropped")
 
-    if request.method == "OPTIONS":
-        headers = dict(CORS_HEADERS)
-        headers["Access-Control-Allow-Origin"] = allow_origin
-        return web.Response(status=204, headers=headers)
-
-    response = await handler(request)
-    response.headers.update({"Access-Control-Allow-Origin": allow_origin})
-    return response
-
-
-def _json_response(data: dict, status: int = 200) -> web.Response:
-    """构造 ensure_ascii=False 的 JSON 响应。"""
-    return web.json_response(
-        data,
-        status=status,
-        dumps=lambda obj: json.dumps(obj, ensure_ascii=False),
-    )
-
-
-async def get_settings_handler(_request: web.Request) -> web.Response:
-    return _json_response({"ok": True, "data": get_settings_dict()})
+    models_dir = get_models_dir()
+    for filename, is_3p in changed:
+        start_model_swap(models_dir / filename, is_3p, notify)
 
 
 async def save_settings_handler(request: web.Request) -> web.Response:
@@ -91,9 +74,9 @@ async def save_settings_handler(request: web.Request) -> web.Response:
         return _json_response({"ok": False, "error": "Settings validation failed (schema mismatch)"}, status=400)
 
     try:
-        old_settings = get_settings_dict()
+        old_settings = await asyncio.to_thread(get_settings_dict)
         local_settings.update(payload)
-        local_settings.save()
+        await asyncio.to_thread(local_settings.save)
 
         restart_required = False
 
@@ -112,8 +95,8 @@ async def save_settings_handler(request: web.Request) -> web.Response:
         ):
             restart_required = True
 
-        clear_resource_cache()
-        logger.info("Resource cache cleared due to settings update.")
+        evict_stale_resources(old_settings, payload)
+        _start_model_swaps(old_settings, payload)
         return _json_response({"ok": True, "restartRequired": restart_required})
     except Exception:
         logger.exception("Failed to save settings")
@@ -122,27 +105,19 @@ async def save_settings_handler(request: web.Request) -> web.Response:
 
 async def reset_settings_handler(_request: web.Request) -> web.Response:
     try:
+        old_settings = await asyncio.to_thread(get_settings_dict)
         default_settings = get_default_settings_dict()
         local_settings.update(default_settings)
-        local_settings.save()
+        await asyncio.to_thread(local_settings.save)
 
-        clear_resource_cache()
-        logger.info("Resource cache cleared due to settings reset.")
+        evict_stale_resources(old_settings, default_settings)
+        _start_model_swaps(old_settings, default_settings)
         return _json_response({"ok": True, "data": default_settings, "restartRequired": True})
     except Exception:
         logger.exception("Failed to reset settings")
         return _json_response({"ok": False, "error": "Internal server error"}, status=500)
 
 
-async def get_models_handler(_request: web.Request) -> web.Response:
-    models_dir = get_models_dir()
-    if not models_dir.exists():
-        return _json_response({"ok": True, "data": []})
-
-    models = [f.name for f in models_dir.glob("*.pth") if f.is_file()]
-    return _json_response({"ok": True, "data": models})
-
-
 async def ingest_mjai_handler(request: web.Request) -> web.Response:
     """接收 Electron 发送的 MJAI 消息"""
     try:
@@ -212,6 +187,46 @@ async def shutdown_handler(_request: web.Request) -> web.Response:
         return _json_response({"ok": False, "error": "Internal server error"}, status=500)
 
 
+async def profiler_status_handler(_request: web.Request) -> web.Response:
+    return _json_response({"ok": True, "data": profiler.status()})
+
+
+async def profiler_start_handler(request: web.Request) -> web.Response:
+    """启动采样分析器，持续 duration 秒后自动停止
+
+    采样覆盖进程内全部线程（Reactor 主线程、DataServer、MITM 等）。
+    """
+    try:
+        payload = await request.json() if request.can_read_body else {}
+        duration = float(payload.get("duration", 10))
+        interval = float(payload.get("interval", DEFAULT_INTERVAL_SECONDS))
+    except (ValueError, TypeError, AttributeError):
+        return _json_response({"ok": False, "error": "Invalid profiler parameters"}, status=400)
+
+    if duration <= 0 or interval <= 0:
+        return _json_response({"ok": False, "error": "duration and interval must be positive"}, status=400)
+
+    if not profiler.start(duration, interval):
+        return _json_response({"ok": False, "error": "Profiler already running"}, status=409)
+    return _json_response({"ok": True, "data": profiler.status()})
+
+
+async def profiler_stop_handler(_request: web.Request) -> web.Response:
+    # stop 会等待采样线程退出，放到线程池执行以免阻塞 SSE / WebSocket 推送
+    await asyncio.to_thread(profiler.stop)
+    return _json_response({"ok": True, "data": profiler.status()})
+
+
+async def profiler_result_handler(_request: web.Request) -> web.Response:
+    """下载 collapsed-stack 格式的采样结果（可用 flamegraph.pl / speedscope 打开）"""
+    filename = f"akagi_profile_{int(profiler.status()['started_at'])}.collapsed"
+    return web.Response(
+        text=profiler.collapsed(),
+        content_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 def setup_routes(app: web.Application):
     app.router.add_get("/api/settings", get_settings_handler)
     app.router.add_post("/api/settings", save_settings_handler)
@@ -219,3 +234,8 @@ def setup_routes(app: web.Application):
     app.router.add_get("/api/models", get_models_handler)
     app.router.add_post("/api/ingest", ingest_mjai_handler)
     app.router.add_post("/api/shutdown", shutdown_handler)
+    app.router.add_get("/api/profiler", profiler_status_handler)
+    app.router.add_post("/api/profiler/start", profiler_start_handler)
+    app.router.add_post("/api/profiler/stop", profiler_stop_handler)
+    app.router.add_get("/api/profiler/result", profiler_result_handler)
+    app.router.add_get("/metrics", metrics_handler)
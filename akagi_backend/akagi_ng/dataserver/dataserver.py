@@ -1,37 +1,60 @@
 import asyncio
 import contextlib
 import threading
+from collections.abc import Callable
 
 from aiohttp import web
 
-from akagi_ng.dataserver.api import cors_middleware, setup_routes
+from akagi_ng.dataserver.handlers import cors_middleware
 from akagi_ng.dataserver.logger import logger
 from akagi_ng.dataserver.sse import SSEManager
+from akagi_ng.dataserver.ws import WSManager
 from akagi_ng.schema.types import FullRecommendationData, Notification
 from akagi_ng.settings import local_settings
 
 
 class DataServer(threading.Thread):
-    def __init__(self, host: str | None = None, external_port: int | None = None):
-        super().__init__()
+    def __init__(
+        self,
+        host: str | None = None,
+        external_port: int | None = None,
+        streaming: bool = True,
+        setup: Callable[[web.Application], None] | None = None,
+    ):
+        """
+        streaming 为 False 时不提供 /sse 与 /ws（多进程模式下的控制服务器）；
+        setup 用于注册其余路由，默认注册全部 API。
+        """
+        if setup is None:
+            # 延迟导入：完整 API 依赖推理引擎，只注册轻量路由的子进程不应加载 torch / libriichi
+            from akagi_ng.dataserver.api import setup_routes
+
+            setup = setup_routes
+
+        super().__init__(name="DataServer")
         self.host = host if host is not None else local_settings.server.host
         self.daemon = True
         self.external_port = external_port if external_port is not None else local_settings.server.port
         self.sse_manager = SSEManager()
+        self.ws_manager = WSManager()
+        self.streaming = streaming
+        self.setup = setup
         self.loop = None
         self.runner = None
         self.running = False
+        # 事件循环开始运行（或启动失败退出）后置位，供需要向事件循环投递事件的线程等待
+        self.ready = threading.Event()
 
     def broadcast_event(self, event: str, data: dict):
-        """代理到 SSEManager"""
+        """代理到 SSEManager 与 WSManager。data 的所有权移交给 DataServer，调用方之后不得修改。"""
         self.sse_manager.broadcast_event(event, data)
+        self.ws_manager.broadcast_event(event, data)
 
     def send_recommendations(self, recommendations_data: FullRecommendationData):
         """广播推荐数据"""
         # 过滤空推荐以避免干扰
         if not recommendations_data.get("recommendations"):
             return
-        logger.debug(f"-> {recommendations_data}")
         self.broadcast_event("recommendations", recommendations_data)
 
     def send_notifications(self, notifications: list[Notification]):
@@ -40,9 +63,7 @@ class DataServer(threading.Thread):
         """
         if not notifications:
             return
-        data = {"list": notifications}
-        logger.debug(f"-> {data}")
-        self.broadcast_event("notification", data)
+        self.broadcast_event("notification", {"list": notifications})
 
     def stop(self):
         if self.running and self.loop and self.loop.is_running():
@@ -51,6 +72,8 @@ class DataServer(threading.Thread):
         self.running = False
         if self.sse_manager:
             self.sse_manager.stop()
+        if self.ws_manager:
+            self.ws_manager.stop()
         if self.is_alive():
             self.join(timeout=2.0)
 
@@ -58,16 +81,21 @@ class DataServer(threading.Thread):
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
 
-        # 初始化 SSE 循环
-        self.sse_manager.set_loop(self.loop)
-        self.sse_manager.start()
+        # 初始化 SSE / WebSocket 循环
+        if self.streaming:
+            self.sse_manager.set_loop(self.loop)
+            self.sse_manager.start()
+            self.ws_manager.set_loop(self.loop)
+            self.ws_manager.start()
 
         try:
             app = web.Application(middlewares=[cors_middleware])
 
-            # --- API / SSE 路由 ---
-            app.router.add_get("/sse", self.sse_manager.sse_handler)
-            setup_routes(app)
+            # --- API / SSE / WebSocket 路由 ---
+            if self.streaming:
+                app.router.add_get("/sse", self.sse_manager.sse_handler)
+                app.router.add_get("/ws", self.ws_manager.ws_handler)
+            self.setup(app)
 
             self.runner = web.AppRunner(app)
             self.loop.run_until_complete(self.runner.setup())
@@ -79,11 +107,13 @@ class DataServer(threading.Thread):
             self.running = True
 
             # 保活任务由 SSEManager 管理，但事件循环仍需 run_forever
+            self.loop.call_soon(self.ready.set)
             self.loop.run_forever()
         except Exception as e:
             logger.error(f"DataServer runtime error: {e}")
             self.running = False
         finally:
+            self.ready.set()
             if self.runner:
                 with contextlib.suppress(Exception):
                     self.loop.run_until_complete(self.runner.cleanup())
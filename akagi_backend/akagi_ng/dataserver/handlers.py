@@ -0,0 +1,81 @@
+"""DataServer 的公共中间件与只读接口。
+
+本模块不依赖推理引擎与应用上下文，多进程模式下的 DataServer 子进程只导入本模块，
+不会加载 torch / libriichi。
+"""
+
+import json
+from collections.abc import Callable
+
+from aiohttp import web
+
+from akagi_ng.core.metrics import registry
+from akagi_ng.core.paths import get_models_dir
+from akagi_ng.dataserver.logger import logger
+from akagi_ng.settings import get_settings_dict
+
+# CORS 响应头配置
+# 桌面端仅允许本机来源访问
+CORS_HEADERS = {
+    "Access-Control-Allow-Methods": "GET,POST,OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+}
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _is_allowed_origin(origin: str | None) -> bool:
+    """检查来源是否为 localhost/127.0.0.1。"""
+    if not origin:
+        return True  # 允许无 Origin 的本地请求（如 EventSource）
+    return "localhost" in origin or "127.0.0.1" in origin
+
+
+@web.middleware
+async def cors_middleware(request: web.Request, handler: Callable[[web.Request], web.StreamResponse]) -> web.Response:
+    """为响应添加 CORS 头，仅允许本机来源。"""
+    origin = request.headers.get("Origin")
+
+    # 仅允许 localhost/127.0.0.1 或无 Origin 的本地请求
+    if not _is_allowed_origin(origin):
+        logger.warning(f"Blocked CORS request from unauthorized origin: {origin}")
+        return web.Response(status=403, text="Forbidden: Invalid origin")
+
+    # 设置允许来源（有 Origin 时回显，否则使用 *）
+    allow_origin = origin if origin else "*"
+
+    if request.method == "OPTIONS":
+        headers = dict(CORS_HEADERS)
+        headers["Access-Control-Allow-Origin"] = allow_origin
+        return web.Response(status=204, headers=headers)
+
+    response = await handler(request)
+    response.headers.update({"Access-Control-Allow-Origin": allow_origin})
+    return response
+
+
+def _json_response(data: dict, status: int = 200) -> web.Response:
+    """构造 ensure_ascii=False 的 JSON 响应。"""
+    return web.json_response(
+        data,
+        status=status,
+        dumps=lambda obj: json.dumps(obj, ensure_ascii=False),
+    )
+
+
+async def get_settings_handler(_request: web.Request) -> web.Response:
+    return _json_response({"ok": True, "data": get_settings_dict()})
+
+
+async def get_models_handler(_request: web.Request) -> web.Response:
+    models_dir = get_models_dir()
+    if not models_dir.exists():
+        return _json_response({"ok": True, "data": []})
+
+    models = [f.name for f in models_dir.glob("*.pth") if f.is_file()]
+    return _json_response({"ok": True, "data": models})
+
+
+async def metrics_handler(_request: web.Request) -> web.Response:
+    """以 Prometheus 文本格式导出运行指标"""
+    return web.Response(body=registry.render().encode(), headers={"Content-Type": METRICS_CONTENT_TYPE})
@@ -0,0 +1,36 @@
+import secrets
+
+
+class EventJournal:
+    """定长环形事件日志，按事件 ID 直接定位，供断线重连的客户端增量补发。
+
+    事件 ID 形如 "<epoch>-<序号>"。epoch 在每次启动时随机生成，服务端重启后旧 ID 一律视为未知，
+    客户端会退回完整重新同步。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.epoch = secrets.token_hex(4)
+        self.last_seq = 0
+        self._slots: list[tuple[str, bytes] | None] = [None] * capacity
+
+    def next_id(self) -> str:
+        """分配下一个事件 ID；随后必须调用 append 写入对应事件。"""
+        self.last_seq += 1
+        return f"{self.epoch}-{self.last_seq}"
+
+    def append(self, event: str, payload: bytes):
+        self._slots[self.last_seq % self.capacity] = (event, payload)
+
+    def _parse(self, event_id: str) -> int | None:
+        epoch, _, seq = event_id.strip().rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, event_id: str) -> list[tuple[str, bytes]] | None:
+        """返回 event_id 之后的全部事件；ID 未知或已被覆盖时返回 None。"""
+        seq = self._parse(event_id)
+        if seq is None or seq > self.last_seq or seq < self.last_seq - self.capacity:
+            return None
+        return [self._slots[i % self.capacity] for i in range(seq + 1, self.last_seq + 1)]
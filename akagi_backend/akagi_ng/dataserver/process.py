@@ -0,0 +1,223 @@
+"""以独立进程运行 DataServer。
+
+Reactor 进程内只保留一个监听 127.0.0.1 随机端口的控制服务器，负责需要访问应用上下文的接口
+（ingest、设置保存、关闭、指标、profiler 等）。对外端口由子进程监听：/sse、/ws 与只读的设置/模型
+查询在子进程内直接处理，其余请求反向代理到控制服务器。/metrics 合并两个进程的注册表：
+SSE / WebSocket 客户端指标只存在于子进程。推荐与通知经共享内存环形缓冲区传递，前端流量不会与推理
+争用 GIL；子进程只导入 handlers 中的轻量接口，不会加载推理引擎。
+
+通过环境变量开启：AKAGI_DATASERVER_PROCESS=1
+"""
+
+import multiprocessing
+import pickle
+import socket
+import threading
+from dataclasses import dataclass
+from multiprocessing.synchronize import Event
+
+import aiohttp
+from aiohttp import web
+
+from akagi_ng.core.logging import configure_logging
+from akagi_ng.core.metrics import EVENTS_DROPPED, merge_exposition, registry
+from akagi_ng.dataserver.dataserver import DataServer
+from akagi_ng.dataserver.handlers import METRICS_CONTENT_TYPE, _json_response, get_models_handler, get_settings_handler
+from akagi_ng.dataserver.logger import logger
+from akagi_ng.dataserver.shm import SharedRing
+from akagi_ng.schema.constants import ServerConstants
+from akagi_ng.schema.types import FullRecommendationData, Notification
+from akagi_ng.settings import local_settings
+
+_PROXY_SESSION = web.AppKey("proxy_session", aiohttp.ClientSession)
+# 代理时透传的响应头
+_PROXY_HEADERS = ("Content-Type", "Content-Disposition")
+
+
+@dataclass(frozen=True, slots=True)
+class _ServeConfig:
+    """传给子进程的启动参数。"""
+
+    ring_name: str
+    slots: int
+    slot_size: int
+    host: str
+    port: int
+    upstream: str
+    log_level: str
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def setup_proxy_routes(app: web.Application, upstream: str):
+    """子进程路由：只读查询本地处理，其余 API 转发到 Reactor 进程的控制服务器，/metrics 合并两端指标。"""
+
+    async def session_ctx(app: web.Application):
+        app[_PROXY_SESSION] = aiohttp.ClientSession(base_url=upstream)
+        yield
+        await app[_PROXY_SESSION].close()
+
+    async def proxy_handler(request: web.Request) -> web.Response:
+        headers = {"Content-Type": request.headers["Content-Type"]} if "Content-Type" in request.headers else {}
+        try:
+            async with request.app[_PROXY_SESSION].request(
+                request.method, request.path_qs, data=await request.read(), headers=headers
+            ) as resp:
+                body = await resp.read()
+                out_headers = {k: resp.headers[k] for k in _PROXY_HEADERS if k in resp.headers}
+                return web.Response(status=resp.status, body=body, headers=out_headers)
+        except aiohttp.ClientError as e:
+            logger.warning(f"Control server request failed: {e}")
+            return _json_response({"ok": False, "error": "Control server unavailable"}, status=502)
+
+    async def metrics_handler(request: web.Request) -> web.Response:
+        upstream_text = ""
+        try:
+            async with request.app[_PROXY_SESSION].get("/metrics") as resp:
+                resp.raise_for_status()
+                upstream_text = await resp.text()
+        except aiohttp.ClientError as e:
+            # 控制服务器不可用时仍导出子进程自身的指标
+            logger.warning(f"Control server metrics request failed: {e}")
+        body = merge_exposition(upstream_text, registry.render())
+        return web.Response(body=body.encode(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+    app.cleanup_ctx.append(session_ctx)
+    # settings.json 由控制服务器写入，子进程每次请求时从磁盘读取，结果始终一致
+    app.router.add_get("/api/settings", get_settings_handler)
+    app.router.add_get("/api/models", get_models_handler)
+    app.router.add_route("*", "/api/{tail:.*}", proxy_handler)
+    app.router.add_get("/metrics", metrics_handler)
+
+
+def _pump(ring: SharedRing, doorbell: Event, stop: Event, server: DataServer):
+    """子进程内把共享内存中的事件转交给 DataServer 广播。"""
+    seq = 0
+    while not stop.is_set():
+        doorbell.wait(timeout=1.0)
+        doorbell.clear()
+        records, seq, lost = ring.read_since(seq)
+        if lost:
+            logger.warning(f"DataServer process fell behind, {lost} events lost.")
+        for record in records:
+            event, data = pickle.loads(record)
+            server.broadcast_event(event, data)
+
+
+def _serve(config: _ServeConfig, doorbell: Event, stop: Event):
+    """子进程入口。"""
+    configure_logging(config.log_level)
+    ring = SharedRing(config.ring_name, slots=config.slots, slot_size=config.slot_size)
+    server = DataServer(
+        host=config.host,
+        external_port=config.port,
+        setup=lambda app: setup_proxy_routes(app, config.upstream),
+    )
+    server.start()
+    # 事件循环运行后再开始转发，否则早到的事件会在 pump 线程内直接分发或丢失
+    server.ready.wait()
+    if not server.running:
+        logger.error("DataServer process failed to start.")
+        ring.close()
+        return
+
+    pump = threading.Thread(target=_pump, args=(ring, doorbell, stop, server), name="SharedRingPump", daemon=True)
+    pump.start()
+    logger.info(f"DataServer process serving {config.host}:{config.port}, control server at {config.upstream}")
+    try:
+        stop.wait()
+    finally:
+        server.stop()
+        pump.join(timeout=ServerConstants.SHUTDOWN_JOIN_TIMEOUT_SECONDS)
+        ring.close()
+
+
+class DataServerProcess:
+    """在独立进程中运行的 DataServer，对 Reactor 提供与 DataServer 相同的发送接口。
+
+    send_* 只做一次 pickle、一次共享内存拷贝与一次唤醒，编码与分发都在子进程完成。
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        external_port: int | None = None,
+        slots: int = 256,
+        slot_size: int = 64 * 1024,
+    ):
+        self.host = host if host is not None else local_settings.server.host
+        self.external_port = external_port if external_port is not None else local_settings.server.port
+        self.slots = slots
+        self.slot_size = slot_size
+        self.control_port = _free_port()
+        self.control = DataServer(host="127.0.0.1", external_port=self.control_port, streaming=False)
+        self.ring: SharedRing | None = None
+        self.process: multiprocessing.process.BaseProcess | None = None
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._doorbell = self._ctx.Event()
+        self._stop = self._ctx.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        self.ring = SharedRing(slots=self.slots, slot_size=self.slot_size)
+        self.control.start()
+        self.process = self._ctx.Process(
+            target=_serve,
+            args=(
+                _ServeConfig(
+                    ring_name=self.ring.name,
+                    slots=self.slots,
+                    slot_size=self.slot_size,
+                    host=self.host,
+                    port=self.external_port,
+                    upstream=f"http://127.0.0.1:{self.control_port}",
+                    log_level=local_settings.log_level,
+                ),
+                self._doorbell,
+                self._stop,
+            ),
+            name="DataServer",
+            daemon=True,
+        )
+        self.process.start()
+
+    def broadcast_event(self, event: str, data: FullRecommendationData | dict[str, list[Notification]]):
+        if self.ring is None:
+            return
+        if not self.ring.publish(pickle.dumps((event, data), protocol=pickle.HIGHEST_PROTOCOL)):
+            EVENTS_DROPPED.labels("shm").inc()
+            logger.warning(f"{event} payload exceeds shared ring slot size, dropped.")
+            return
+        self._doorbell.set()
+
+    def send_recommendations(self, recommendations_data: FullRecommendationData):
+        if not recommendations_data.get("recommendations"):
+            return
+        self.broadcast_event("recommendations", recommendations_data)
+
+    def send_notifications(self, notifications: list[Notification]):
+        if not notifications:
+            return
+        self.broadcast_event("notification", {"list": notifications})
+
+    def stop(self):
+        self._stop.set()
+        self._doorbell.set()
+        if self.process is not None:
+            self.process.join(timeout=ServerConstants.SHUTDOWN_JOIN_TIMEOUT_SECONDS * 2)
+            if self.process.is_alive():
+                logger.warning("DataServer process did not exit in time, terminating.")
+                self.process.terminate()
+                self.process.join(timeout=ServerConstants.SHUTDOWN_JOIN_TIMEOUT_SECONDS)
+        self.control.stop()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
@@ -0,0 +1,77 @@
+"""跨进程共享内存环形缓冲区：Reactor 进程写入，独立的 DataServer 进程读取。"""
+
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+_HEADER = struct.Struct("<Q")  # 最新写入序号
+_SLOT_HEADER = struct.Struct("<QI")  # 槽位序号, 数据长度
+
+
+class SharedRing:
+    """单写者的定长槽位环形缓冲区。
+
+    写入端先清零槽位序号、再写数据、最后写入槽位序号与全局序号；读取端在拷贝数据前后各读一次
+    槽位序号，不一致说明读取期间被覆盖，该条计为丢失。读取端落后超过一圈时同样计为丢失，
+    只需保证最新的推荐与通知能被读到。
+    """
+
+    def __init__(self, name: str | None = None, slots: int = 256, slot_size: int = 64 * 1024):
+        self.owner = name is None
+        self.slots = slots
+        self.slot_size = slot_size
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=_HEADER.size + slots * slot_size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # 读取端不拥有该内存，避免子进程退出时被资源跟踪器提前回收
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+
+    @property
+    def capacity(self) -> int:
+        """单条记录的最大字节数。"""
+        return self.slot_size - _SLOT_HEADER.size
+
+    @property
+    def last_seq(self) -> int:
+        return _HEADER.unpack_from(self._buf, 0)[0]
+
+    def _offset(self, seq: int) -> int:
+        return _HEADER.size + (seq % self.slots) * self.slot_size
+
+    def publish(self, data: bytes) -> bool:
+        """写入一条记录；超过单槽容量时返回 False。"""
+        if len(data) > self.capacity:
+            return False
+        seq = self.last_seq + 1
+        offset = self._offset(seq)
+        start = offset + _SLOT_HEADER.size
+        _SLOT_HEADER.pack_into(self._buf, offset, 0, 0)
+        self._buf[start : start + len(data)] = data
+        _SLOT_HEADER.pack_into(self._buf, offset, seq, len(data))
+        _HEADER.pack_into(self._buf, 0, seq)
+        return True
+
+    def read_since(self, seq: int) -> tuple[list[bytes], int, int]:
+        """读取序号 seq 之后的全部记录，返回 (记录列表, 已读到的序号, 丢失条数)。"""
+        last = self.last_seq
+        first = max(seq + 1, last - self.slots + 1)
+        lost = first - (seq + 1)
+        records: list[bytes] = []
+        for current in range(first, last + 1):
+            offset = self._offset(current)
+            slot_seq, length = _SLOT_HEADER.unpack_from(self._buf, offset)
+            start = offset + _SLOT_HEADER.size
+            data = bytes(self._buf[start : start + min(length, self.capacity)])
+            if slot_seq != current or _SLOT_HEADER.unpack_from(self._buf, offset)[0] != current:
+                lost += 1
+                continue
+            records.append(data)
+        return records, last, lost
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
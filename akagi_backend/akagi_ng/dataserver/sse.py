@@ -1,10 +1,11 @@
 import asyncio
-import contextlib
 import json
 from collections import deque
 
 from aiohttp import web
 
+from akagi_ng.core.metrics import EVENTS_DROPPED, SSE_CLIENT_QUEUE_FILL, SSE_CLIENTS, registry
+from akagi_ng.dataserver.journal import EventJournal
 from akagi_ng.dataserver.logger import logger
 from akagi_ng.schema.constants import ServerConstants
 from akagi_ng.schema.types import (
@@ -14,15 +15,74 @@ from akagi_ng.schema.types import (
 )
 
 
-def _format_sse_message(data: dict, event: str | None = None) -> bytes:
+def _format_sse_message(data: dict, event: str | None = None, event_id: str | None = None) -> bytes:
     msg = f"data: {json.dumps(data, ensure_ascii=False)}\n"
     if event:
         msg = f"event: {event}\n{msg}"
+    if event_id:
+        msg = f"id: {event_id}\n{msg}"
     return f"{msg}\n".encode()
 
 
+_MISSING = object()
+
+
+def _diff_item(base: dict, target: dict) -> tuple[dict, list[str]]:
+    """单层差量：变化的键给出新值（可以是 None），被移除的键单独列出。"""
+    patch = {k: v for k, v in target.items() if base.get(k, _MISSING) != v}
+    return patch, sorted(base.keys() - target.keys())
+
+
+def _diff_recommendations(base: FullRecommendationData, target: FullRecommendationData) -> dict:
+    """计算推荐数据的差量，无变化时返回空字典。
+
+    差量格式::
+
+        {"fields": {顶层变化字段: 新值}, "items": {"下标": {变化字段: 新值}}, "removed": {"下标": [被移除的字段]}}
+
+    推荐数量变化时整个 recommendations 列表放入 fields；否则逐项给出变化字段与被移除的字段。
+    删除单独列出，值为 null 的字段按原值下发，不会被当作删除。
+    """
+    fields = {k: v for k, v in target.items() if k != "recommendations" and base.get(k, _MISSING) != v}
+    delta: dict = {}
+    base_items, target_items = base.get("recommendations", []), target.get("recommendations", [])
+    if len(base_items) != len(target_items):
+        fields["recommendations"] = target_items
+    else:
+        items: dict[str, dict] = {}
+        removed: dict[str, list[str]] = {}
+        for i, (b, t) in enumerate(zip(base_items, target_items, strict=True)):
+            if b == t:
+                continue
+            patch, gone = _diff_item(b, t)
+            if patch:
+                items[str(i)] = patch
+            if gone:
+                removed[str(i)] = gone
+        if items:
+            delta["items"] = items
+        if removed:
+            delta["removed"] = removed
+    if fields:
+        delta["fields"] = fields
+    return delta
+
+
 class SSEManager:
-    """管理 SSE 连接、广播与保活。"""
+    """管理 SSE 连接、广播与保活。
+
+    clients 采用写时复制：增删客户端时在锁内整体替换字典，广播只读取当前快照，无需加锁。
+    每条消息只编码一次，编码后的 bytes 由全部客户端共享。
+
+    每个广播事件带有递增的 SSE id 并写入环形事件日志；重连时携带 Last-Event-ID 的客户端只补发
+    断线期间的事件，ID 未知或已被覆盖时才完整重新同步。
+
+    推荐虽然只保留最新一条，但仍排在其之前已入队的通知之后发送，客户端收到的事件 ID 始终递增，
+    按 Last-Event-ID 续传时不会跳过通知。
+
+    以 ?delta=1 连接的客户端在完整同步时收到完整推荐，此后只收到相对其已送达状态的
+    recommendations_delta 事件；与上一条完全相同的推荐不会广播。
+    """
 
     def __init__(self):
         self.clients: dict[str, SSEClientData] = {}
@@ -30,6 +90,18 @@ class SSEManager:
         self.notification_history: deque[dict[str, list[Notification]]] = deque(
             maxlen=ServerConstants.SSE_MAX_NOTIFICATION_HISTORY
         )
+        # 新连接回放用的已编码消息，仅在事件循环线程内读写
+        self._recommendation_payload: bytes | None = None
+        self._notification_payloads: deque[bytes] = deque(maxlen=ServerConstants.SSE_MAX_NOTIFICATION_HISTORY)
+        # 最新推荐之后到达的通知数，用于完整同步时把推荐放回它在历史通知中的位置
+        self._notifications_since_recommendation = 0
+        self._recommendation_data: FullRecommendationData | None = None
+        self._recommendation_version = 0
+        self._recommendation_event_id: str | None = None
+        # 带 ID 的事件日志，支持按 Last-Event-ID 续传
+        self.journal = EventJournal(ServerConstants.SSE_EVENT_JOURNAL_SIZE)
+        # 已送达版本 -> 编码后的差量；同一版本的客户端共享，新推荐到达时清空
+        self._delta_cache: dict[int, bytes | None] = {}
         self.keep_alive_task = None
         self.loop = None  # 事件循环引用，由 DataServer 设置
         self.running = False
@@ -40,14 +112,26 @@ class SSEManager:
 
     def start(self):
         self.running = True
+        registry.add_collector(self._collect_metrics)
         if self.loop:
             self.keep_alive_task = self.loop.create_task(self.keep_alive())
 
     def stop(self):
         self.running = False
+        registry.remove_collector(self._collect_metrics)
         if self.keep_alive_task:
             self.keep_alive_task.cancel()
 
+    def _collect_metrics(self):
+        """抓取时刷新客户端数量与各客户端队列占用率。"""
+        clients = list(self.clients.items())
+        SSE_CLIENTS.set(len(clients))
+        SSE_CLIENT_QUEUE_FILL.clear()
+        for client_id, client_data in clients:
+            queue = client_data.queue
+            if queue is not None and queue.maxsize > 0:
+                SSE_CLIENT_QUEUE_FILL.labels(client_id).set(queue.qsize() / queue.maxsize)
+
     async def _remove_client(self, client_id: str, expected_response: web.StreamResponse | None = None):
         async with self.lock:
             client_data = self.clients.get(client_id)
@@ -59,7 +143,8 @@ class SSEManager:
             ):
                 return
 
-            client_data = self.clients.pop(client_id, None)
+            if client_data is not None:
+                self.clients = {k: v for k, v in self.clients.items() if k != client_id}
 
         if not client_data:
             return
@@ -91,9 +176,6 @@ class SSEManager:
         response = web.StreamResponse(status=200, headers=headers)
         await response.prepare(request)
 
-        # 为每个客户端创建消息队列，使用常量定义的上限
-        queue = asyncio.Queue(maxsize=ServerConstants.MESSAGE_QUEUE_MAXSIZE)
-
         # 避免在持锁期间 await，防止与 _remove_client 形成死锁。
         old_response: web.StreamResponse | None = None
         async with self.lock:
@@ -105,31 +187,35 @@ class SSEManager:
             logger.warning(f"Client {client_id} already connected. Closing old connection.")
             await self._remove_client(client_id, expected_response=old_response)
 
+        client_data = SSEClientData(
+            response=response,
+            queue=asyncio.Queue(maxsize=ServerConstants.SSE_NOTIFICATION_QUEUE_MAXSIZE),
+            delta=request.query.get("delta") == "1",
+        )
+        # EventSource 自动重连时携带 Last-Event-ID 头；前端手动重建连接时通过查询参数传递
+        last_event_id = request.headers.get("Last-Event-ID") or request.query.get("lastEventId")
         async with self.lock:
-            self.clients[client_id] = SSEClientData(response=response, queue=queue)
+            # 与注册之间没有 await，之后的消息只会进入该客户端，不会与回放重复
+            history = self._initial_payloads(client_data, last_event_id)
+            self.clients = {**self.clients, client_id: client_data}
 
         logger.info(f"SSE client {client_id} connected from {request.remote}")
 
         try:
             await response.write(b": connected\n\n")
 
-            # 发送缓存的最新推荐
-            if self.latest_recommendations:
-                payload = _format_sse_message(self.latest_recommendations, event="recommendations")
-                await response.write(payload)
-
-            # 发送历史通知，确保客户端能看到启动过程中的所有状态
-            for notification in self.notification_history:
-                payload = _format_sse_message(notification, event="notification")
+            # 发送历史通知（或断线期间错过的通知），确保客户端能看到启动过程中的所有状态
+            for payload in history:
                 await response.write(payload)
 
-            # 事件驱动的消息循环：等待并发送队列中的新消息
+            # 事件驱动的消息循环：被唤醒后发送全部待发消息
             while True:
-                payload = await queue.get()
-                try:
-                    await response.write(payload)
-                finally:
-                    queue.task_done()
+                payload = self._next_payload(client_data)
+                if payload is None:
+                    client_data.wakeup.clear()
+                    await client_data.wakeup.wait()
+                    continue
+                await response.write(payload)
 
         except (asyncio.CancelledError, ConnectionResetError):
             logger.debug(f"SSE handler for {client_id} closed/cancelled.")
@@ -140,58 +226,144 @@ class SSEManager:
 
         return response
 
-    async def _broadcast_async(self, payload: bytes):
-        """
-        异步广播，不再直接写入响应，而是推送到客户端各自的队列中。
-        """
-        async with self.lock:
-            if not self.clients:
-                return
-            targets = list(self.clients.values())
-
-        for client_data in targets:
-            queue = client_data.queue
-            if queue:
-                try:
-                    queue.put_nowait(payload)
-                except asyncio.QueueFull:
-                    logger.warning("SSE client queue full, dropping message.")
+    def _initial_payloads(self, client_data: SSEClientData, last_event_id: str | None) -> list[bytes]:
+        """确定新连接需要回放的内容，按事件 ID 顺序返回。
 
-    def broadcast_event(self, event: str, data: FullRecommendationData | dict[str, list[Notification]]):
-        """广播指定事件，并按事件类型更新缓存。"""
+        能从事件日志续传时只补发断线期间的事件（通知按序全部补发，推荐只补最新一条，保留其原位置）；
+        否则发送最近的历史通知与最新推荐，完整重新同步。
+        """
+        # 回放结束后客户端持有最新推荐，后续差量以它为基准
+        if client_data.delta:
+            client_data.sent_version = self._recommendation_version
+            client_data.sent_recommendation = self._recommendation_data
+
+        missed = self.journal.since(last_event_id) if last_event_id else None
+        if missed is None:
+            payloads = list(self._notification_payloads)
+            if self._recommendation_payload is not None:
+                position = max(0, len(payloads) - self._notifications_since_recommendation)
+                payloads.insert(position, self._recommendation_payload)
+            return payloads
+
+        last_recommendation = max((i for i, (event, _) in enumerate(missed) if event == "recommendations"), default=-1)
+        return [
+            payload
+            for i, (event, payload) in enumerate(missed)
+            if event != "recommendations" or i == last_recommendation
+        ]
+
+    def _next_payload(self, client_data: SSEClientData) -> bytes | None:
+        """取出下一条待发送消息：按事件 ID 顺序发送通知与最新推荐，最后是保活。"""
+        if (payload := client_data.latest_recommendation) is not None and (
+            client_data.recommendation_ahead == 0 or client_data.queue.empty()
+        ):
+            client_data.latest_recommendation = None
+            if client_data.delta:
+                payload = self._delta_payload(client_data, payload)
+            if payload is not None:
+                return payload
+        if not client_data.queue.empty():
+            if client_data.latest_recommendation is not None:
+                client_data.recommendation_ahead -= 1
+            return client_data.queue.get_nowait()
+        if client_data.keep_alive_pending:
+            client_data.keep_alive_pending = False
+            return b": keep-alive\n\n"
+        return None
+
+    def _delta_payload(self, client_data: SSEClientData, full_payload: bytes) -> bytes | None:
+        """为 delta 客户端生成相对其已送达状态的差量；无变化时返回 None。"""
+        target = self._recommendation_data
+        if target is None:
+            return full_payload
+
+        base_version = client_data.sent_version
+        base = client_data.sent_recommendation
+        client_data.sent_version = self._recommendation_version
+        client_data.sent_recommendation = target
+        if base is None:
+            # 新客户端或重连：用完整的最新推荐重新同步
+            return full_payload
+
+        if base_version not in self._delta_cache:
+            delta = _diff_recommendations(base, target)
+            self._delta_cache[base_version] = (
+                _format_sse_message(delta, "recommendations_delta", self._recommendation_event_id) if delta else None
+            )
+        return self._delta_cache[base_version]
+
+    def _fan_out(self, event: str, data: FullRecommendationData | dict[str, list[Notification]]):
+        """在事件循环线程内更新缓存、编码并分发给当前客户端快照。"""
         match event:
             case "recommendations":
+                if data == self.latest_recommendations:
+                    # 与上一条推荐完全相同，跳过编码与广播
+                    return
                 self.latest_recommendations = data
             case "notification":
                 self.notification_history.append(data)
 
+        # 参数延迟格式化：未开启 DEBUG 时不会把整个载荷转成字符串
+        logger.debug("-> {}: {}", event, data)
+        event_id = self.journal.next_id()
+        payload = _format_sse_message(data, event, event_id)
+        self.journal.append(event, payload)
+        is_recommendation = event == "recommendations"
+        if is_recommendation:
+            self._recommendation_event_id = event_id
+            self._recommendation_payload = payload
+            self._recommendation_data = data
+            self._recommendation_version += 1
+            self._delta_cache.clear()
+            self._notifications_since_recommendation = 0
+        elif event == "notification":
+            self._notification_payloads.append(payload)
+            self._notifications_since_recommendation += 1
+
+        for client_id, client_data in self.clients.items():
+            if is_recommendation:
+                # 只有最新推荐有意义，未发送的旧推荐直接被覆盖；新推荐排在已入队的通知之后
+                client_data.latest_recommendation = payload
+                client_data.recommendation_ahead = client_data.queue.qsize()
+            else:
+                queue = client_data.queue
+                if queue.full():
+                    # 丢弃最旧的通知，保证最新状态能送达
+                    queue.get_nowait()
+                    if client_data.latest_recommendation is not None and client_data.recommendation_ahead:
+                        client_data.recommendation_ahead -= 1
+                    EVENTS_DROPPED.labels("sse").inc()
+                    logger.warning(f"SSE client {client_id} notification queue full, dropping oldest.")
+                queue.put_nowait(payload)
+            client_data.wakeup.set()
+
+    def broadcast_event(self, event: str, data: FullRecommendationData | dict[str, list[Notification]]):
+        """广播指定事件。
+
+        调用方（Reactor 线程）只移交 data 的引用，之后不得再修改它；去重、缓存更新、编码与日志
+        全部在事件循环线程内完成，不占用决策关键路径。
+        """
         if self.loop and self.running:
-            payload = _format_sse_message(data, event)
-            asyncio.run_coroutine_threadsafe(self._broadcast_async(payload), self.loop)
+            self.loop.call_soon_threadsafe(self._fan_out, event, data)
+        else:
+            # 事件循环尚未启动时没有客户端，只更新回放缓存
+            self._fan_out(event, data)
 
     async def keep_alive(self):
         """
-        定期保活，推送到客户端队列中。
+        定期保活：标记各客户端需要发送保活注释并唤醒写协程，不占用通知队列。
         """
         while True:
             await asyncio.sleep(ServerConstants.SSE_KEEPALIVE_INTERVAL_SECONDS)
 
-            async with self.lock:
-                if not self.clients:
-                    continue
-                targets = list(self.clients.values())
-
-            keepalive_payload = b": keep-alive\n\n"
-            for client_data in targets:
-                queue = client_data.queue
-                if queue:
-                    with contextlib.suppress(asyncio.QueueFull):
-                        queue.put_nowait(keepalive_payload)
+            for client_data in self.clients.values():
+                client_data.keep_alive_pending = True
+                client_data.wakeup.set()
 
     async def add_client(self, client_id: str, data: SSEClientData):
         """
         手动添加客户端（用于特定内部逻辑或测试）
         """
         async with self.lock:
-            self.clients[client_id] = data
+            self.clients = {**self.clients, client_id: data}
             logger.info(f"Client {client_id} added manually to SSE.")
@@ -0,0 +1,205 @@
+"""WebSocket 推送端点：与 /sse 推送相同的事件，帧格式由客户端选择。
+
+连接参数（查询字符串）：
+
+- clientId   必填，语义同 /sse
+- format     msgpack（默认，二进制帧）或 json（文本帧）
+- compress   1 表示启用 permessage-deflate（仍需客户端在握手中声明支持）
+
+每条消息为 {"event": 事件名, "data": 数据}。
+"""
+
+import asyncio
+import contextlib
+import json
+from collections import deque
+
+import msgpack
+from aiohttp import WSMsgType, web
+
+from akagi_ng.core.metrics import EVENTS_DROPPED, WS_CLIENTS, registry
+from akagi_ng.dataserver.logger import logger
+from akagi_ng.schema.constants import ServerConstants
+from akagi_ng.schema.types import FullRecommendationData, Notification, WSClientData
+
+WS_FORMATS = ("msgpack", "json")
+
+
+def _encode_ws_message(event: str, data: dict, binary: bool) -> bytes | str:
+    message = {"event": event, "data": data}
+    if binary:
+        return msgpack.packb(message)
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class WSManager:
+    """管理 WebSocket 连接与广播。
+
+    与 SSEManager 相同，clients 采用写时复制，推荐按客户端只保留最新一条，通知进入有界队列。
+    编码在事件循环线程内按需进行，每条消息每种格式只编码一次。
+    """
+
+    def __init__(self):
+        self.clients: dict[str, WSClientData] = {}
+        self.loop = None  # 事件循环引用，由 DataServer 设置
+        self.running = False
+        self.lock = asyncio.Lock()
+        # 新连接回放用的原始消息，仅在事件循环线程内读写
+        self._latest_recommendations: FullRecommendationData | None = None
+        self._notification_history: deque[dict[str, list[Notification]]] = deque(
+            maxlen=ServerConstants.SSE_MAX_NOTIFICATION_HISTORY
+        )
+
+    def set_loop(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def start(self):
+        self.running = True
+        registry.add_collector(self._collect_metrics)
+
+    def stop(self):
+        self.running = False
+        registry.remove_collector(self._collect_metrics)
+
+    def _collect_metrics(self):
+        clients = list(self.clients.values())
+        for fmt in WS_FORMATS:
+            WS_CLIENTS.labels(fmt).set(sum(c.binary == (fmt == "msgpack") for c in clients))
+
+    async def _remove_client(self, client_id: str, expected_response: web.WebSocketResponse | None = None):
+        async with self.lock:
+            client_data = self.clients.get(client_id)
+            if client_data is None:
+                return
+            # 避免踢掉重用相同 client_id 的新连接
+            if expected_response is not None and client_data.response is not expected_response:
+                return
+            self.clients = {k: v for k, v in self.clients.items() if k != client_id}
+
+        try:
+            await client_data.response.close()
+        except (ConnectionResetError, asyncio.CancelledError):
+            logger.debug(f"WebSocket client {client_id} already closed or connection reset.")
+        except Exception as exc:
+            logger.warning(f"Error while closing WebSocket for {client_id}: {exc}")
+
+        logger.info(f"WebSocket client {client_id} disconnected.")
+
+    async def ws_handler(self, request: web.Request) -> web.StreamResponse:
+        client_id = request.query.get("clientId")
+        if not client_id:
+            logger.warning("WebSocket client connected without clientId, rejecting.")
+            return web.HTTPBadRequest(text="clientId is required")
+
+        fmt = request.query.get("format", "msgpack")
+        if fmt not in WS_FORMATS:
+            return web.HTTPBadRequest(text=f"format must be one of {', '.join(WS_FORMATS)}")
+        binary = fmt == "msgpack"
+
+        # compress=True 时仅在客户端握手声明 permessage-deflate 的情况下才会启用压缩
+        response = web.WebSocketResponse(
+            heartbeat=ServerConstants.SSE_KEEPALIVE_INTERVAL_SECONDS,
+            compress=request.query.get("compress") == "1",
+        )
+        await response.prepare(request)
+
+        existing = self.clients.get(client_id)
+        if existing is not None:
+            logger.warning(f"WebSocket client {client_id} already connected. Closing old connection.")
+            await self._remove_client(client_id, expected_response=existing.response)
+
+        client_data = WSClientData(
+            response=response,
+            binary=binary,
+            queue=asyncio.Queue(maxsize=ServerConstants.SSE_NOTIFICATION_QUEUE_MAXSIZE),
+        )
+        async with self.lock:
+            # 与注册之间没有 await，之后的消息只会进入该客户端，不会与回放重复
+            if self._latest_recommendations:
+                client_data.latest_recommendation = _encode_ws_message(
+                    "recommendations", self._latest_recommendations, binary
+                )
+            for notification in self._notification_history:
+                client_data.queue.put_nowait(_encode_ws_message("notification", notification, binary))
+            if self._notification_history:
+                client_data.wakeup.set()
+            self.clients = {**self.clients, client_id: client_data}
+
+        logger.info(f"WebSocket client {client_id} connected from {request.remote} ({fmt})")
+
+        writer = asyncio.create_task(self._write_loop(client_id, client_data))
+        try:
+            # 客户端不需要发送消息，这里只负责感知关闭
+            async for msg in response:
+                if msg.type == WSMsgType.ERROR:
+                    logger.debug(f"WebSocket client {client_id} error: {response.exception()}")
+                    break
+        except (asyncio.CancelledError, ConnectionResetError):
+            logger.debug(f"WebSocket handler for {client_id} closed/cancelled.")
+        finally:
+            writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await writer
+            await self._remove_client(client_id, expected_response=response)
+
+        return response
+
+    async def _write_loop(self, client_id: str, client_data: WSClientData):
+        response = client_data.response
+        send = response.send_bytes if client_data.binary else response.send_str
+        try:
+            while True:
+                payload = self._next_payload(client_data)
+                if payload is None:
+                    client_data.wakeup.clear()
+                    await client_data.wakeup.wait()
+                    continue
+                await send(payload)
+        except ConnectionResetError:
+            logger.debug(f"WebSocket client {client_id} connection reset.")
+        except Exception as e:
+            logger.error(f"Error in WebSocket writer for {client_id}: {e}")
+
+    @staticmethod
+    def _next_payload(client_data: WSClientData) -> bytes | str | None:
+        """最新推荐优先，其次按序发送通知。"""
+        if (payload := client_data.latest_recommendation) is not None:
+            client_data.latest_recommendation = None
+            return payload
+        if not client_data.queue.empty():
+            return client_data.queue.get_nowait()
+        return None
+
+    def _fan_out(self, event: str, data: dict):
+        """在事件循环线程内编码并分发消息，每种格式只编码一次。"""
+        is_recommendation = event == "recommendations"
+        if is_recommendation:
+            self._latest_recommendations = data
+        elif event == "notification":
+            self._notification_history.append(data)
+
+        encoded: dict[bool, bytes | str] = {}
+        for client_id, client_data in self.clients.items():
+            binary = client_data.binary
+            if binary not in encoded:
+                encoded[binary] = _encode_ws_message(event, data, binary)
+            payload = encoded[binary]
+
+            if is_recommendation:
+                client_data.latest_recommendation = payload
+            else:
+                queue = client_data.queue
+                if queue.full():
+                    queue.get_nowait()
+                    EVENTS_DROPPED.labels("ws").inc()
+                    logger.warning(f"WebSocket client {client_id} notification queue full, dropping oldest.")
+                queue.put_nowait(payload)
+            client_data.wakeup.set()
+
+    def broadcast_event(self, event: str, data: FullRecommendationData | dict[str, list[Notification]]):
+        """广播指定事件。编码推迟到事件循环线程，调用方线程只做一次调度。"""
+        if self.loop and self.running:
+            self.loop.call_soon_threadsafe(self._fan_out, event, data)
+        else:
+            # 事件循环尚未启动时没有客户端，只更新回放缓存
+            self._fan_out(event, data)
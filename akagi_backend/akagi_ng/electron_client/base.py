@@ -1,6 +1,9 @@
 import queue
 import threading
+from collections.abc import Iterator
 
+from akagi_ng.core.capture import CaptureWriter, open_capture
+from akagi_ng.core.metrics import BRIDGE_EVENTS, EVENTS_DROPPED
 from akagi_ng.electron_client.logger import logger
 from akagi_ng.schema.notifications import NotificationCode
 from akagi_ng.schema.protocols import GameBridge
@@ -20,6 +23,7 @@ class BaseElectronClient:
         self.running = False
         self._active_connections = 0
         self._lock = threading.Lock()
+        self._capture: CaptureWriter | None = None
 
     def start(self):
         with self._lock:
@@ -27,20 +31,40 @@ class BaseElectronClient:
             self._active_connections = 0
             if self.bridge:
                 self.bridge.reset()
+                if self._capture is None and self.bridge.platform:
+                    self._capture = open_capture(self.bridge.platform, tag="electron")
             logger.info(f"{self.__class__.__name__} started.")
 
     def stop(self):
         with self._lock:
             self.running = False
             self._active_connections = 0
+            if self._capture:
+                self._capture.close()
+                self._capture = None
             logger.info(f"{self.__class__.__name__} stopped.")
 
     def _enqueue_event(self, event: AkagiEvent):
         try:
             self.message_queue.put(event, block=False)
         except queue.Full:
+            EVENTS_DROPPED.labels("electron").inc()
             logger.warning(f"[{self.__class__.__name__}] Message queue full, dropping event: {event}")
 
+    def _record_frame(self, raw_bytes: bytes, outbound: bool = False):
+        """开启录制时将解码后的帧按原样写入录制文件。"""
+        if self._capture:
+            self._capture.write(raw_bytes, outbound=outbound)
+
+    def _iter_frame(self, raw_bytes: bytes, outbound: bool = False) -> Iterator[AkagiEvent]:
+        """将解码后的帧交给 Bridge 解析并逐个产出事件；开启录制时先按原样写入录制文件。"""
+        self._record_frame(raw_bytes, outbound=outbound)
+
+        events = BRIDGE_EVENTS.labels(self.bridge.platform)
+        for event in self.bridge.iter_parse(raw_bytes):
+            events.inc()
+            yield event
+
     def push_message(self, message: ElectronMessage):
         """处理来自 Electron ingest API 的消息。"""
         if not self.running:
@@ -96,7 +96,8 @@ class MajsoulElectronClient(BaseElectronClient):
                 # 4. 成功后的处理
                 if self.bridge:
                     # 重新初始化桥接器中的 proto
-                    self.bridge.liqi_proto = self.bridge.liqi_proto.__class__()
+                    old_proto = self.bridge.liqi_proto
+                    self.bridge.liqi_proto = old_proto.__class__(interested_methods=old_proto.interested_methods)
 
                 self._enqueue_event(SystemEvent(code=NotificationCode.MAJSOUL_PROTO_UPDATED))
                 logger.info(f"Successfully updated liqi.json at {liqi_path}")
@@ -131,12 +132,8 @@ class MajsoulElectronClient(BaseElectronClient):
                 logger.error(f"Failed to decode base64 websocket data: {e}")
                 return
 
-            mjai_messages = self.bridge.parse(raw_bytes)
-
-            if not mjai_messages:
-                return
-
-            for msg in mjai_messages:
+            # 边解析边入队：对局恢复时 Reactor 无需等待整条同步消息解码完毕
+            for msg in self._iter_frame(raw_bytes, outbound=message.direction == "outbound"):
                 self._enqueue_event(msg)
 
                 # 结束对局时触发返回大厅通知
@@ -76,17 +76,10 @@ class TenhouElectronClient(BaseElectronClient):
             return
 
         try:
-            # 仅处理服务端下行消息，避免与回显确认重复计数。
-            # CDP 中 outbound=客户端->服务端，inbound=服务端->客户端。
-            if message.direction == "outbound":
-                return
-
             data = message.data
             if not data:
                 return
 
-            logger.trace(f"[Electron] -> Message: {data}")
-
             # 天凤 Web 客户端：
             # - 文本帧（opcode=1）：原始字符串（如 HELO）
             # - 二进制帧（opcode=2）：base64 编码字节串
@@ -97,12 +90,15 @@ class TenhouElectronClient(BaseElectronClient):
             else:
                 raw_bytes = data.encode("utf-8") if isinstance(data, str) else bytes(data)
 
-            mjai_messages = self.bridge.parse(raw_bytes)
-
-            if not mjai_messages:
+            # 仅解析服务端下行消息，避免与回显确认重复计数；上行帧只写入录制文件。
+            # CDP 中 outbound=客户端->服务端，inbound=服务端->客户端。
+            if message.direction == "outbound":
+                self._record_frame(raw_bytes, outbound=True)
                 return
 
-            for msg in mjai_messages:
+            logger.trace(f"[Electron] -> Message: {data}")
+
+            for msg in self._iter_frame(raw_bytes):
                 self._enqueue_event(msg)
 
                 # 结束对局时触发返回大厅通知
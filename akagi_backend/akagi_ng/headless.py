@@ -0,0 +1,171 @@
+"""无界面 (Headless) 模式。
+
+从 stdin 或文件逐行读取 MJAI JSON 事件，按 AkagiApp Reactor 相同的 PROCESS/OUTPUT 顺序
+驱动 Controller + StateTracker，并将推荐结果逐行写出为 JSON。
+
+不启动 DataServer / MITM / Electron 客户端，也不导入 aiohttp 与 mitmproxy，
+适合批量分析牌谱；多个输入文件可通过 --jobs 分发到进程池并行处理。
+
+用法::
+
+    python -m akagi_ng.headless < game.jsonl > out.jsonl
+    python -m akagi_ng.headless logs/*.jsonl --output-dir results --jobs 8
+"""
+
+import argparse
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TextIO
+
+from akagi_ng.core.logging import configure_logging, logger
+from akagi_ng.mjai_bot import Controller, StateTracker
+from akagi_ng.mjai_bot.status import BotStatusContext
+from akagi_ng.mjai_bot.utils import parse_mjai_event
+from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.schema.types import MJAIEventBase, MJAIResponse
+
+logger = logger.bind(module="headless")
+
+
+class HeadlessSession:
+    """单条事件流的处理会话，每个会话持有独立的 Controller 与 StateTracker。"""
+
+    def __init__(self, player_id: int = 0):
+        self.player_id = player_id
+        self.status = BotStatusContext()
+        self.controller = Controller(status=self.status)
+        self.tracker = StateTracker(status=self.status)
+
+    def feed(self, data: dict, line: int | None = None) -> dict | None:
+        """处理一条 MJAI 事件，返回需要输出的记录；无推荐且无通知时返回 None。"""
+        if isinstance(data, dict) and data.get("type") == "start_game":
+            # 标准 MJAI 牌谱的 start_game 不带视角与人数，按 names 推断三麻
+            data.setdefault("id", self.player_id)
+            data.setdefault("is_3p", len(data.get("names", ())) == MahjongConstants.SEATS_3P)
+        try:
+            event = parse_mjai_event(data, line)
+        except ValueError as e:
+            logger.warning(f"Skipping {e}")
+            return None
+        if event is None:
+            logger.warning(f"Skipping unsupported MJAI event: {data.get('type')}")
+            return None
+
+        self.controller.react(event)
+        self.tracker.react(event)
+        notifications = sorted(self.status.flags)
+        self.status.clear_flags()
+
+        # 同步事件只推进状态，不输出推荐（与 Reactor 的 OUTPUT 阶段一致）
+        payload = None
+        response = self.controller.last_response
+        if not (isinstance(event, MJAIEventBase) and event.sync):
+            payload = self.tracker.build_recommendations(response or MJAIResponse(type="none"))
+
+        if not payload and not notifications:
+            return None
+
+        record: dict = {"type": event.type}
+        if response:
+            record["response"] = {k: v for k, v in response.items() if k != "meta"}
+        if payload:
+            record.update(payload)
+        if notifications:
+            record["notifications"] = notifications
+        return record
+
+    def run(self, lines: Iterable[str]) -> Iterator[dict]:
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping invalid JSON at line {lineno}")
+                continue
+            if record := self.feed(data, lineno):
+                record["line"] = lineno
+                yield record
+
+
+def process_stream(source: TextIO, sink: TextIO, player_id: int = 0, flush: bool = True) -> int:
+    """流式处理并返回输出记录数。
+
+    flush=True 时每条记录输出后立即 flush，便于与其他进程通过管道串联；写文件时关闭以减少系统调用。
+    """
+    count = 0
+    for record in HeadlessSession(player_id).run(source):
+        sink.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if flush:
+            sink.flush()
+        count += 1
+    return count
+
+
+def process_file(input_path: Path, output_path: Path, player_id: int = 0) -> int:
+    with input_path.open(encoding="utf-8") as src, output_path.open("w", encoding="utf-8") as dst:
+        return process_stream(src, dst, player_id, flush=False)
+
+
+def _run_file_job(job: tuple[Path, Path, int]) -> tuple[Path, int]:
+    input_path, output_path, player_id = job
+    try:
+        return input_path, process_file(input_path, output_path, player_id)
+    except Exception:
+        logger.exception(f"Failed to analyze {input_path}")
+        return input_path, -1
+
+
+def process_files(
+    inputs: list[Path], output_dir: Path, player_id: int = 0, jobs: int = 1, log_level: str = "INFO"
+) -> dict[Path, int]:
+    """批量处理多个输入文件，输出到 output_dir/<文件名>.jsonl。
+
+    jobs > 1 时按文件分发到进程池，每个工作进程独立加载并缓存模型资源。
+    返回每个输入文件的输出记录数（失败为 -1）。
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    job_list = [(path, output_dir / f"{path.stem}.jsonl", player_id) for path in inputs]
+    if jobs <= 1 or len(job_list) <= 1:
+        return dict(map(_run_file_job, job_list))
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=configure_logging, initargs=(log_level, False)) as executor:
+        return dict(executor.map(_run_file_job, job_list))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="akagi-ng-headless", description="Headless MJAI recommendation stream")
+    parser.add_argument("inputs", nargs="*", type=Path, help="MJAI jsonl files (default: stdin)")
+    parser.add_argument("-o", "--output-dir", type=Path, help="write <name>.jsonl per input instead of stdout")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for multiple inputs")
+    parser.add_argument("--player-id", type=int, default=0, help="seat used when start_game has no id")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args(argv)
+
+    # stdout 只用于输出数据，日志仅写入文件
+    configure_logging(args.log_level, console=False)
+
+    if args.output_dir:
+        if not args.inputs:
+            parser.error("--output-dir requires input files")
+        results = process_files(args.inputs, args.output_dir, args.player_id, args.jobs, args.log_level)
+        failed = [path for path, count in results.items() if count < 0]
+        for path in failed:
+            print(f"failed: {path}", file=sys.stderr)
+        return 1 if failed else 0
+
+    if not args.inputs:
+        process_stream(sys.stdin, sys.stdout, args.player_id)
+        return 0
+
+    for path in args.inputs:
+        with path.open(encoding="utf-8") as src:
+            process_stream(src, sys.stdout, args.player_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
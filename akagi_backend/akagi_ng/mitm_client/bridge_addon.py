@@ -12,6 +12,8 @@ from akagi_ng.bridge import (
     RiichiCityBridge,
     TenhouBridge,
 )
+from akagi_ng.core.capture import CaptureWriter, open_capture
+from akagi_ng.core.metrics import BRIDGE_EVENTS, EVENTS_DROPPED
 from akagi_ng.mitm_client.logger import logger
 from akagi_ng.schema.constants import Platform
 from akagi_ng.schema.notifications import NotificationCode
@@ -38,6 +40,8 @@ class BridgeAddon:
         self.bridges: dict[str, BaseBridge] = {}
         self.last_activity: dict[str, float] = {}  # flow_id -> 最近活动时间戳
         self.bridge_lock = threading.Lock()
+        # 原始帧录制（AKAGI_CAPTURE=1 时按连接开启）
+        self.captures: dict[str, CaptureWriter] = {}
 
         # 连接状态跟踪
         self._active_connections = 0
@@ -46,6 +50,7 @@ class BridgeAddon:
         try:
             self.mjai_messages.put(event, block=False)
         except queue.Full:
+            EVENTS_DROPPED.labels("mitm").inc()
             logger.warning(f"[MITM] MJAI message queue is full, dropping event: {event}")
 
     def _get_platform_for_flow(self, flow: mitmproxy.http.HTTPFlow) -> Platform | None:
@@ -86,6 +91,8 @@ class BridgeAddon:
                     return
 
             self.last_activity[flow.id] = time.time()
+            if capture := open_capture(platform, tag=flow.id[:8]):
+                self.captures[flow.id] = capture
             # 更新连接计数并发送通知
             self._on_connection_established()
 
@@ -144,10 +151,12 @@ class BridgeAddon:
                     return
                 bridge = self.bridges[flow.id]
                 self.last_activity[flow.id] = time.time()
-                msgs = bridge.parse(msg.content)
-
-            if msgs:
-                for m in msgs:
+                if capture := self.captures.get(flow.id):
+                    capture.write(msg.content, outbound=msg.from_client, timestamp=msg.timestamp)
+                # 边解析边入队：对局恢复时 Reactor 无需等待整条同步消息解码完毕
+                events = BRIDGE_EVENTS.labels(bridge.platform)
+                for m in bridge.iter_parse(msg.content):
+                    events.inc()
                     self._enqueue_event(m)
 
         except Exception:
@@ -173,10 +182,16 @@ class BridgeAddon:
                     game_ended = getattr(bridge, "game_ended", False)
                     del self.bridges[flow.id]
                     self.last_activity.pop(flow.id, None)
+                    self._close_capture(flow.id)
 
                     # 更新连接计数并发送通知
                     self._on_connection_closed(game_ended)
 
+    def _close_capture(self, flow_id: str):
+        if capture := self.captures.pop(flow_id, None):
+            capture.close()
+            logger.info(f"[MITM] Capture closed for flow {flow_id}: {capture.frames} frames")
+
     def _on_connection_closed(self, game_ended: bool):
         """处理连接关闭事件"""
         self._active_connections = max(0, self._active_connections - 1)
@@ -203,6 +218,7 @@ class BridgeAddon:
                     if flow_id in self.bridges:
                         del self.bridges[flow_id]
                     self.last_activity.pop(flow_id, None)
+                    self._close_capture(flow_id)
                     if flow_id in self.activated_flows:
                         self.activated_flows.remove(flow_id)
                         self._active_connections = max(0, self._active_connections - 1)
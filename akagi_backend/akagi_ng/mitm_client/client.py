@@ -73,7 +73,7 @@ class MitmClient:
 
         self.running = True
         self._thread = threading.Thread(
-            target=self._run_in_thread, args=(conf.host, conf.port, conf.upstream), daemon=True
+            target=self._run_in_thread, args=(conf.host, conf.port, conf.upstream), name="MitmClient", daemon=True
         )
         self._thread.start()
 
@@ -1,6 +1,12 @@
 from akagi_ng.mjai_bot.engine.akagi_ot import AkagiOTEngine
 from akagi_ng.mjai_bot.engine.base import BaseEngine
-from akagi_ng.mjai_bot.engine.factory import clear_resource_cache, load_bot_and_engine
+from akagi_ng.mjai_bot.engine.factory import (
+    clear_resource_cache,
+    evict_stale_resources,
+    load_bot_and_engine,
+    start_model_swap,
+    swap_model,
+)
 from akagi_ng.mjai_bot.engine.mortal import MortalEngine, MortalModelResource, load_mortal_resource
 from akagi_ng.mjai_bot.engine.provider import EngineProvider
 
@@ -11,6 +17,9 @@ __all__ = [
     "MortalEngine",
     "MortalModelResource",
     "clear_resource_cache",
+    "evict_stale_resources",
     "load_bot_and_engine",
     "load_mortal_resource",
+    "start_model_swap",
+    "swap_model",
 ]
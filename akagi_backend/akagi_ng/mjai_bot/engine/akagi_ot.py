@@ -6,6 +6,7 @@ from typing import Self
 import numpy as np
 import requests
 
+from akagi_ng.core.metrics import OT_CIRCUIT_OPEN
 from akagi_ng.mjai_bot.engine.base import BaseEngine
 from akagi_ng.mjai_bot.logger import logger
 from akagi_ng.mjai_bot.status import BotStatusContext
@@ -78,17 +79,20 @@ class AkagiOTClient:
         if not self.circuit_open:
             logger.warning(f"AkagiOT Circuit Breaker OPENED after {self._failures} failures.")
             self.circuit_open = True
+            OT_CIRCUIT_OPEN.set(1)
             status.set_flag(NotificationCode.RECONNECTING)
             status.set_metadata(NotificationCode.RECONNECTING, True)
 
     def _close_circuit(self):
         logger.info("AkagiOT Circuit Breaker HALF-OPEN. Probing connection...")
         self.circuit_open = False
+        OT_CIRCUIT_OPEN.set(0)
 
     def _reset_breaker(self, status: BotStatusContext):
         logger.info("AkagiOT Circuit Breaker CLOSED. Connection restored, service fully operational.")
         self._failures = 0
         self.circuit_open = False
+        OT_CIRCUIT_OPEN.set(0)
         status.set_flag(NotificationCode.SERVICE_RESTORED)
         status.set_metadata(NotificationCode.RECONNECTING, False)
 
@@ -1,4 +1,6 @@
 import threading
+import weakref
+from collections.abc import Callable
 from pathlib import Path
 from types import ModuleType
 from typing import Self
@@ -25,6 +27,15 @@ from akagi_ng.settings import local_settings
 _RESOURCE_CACHE: dict[str, MortalModelResource | AkagiOTClient] = {}
 _CACHE_LOCK = threading.Lock()
 
+# 存活的本地引擎，模型热切换时逐个登记新资源
+_LIVE_ENGINES: weakref.WeakSet["LazyLocalEngine"] = weakref.WeakSet()
+_LIVE_LOCK = threading.Lock()
+# 同一时间只进行一次热切换
+_SWAP_LOCK = threading.Lock()
+# 各模式（是否三麻）最新一次热切换请求的序号；线程取得锁的顺序不确定，旧请求据此丢弃
+_SWAP_GENERATIONS: dict[bool, int] = {False: 0, True: 0}
+_GENERATION_LOCK = threading.Lock()
+
 
 def clear_resource_cache(key_prefix: str | None = None):
     """清理全局资源缓存。
@@ -42,6 +53,26 @@ def clear_resource_cache(key_prefix: str | None = None):
                 del _RESOURCE_CACHE[k]
 
 
+def evict_stale_resources(old_settings: dict, new_settings: dict):
+    """按设置差异淘汰资源缓存。
+
+    只有 model_4p / model_3p 指向的模型文件不再使用或在线服务配置变化时才会淘汰，
+    修改其他设置不会导致下一次决策重新加载模型。
+    """
+    old_model = old_settings.get("model_config", {})
+    new_model = new_settings.get("model_config", {})
+    models_dir = get_models_dir()
+    in_use = {new_model.get(key) for key in ("model_4p", "model_3p")}
+    stale = {old_model.get(key) for key in ("model_4p", "model_3p")} - in_use - {None}
+    with _CACHE_LOCK:
+        for filename in stale:
+            if _RESOURCE_CACHE.pop(f"model:{models_dir / filename}", None) is not None:
+                logger.info(f"Factory: Evicted cached model resource {filename}")
+
+    if old_settings.get("ot") != new_settings.get("ot"):
+        clear_resource_cache("network:")
+
+
 class NullEngine(BaseEngine):
     """
     空引擎 - 在所有引擎都不可用时提供兜底。
@@ -79,6 +110,7 @@ class LazyLocalEngine(BaseEngine):
     """
     轻量级延迟加载引擎。
     仅在第一次调用 react_batch 时从全局缓存加载资源并创建 MortalEngine。
+    热切换登记的新资源在下一次 react_batch 开始时生效，进行中的推理继续使用旧资源。
     """
 
     def __init__(self, status: BotStatusContext, model_path: Path, consts: ModuleType, is_3p: bool):
@@ -88,9 +120,30 @@ class LazyLocalEngine(BaseEngine):
         self.engine_type = "mortal"
         self._real_engine: BaseEngine | None = None
         self._load_failed = False
+        # 由热切换线程写入，推理线程只读；用身份比较判断是否已生效，两端都无需加锁
+        self._pending: tuple[Path, MortalModelResource] | None = None
+        self._applied: tuple[Path, MortalModelResource] | None = None
+        with _LIVE_LOCK:
+            _LIVE_ENGINES.add(self)
 
     def fork(self, status: BotStatusContext | None = None) -> Self:
-        return LazyLocalEngine(status or self.status, self.model_path, self.consts, self.is_3p)
+        engine = LazyLocalEngine(status or self.status, self.model_path, self.consts, self.is_3p)
+        engine._pending = self._pending
+        return engine
+
+    def swap_resource(self, model_path: Path, resource: MortalModelResource):
+        """登记新的模型资源，在下一次决策开始时切换。"""
+        self._pending = (model_path, resource)
+
+    def _apply_pending(self):
+        pending = self._pending
+        if pending is None or pending is self._applied:
+            return
+        self._applied = pending
+        self.model_path, resource = pending
+        self._real_engine = MortalEngine(self.status, resource, self.is_3p)
+        self._load_failed = False
+        self.engine_type = "mortal"
 
     def _ensure_engine(self) -> BaseEngine:
         if self._real_engine is None and not self._load_failed:
@@ -114,10 +167,98 @@ class LazyLocalEngine(BaseEngine):
         masks: np.ndarray,
         invisible_obs: np.ndarray | None = None,
     ) -> tuple[list[int], list[list[float]], list[list[bool]], list[bool]]:
+        self._apply_pending()
         real_engine = self._ensure_engine()
         return real_engine.react_batch(obs, masks, invisible_obs)
 
 
+def _get_libs(is_3p: bool) -> ModuleType:
+    if is_3p:
+        from akagi_ng.core.lib_loader import libriichi3p as libs
+    else:
+        from akagi_ng.core.lib_loader import libriichi as libs
+    return libs
+
+
+def _warm_up(resource: MortalModelResource, consts: ModuleType, is_3p: bool):
+    """用全零观测执行一次推理，确认模型输出维度正确并预热推理设备。不经过 react_batch，不计入推理耗时指标。"""
+    engine = MortalEngine(BotStatusContext(), resource, is_3p)
+    obs = np.zeros((1, *consts.obs_shape(resource.version)), dtype=np.float32)
+    masks = np.ones((1, consts.ACTION_SPACE), dtype=bool)
+    engine.warm_up(obs, masks)
+
+
+def _next_swap_generation(is_3p: bool) -> int:
+    with _GENERATION_LOCK:
+        _SWAP_GENERATIONS[is_3p] += 1
+        return _SWAP_GENERATIONS[is_3p]
+
+
+def _is_superseded(is_3p: bool, generation: int | None) -> bool:
+    with _GENERATION_LOCK:
+        return generation is not None and generation != _SWAP_GENERATIONS[is_3p]
+
+
+def swap_model(
+    model_path: Path, is_3p: bool, notify: Callable[[NotificationCode], None], generation: int | None = None
+) -> bool:
+    """
+    热切换本地模型：加载并预热新模型后，登记到所有存活的同类本地引擎，
+    各引擎在下一次决策开始时切换，不会中断进行中的推理。
+
+    Args:
+        model_path: 新模型文件路径
+        is_3p: 三麻或四麻模型
+        notify: 进度通知回调（开始、完成、失败）
+        generation: 请求序号（由 start_model_swap 分配）；已有更新的请求时放弃本次切换
+
+    Returns:
+        是否切换成功
+    """
+    with _SWAP_LOCK:
+        if _is_superseded(is_3p, generation):
+            logger.info(f"Factory: Hot swap to {model_path.name} superseded by a newer request, skipped")
+            return False
+        notify(NotificationCode.MODEL_SWAPPING)
+        try:
+            consts = _get_libs(is_3p).consts
+            resource = load_mortal_resource(model_path, consts, is_3p)
+            if resource is None:
+                raise FileNotFoundError(f"{model_path} not found or failed to load")
+            _warm_up(resource, consts, is_3p)
+        except Exception as e:
+            logger.error(f"Factory: Hot swap to {model_path.name} failed: {e}")
+            notify(NotificationCode.BOT_SWITCH_FAILED)
+            return False
+
+        if _is_superseded(is_3p, generation):
+            # 更新的请求正在等待切换锁，由它完成切换
+            logger.info(f"Factory: Hot swap to {model_path.name} superseded by a newer request, skipped")
+            return False
+
+        # 新对局直接复用已加载的资源
+        with _CACHE_LOCK:
+            resource = _RESOURCE_CACHE.setdefault(f"model:{model_path}", resource)
+        with _LIVE_LOCK:
+            engines = [engine for engine in _LIVE_ENGINES if engine.is_3p == is_3p]
+        for engine in engines:
+            engine.swap_resource(model_path, resource)
+
+        logger.info(f"Factory: Hot swapped {len(engines)} engine(s) to {model_path.name}")
+        notify(NotificationCode.MODEL_SWAPPED)
+        return True
+
+
+def start_model_swap(model_path: Path, is_3p: bool, notify: Callable[[NotificationCode], None]) -> threading.Thread:
+    """在后台线程中执行 swap_model。序号在调用线程内分配，多个请求按调用顺序决定最终生效的模型。"""
+    generation = _next_swap_generation(is_3p)
+    thread = threading.Thread(
+        target=swap_model, args=(model_path, is_3p, notify, generation), name="ModelSwap", daemon=True
+    )
+    thread.start()
+    return thread
+
+
 def _get_or_load_model_resource(model_path: Path, consts: ModuleType, is_3p: bool) -> MortalModelResource | None:
     """获取或加载模型资源缓存。"""
     cache_key = f"model:{model_path}"
@@ -146,14 +287,8 @@ def load_bot_and_engine(
     status: BotStatusContext, player_id: int, is_3p: bool = False
 ) -> tuple[MJAIBotProtocol, EngineProtocol]:
     """加载引擎的统一入口"""
-    if is_3p:
-        from akagi_ng.core.lib_loader import libriichi3p as libs
-
-        model_filename = local_settings.model_config.model_3p
-    else:
-        from akagi_ng.core.lib_loader import libriichi as libs
-
-        model_filename = local_settings.model_config.model_4p
+    libs = _get_libs(is_3p)
+    model_filename = local_settings.model_config.model_3p if is_3p else local_settings.model_config.model_4p
 
     consts = libs.consts
     model_path = get_models_dir() / model_filename
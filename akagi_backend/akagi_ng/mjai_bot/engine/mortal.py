@@ -7,6 +7,7 @@ import numpy as np
 import torch
 from torch.distributions import Categorical, Normal
 
+from akagi_ng.core.metrics import timed
 from akagi_ng.mjai_bot.engine.base import BaseEngine
 from akagi_ng.mjai_bot.logger import logger
 from akagi_ng.mjai_bot.network import (
@@ -55,6 +56,7 @@ class MortalEngine(BaseEngine):
         """创建共享模型资源的副本"""
         return MortalEngine(status or self.status, self.resource, self.is_3p)
 
+    @timed("mortal.react_batch")
     def react_batch(
         self,
         obs: np.ndarray,
@@ -72,6 +74,11 @@ class MortalEngine(BaseEngine):
         except Exception as ex:
             raise RuntimeError(f"Error during inference: {ex}") from ex
 
+    def warm_up(self, obs: np.ndarray, masks: np.ndarray):
+        """执行一次推理但不计入耗时指标，用于热切换时校验输出维度并预热推理设备。"""
+        with torch.inference_mode():
+            self._react_batch(np.asanyarray(obs), np.asanyarray(masks), None)
+
     def _react_batch(
         self, obs: np.ndarray, masks: np.ndarray, invisible_obs: np.ndarray
     ) -> tuple[list[int], list[list[float]], list[list[bool]], list[bool]]:
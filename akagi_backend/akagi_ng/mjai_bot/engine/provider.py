@@ -1,7 +1,9 @@
+import time
 from typing import Self
 
 import numpy as np
 
+from akagi_ng.core.metrics import ENGINE_FALLBACKS, INFERENCE_LATENCY
 from akagi_ng.mjai_bot.engine.base import BaseEngine
 from akagi_ng.mjai_bot.logger import logger
 from akagi_ng.schema.notifications import NotificationCode
@@ -53,18 +55,19 @@ class EngineProvider(BaseEngine):
         # 1. 尝试在线引擎
         if self.online_engine:
             try:
-                res = self.online_engine.react_batch(obs, masks, invisible_obs)
+                res = self._timed_react(self.online_engine, obs, masks, invisible_obs)
                 self.active_engine = self.online_engine
                 self.fallback_active = False
             except Exception as e:
                 self.fallback_active = True
+                ENGINE_FALLBACKS.inc()
                 self.status.set_flag(NotificationCode.FALLBACK_USED)
                 logger.warning(f"EngineProvider: Online engine failed ({e}). Falling back to local.")
 
         # 2. 如果在线失败或未启用，走本地引擎
         if res is None:
             self.active_engine = self.local_engine
-            res = self.local_engine.react_batch(obs, masks, invisible_obs)
+            res = self._timed_react(self.local_engine, obs, masks, invisible_obs)
 
         # 3. 统计上报与元数据精炼 ( Reactor 模式的统一元数据点 )
         # 确保不向前端返回 None，且状态语义清晰。
@@ -95,6 +98,19 @@ class EngineProvider(BaseEngine):
 
         return res
 
+    @staticmethod
+    def _timed_react(
+        engine: BaseEngine,
+        obs: np.ndarray,
+        masks: np.ndarray,
+        invisible_obs: np.ndarray | None,
+    ) -> tuple[list[int], list[list[float]], list[list[bool]], list[bool]]:
+        """调用引擎并按引擎类型记录推理耗时（仅记录成功的调用）"""
+        start = time.perf_counter()
+        res = engine.react_batch(obs, masks, invisible_obs)
+        INFERENCE_LATENCY.labels(engine.engine_type).observe(time.perf_counter() - start)
+        return res
+
     def fork(self, status: BotStatusContext | None = None) -> Self:
         """创建 Provider 无状态副本，同时 Fork 内部引擎"""
         new_status = status or self.status
@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from typing import Literal
 
 from akagi_ng.core.lib_loader import libriichi
+from akagi_ng.core.metrics import timed
 from akagi_ng.mjai_bot.logger import logger
 from akagi_ng.mjai_bot.status import BotStatusContext
 from akagi_ng.mjai_bot.utils import meta_to_recommend, serialize_mjai_event
@@ -57,7 +58,7 @@ class StateTracker(StateTrackerProtocol):
                 case _:
                     pass
 
-            logger.debug(f"-> {processed_event}")
+            logger.debug("-> {}", processed_event)
             if self.player_state:
                 self.player_state.update(serialize_mjai_event(processed_event))
 
@@ -127,6 +128,7 @@ class StateTracker(StateTrackerProtocol):
     def discardable_tiles_riichi_declaration(self) -> list[str]:
         return self.player_state.discardable_tiles_riichi_declaration() if self.player_state else []
 
+    @timed("tracker.build_recommendations")
     def build_recommendations(self, response: MJAIResponse) -> FullRecommendationData | None:
         """构建发送到 DataServer 的 Payload"""
         try:
@@ -4,19 +4,32 @@ from functools import cache
 
 import numpy as np
 
-from akagi_ng.schema.constants import MahjongConstants
-from akagi_ng.schema.types import MJAIEvent, MJAIEventBase, MJAIMetadata
-
-# fmt: off
-mask_unicode_4p = [
-    *MahjongConstants.BASE_TILES,
-    "reach", "chi_low", "chi_mid", "chi_high", "pon", "kan_select", "hora", "ryukyoku", "none"
-]
-mask_unicode_3p = [
-    *MahjongConstants.BASE_TILES,
-    "reach", "pon", "kan_select", "nukidora", "hora", "ryukyoku", "none"
-]
-# fmt: on
+from akagi_ng.schema.constants import ModelConstants
+from akagi_ng.schema.types import (
+    AnkanEvent,
+    ChiEvent,
+    DahaiEvent,
+    DaiminkanEvent,
+    DoraEvent,
+    EndGameEvent,
+    EndKyokuEvent,
+    HoraEvent,
+    KakanEvent,
+    MJAIEvent,
+    MJAIEventBase,
+    MJAIMetadata,
+    NukidoraEvent,
+    PonEvent,
+    ReachAcceptedEvent,
+    ReachEvent,
+    RyukyokuEvent,
+    StartGameEvent,
+    StartKyokuEvent,
+    TsumoEvent,
+)
+
+mask_unicode_4p = list(ModelConstants.ACTION_LABELS_4P)
+mask_unicode_3p = list(ModelConstants.ACTION_LABELS_3P)
 
 
 def _is_approximately_equal(left: float, right: float) -> bool:
@@ -70,3 +83,45 @@ def serialize_mjai_event(event: MJAIEvent) -> str:
     """使用紧凑的 JSON 格式序列化 MJAI 事件，通过类获取缓存的 dataclass 字段。"""
     payload = {f.name: getattr(event, f.name) for f in _get_dataclass_fields(event.__class__)}
     return json.dumps(payload, separators=(",", ":"))
+
+
+_MJAI_EVENT_CLASSES: dict[str, type[MJAIEventBase]] = {
+    cls.__dataclass_fields__["type"].default: cls
+    for cls in (
+        StartGameEvent,
+        StartKyokuEvent,
+        TsumoEvent,
+        DahaiEvent,
+        ChiEvent,
+        PonEvent,
+        DaiminkanEvent,
+        AnkanEvent,
+        KakanEvent,
+        ReachEvent,
+        ReachAcceptedEvent,
+        DoraEvent,
+        NukidoraEvent,
+        EndKyokuEvent,
+        HoraEvent,
+        RyukyokuEvent,
+        EndGameEvent,
+    )
+}
+
+
+def parse_mjai_event(data: dict, line: int | None = None) -> MJAIEvent | None:
+    """将 MJAI JSON 对象还原为事件数据类，忽略未知字段；未知事件类型返回 None。
+
+    不是 JSON 对象或缺少必需字段时抛出 ValueError；line 为来源行号，会写入错误信息便于定位。
+    """
+    where = f" at line {line}" if line is not None else ""
+    if not isinstance(data, dict):
+        raise ValueError(f"MJAI event{where} is not a JSON object: {data!r}")
+    cls = _MJAI_EVENT_CLASSES.get(data.get("type"))
+    if cls is None:
+        return None
+    names = {f.name for f in _get_dataclass_fields(cls)}
+    try:
+        return cls(**{k: v for k, v in data.items() if k in names})
+    except (TypeError, KeyError) as e:
+        raise ValueError(f"Malformed MJAI {data['type']} event{where}: {e}") from e
@@ -75,6 +75,18 @@ class ModelConstants:
     ACTION_DIMS_3P: Final[int] = 44  # 三麻动作空间维度
     ACTION_DIMS_4P: Final[int] = 46  # 四麻动作空间维度
 
+    # 动作空间各维度的标签（下标即 mask_bits 的位序）
+    # fmt: off
+    ACTION_LABELS_4P: Final[tuple[str, ...]] = (
+        *MahjongConstants.BASE_TILES,
+        "reach", "chi_low", "chi_mid", "chi_high", "pon", "kan_select", "hora", "ryukyoku", "none",
+    )
+    ACTION_LABELS_3P: Final[tuple[str, ...]] = (
+        *MahjongConstants.BASE_TILES,
+        "reach", "pon", "kan_select", "nukidora", "hora", "ryukyoku", "none",
+    )
+    # fmt: on
+
 
 class ServerConstants:
     """服务器和网络相关常量"""
@@ -82,6 +94,8 @@ class ServerConstants:
     # SSE相关
     SSE_MAX_NOTIFICATION_HISTORY: Final[int] = 10  # 最大通知历史记录数
     SSE_KEEPALIVE_INTERVAL_SECONDS: Final[int] = 10  # SSE 保活间隔(秒)
+    SSE_NOTIFICATION_QUEUE_MAXSIZE: Final[int] = 100  # 每个 SSE 客户端待发送通知的上限
+    SSE_EVENT_JOURNAL_SIZE: Final[int] = 512  # 断线续传事件日志容量
     MESSAGE_QUEUE_MAXSIZE: Final[int] = 1000  # 核心/客户端消息队列最大大小
     SHUTDOWN_JOIN_TIMEOUT_SECONDS: Final[float] = 2.0  # 线程退出等待时间
     MAIN_LOOP_POLL_TIMEOUT_SECONDS: Final[float] = 0.1  # 主循环轮询超时时间
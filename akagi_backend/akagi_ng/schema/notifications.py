@@ -30,6 +30,12 @@ class NotificationCode(StrEnum):
     MODEL_LOADED_ONLINE = "model_loaded_online"
     """已加载在线模型"""
 
+    MODEL_SWAPPING = "model_swapping"
+    """正在后台加载新模型"""
+
+    MODEL_SWAPPED = "model_swapped"
+    """新模型已就绪，将在下一次决策时生效"""
+
     # ============================================================
     # Bot 功能状态通知
     # ============================================================
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import Protocol, Self
 
 import numpy as np
@@ -183,6 +183,10 @@ class GameBridge(Protocol):
         """解析平台消息。"""
         ...
 
+    def iter_parse(self, content: bytes) -> Iterator[AkagiEvent]:
+        """解析平台消息并逐个产出事件。"""
+        ...
+
 
 class MessageSource(Protocol):
     """消息源协议接口。
@@ -1,8 +1,10 @@
 import asyncio
-from dataclasses import dataclass
-from typing import Annotated, Literal, NamedTuple, NotRequired, Self, TypedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Annotated, Literal, NamedTuple, NotRequired, Self, TypedDict
 
-from aiohttp import web
+if TYPE_CHECKING:
+    # 仅用于类型标注，避免 Headless 模式导入 aiohttp
+    from aiohttp import web
 
 from akagi_ng.schema.notifications import NotificationCode
 
@@ -60,6 +62,9 @@ type SystemEventCode = Literal[
     NotificationCode.JSON_DECODE_ERROR,
     NotificationCode.MAJSOUL_PROTO_UPDATED,
     NotificationCode.MAJSOUL_PROTO_UPDATE_FAILED,
+    NotificationCode.MODEL_SWAPPING,
+    NotificationCode.MODEL_SWAPPED,
+    NotificationCode.BOT_SWITCH_FAILED,
 ]
 
 
@@ -167,11 +172,39 @@ class ProcessResult(NamedTuple):
     is_sync: bool
 
 
-class SSEClientData(NamedTuple):
-    """SSE 客户端数据"""
+@dataclass(slots=True, eq=False)
+class SSEClientData:
+    """SSE 客户端数据
+
+    推荐只保留最新一条（latest_recommendation），新推荐直接覆盖未发送的旧推荐；
+    通知按顺序进入有界队列。recommendation_ahead 记录排在待发推荐之前的通知数，
+    保证事件按 ID 顺序送达。wakeup 用于唤醒该客户端的写协程。
+    delta 客户端记录已送达的推荐版本与内容，后续只发送相对它的差量。
+    """
 
-    response: web.StreamResponse
+    response: "web.StreamResponse"
     queue: asyncio.Queue[bytes]
+    latest_recommendation: bytes | None = None
+    recommendation_ahead: int = 0
+    keep_alive_pending: bool = False
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    delta: bool = False
+    sent_version: int = 0
+    sent_recommendation: FullRecommendationData | None = None
+
+
+@dataclass(slots=True, eq=False)
+class WSClientData:
+    """WebSocket 客户端数据
+
+    binary 为 True 时使用 msgpack 二进制帧，否则使用 JSON 文本帧；推荐与通知的处理方式同 SSEClientData。
+    """
+
+    response: "web.WebSocketResponse"
+    binary: bool
+    queue: asyncio.Queue[bytes | str]
+    latest_recommendation: bytes | str | None = None
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
 
 
 # ==========================================================
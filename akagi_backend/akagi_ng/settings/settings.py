@@ -7,7 +7,8 @@ from pathlib import Path
 from typing import Self
 
 import jsonschema
-from jsonschema.exceptions import ValidationError
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
 
 from akagi_ng.core.paths import ensure_dir, get_assets_dir, get_settings_dir
 from akagi_ng.schema.constants import DEFAULT_GAME_URLS, Platform
@@ -209,27 +210,18 @@ def get_settings_dict() -> dict:
 
 def verify_settings(data: dict) -> bool:
     """根据 schema 验证设置"""
-    try:
-        jsonschema.validate(data, _get_schema())
-        return True
-    except ValidationError as e:
-        logger.error(f"Settings validation error: {e.message}")
+    if (error := best_match(_SETTINGS_VALIDATOR.iter_errors(data))) is not None:
+        logger.error(f"Settings validation error: {error.message}")
         return False
+    return True
 
 
 def _load_settings() -> Settings:
     """
     加载并验证设置。
-    - 检查 schema 文件是否存在
     - 从 CONFIG_DIR 读取 settings.json
     - 如果 settings.json 损坏，备份并重建默认设置
-
-    Raises:
-        FileNotFoundError: schema 不存在
     """
-    # 验证 schema 文件存在
-    schema = _get_schema()
-
     if not SETTINGS_JSON_PATH.exists():
         logger.warning(f"{SETTINGS_JSON_PATH} not found. Creating a default {SETTINGS_JSON_PATH}.")
         SETTINGS_JSON_PATH.write_text(
@@ -238,7 +230,7 @@ def _load_settings() -> Settings:
 
     try:
         loaded_settings = json.loads(SETTINGS_JSON_PATH.read_text(encoding="utf-8"))
-        jsonschema.validate(loaded_settings, schema)
+        _SETTINGS_VALIDATOR.validate(loaded_settings)
     except json.JSONDecodeError as e:
         loaded_settings = _backup_and_reset_settings(f"settings.json corrupted: {e}")
     except ValidationError as e:
@@ -254,6 +246,18 @@ def _get_schema() -> dict:
     return json.loads(SCHEMA_PATH.read_text(encoding="utf-8"))
 
 
+def _compile_validator() -> Validator:
+    """读取并校验 schema，返回可复用的验证器。
+
+    Raises:
+        FileNotFoundError: schema 不存在
+    """
+    schema = _get_schema()
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
 def _update_settings(settings: Settings, data: dict):
     """从字典更新 Settings 对象"""
     settings.log_level = data.get("log_level", "INFO")
@@ -306,4 +310,6 @@ def _backup_and_reset_settings(reason: str) -> dict:
     return default_settings
 
 
+# schema 在导入时编译一次，之后的验证不再读取文件或重复校验 schema 本身
+_SETTINGS_VALIDATOR: Validator = _compile_validator()
 local_settings: Settings = _load_settings()
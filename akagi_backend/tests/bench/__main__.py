@@ -0,0 +1,66 @@
+"""
+测试模块：akagi_backend/tests/bench/__main__.py
+
+描述：基准测试命令行入口。
+用法示例：
+    python -m tests.bench                              # 合成牌谱（四麻）
+    python -m tests.bench --games 20 --3p --work 4096  # 三麻 + 模拟推理开销
+    python -m tests.bench --log game.jsonl             # 回放 MJAI 牌谱
+    python -m tests.bench --capture majsoul_000.akcap  # 回放录制的平台原始帧（可重复指定分片）
+    python -m tests.bench --capture a.akcap --speed 1  # 按原始节奏回放
+    python -m tests.bench --json report.json           # 输出机器可读结果供 CI 比对
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from akagi_ng.bridge.replay import create_bridge, iter_frames
+from akagi_ng.core.capture import capture_platform
+from tests.bench.engine import stand_in_engine
+from tests.bench.generator import generate_game
+from tests.bench.harness import StageTimer, load_mjai_log, replay_frames, run_mjai_pipeline
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tests.bench", description="Akagi-NG offline replay benchmark")
+    parser.add_argument("--games", type=int, default=4, help="number of synthetic games")
+    parser.add_argument("--kyokus", type=int, default=4, help="kyokus per synthetic game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--3p", dest="is_3p", action="store_true", help="generate sanma games")
+    parser.add_argument("--work", type=int, default=0, help="stand-in model hidden width (0 = no simulated compute)")
+    parser.add_argument("--log", type=Path, action="append", default=[], help="MJAI jsonl log to replay")
+    parser.add_argument("--capture", type=Path, action="append", default=[], help="capture file(s) of one connection")
+    parser.add_argument("--speed", type=float, help="capture replay speed (default: as fast as possible)")
+    parser.add_argument("--json", type=Path, help="write report as JSON")
+    args = parser.parse_args(argv)
+
+    reports = []
+    with stand_in_engine(seed=args.seed, work_dim=args.work):
+        if not args.log and not args.capture:
+            events = []
+            for i in range(args.games):
+                events.extend(generate_game(seed=args.seed + i, kyokus=args.kyokus, is_3p=args.is_3p))
+            reports.append(run_mjai_pipeline(events, name="synthetic-3p" if args.is_3p else "synthetic-4p"))
+
+        for path in args.log:
+            reports.append(run_mjai_pipeline(load_mjai_log(path), name=path.name))
+
+        if args.capture:
+            platform = capture_platform(args.capture[0])
+            frames = (frame.data for frame in iter_frames(args.capture, args.speed))
+            timer = StageTimer()
+            events = replay_frames(create_bridge(platform), frames, timer)
+            reports.append(run_mjai_pipeline(events, name=f"{platform}:{args.capture[0].name}", timer=timer))
+
+    for report in reports:
+        print(report.format())
+
+    if args.json:
+        args.json.write_text(json.dumps([r.to_dict() for r in reports], indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+测试模块：akagi_backend/tests/bench/engine.py
+
+描述：基准测试使用的本地替身模型，不依赖模型文件即可驱动完整决策流水线。
+实现要点：
+- StandInEngine 遵循 BaseEngine 接口，按固定种子输出确定性 Q 值与动作。
+- 可选的 work_dim 以一层稠密矩阵乘模拟 CPU 推理开销。
+- stand_in_engine() 替换 MortalBot 的 load_bot_and_engine，仍经由 EngineProvider 与 libriichi Bot。
+"""
+
+import contextlib
+from collections.abc import Iterator
+from typing import Self
+from unittest.mock import patch
+
+import numpy as np
+
+from akagi_ng.mjai_bot.engine.base import BaseEngine
+from akagi_ng.mjai_bot.engine.provider import EngineProvider
+from akagi_ng.mjai_bot.status import BotStatusContext
+
+
+class StandInEngine(BaseEngine):
+    """确定性的 CPU 替身引擎。"""
+
+    def __init__(self, status: BotStatusContext, is_3p: bool, seed: int = 0, work_dim: int = 0):
+        super().__init__(status=status, is_3p=is_3p, version=4, name="StandIn", is_oracle=False)
+        self.engine_type = "mortal"
+        self.seed = seed
+        self.work_dim = work_dim
+        self._rng = np.random.default_rng(seed)
+        self._weights: np.ndarray | None = None
+
+    def fork(self, status: BotStatusContext | None = None) -> Self:
+        return StandInEngine(status or self.status, self.is_3p, self.seed, self.work_dim)
+
+    def _simulate_work(self, obs: np.ndarray):
+        flat = obs.reshape(obs.shape[0], -1).astype(np.float32, copy=False)
+        if self._weights is None or self._weights.shape[0] != flat.shape[1]:
+            self._weights = np.random.default_rng(self.seed).standard_normal(
+                (flat.shape[1], self.work_dim), dtype=np.float32
+            )
+        np.maximum(flat @ self._weights, 0.0)
+
+    def react_batch(
+        self,
+        obs: np.ndarray,
+        masks: np.ndarray,
+        invisible_obs: np.ndarray | None = None,
+    ) -> tuple[list[int], list[list[float]], list[list[bool]], list[bool]]:
+        obs = np.asanyarray(obs)
+        masks = np.asanyarray(masks, dtype=bool)
+        if self.work_dim > 0:
+            self._simulate_work(obs)
+
+        q_values = self._rng.standard_normal(masks.shape, dtype=np.float32)
+        q_values[~masks] = -np.inf
+        actions = q_values.argmax(-1)
+        return actions.tolist(), q_values.tolist(), masks.tolist(), [True] * masks.shape[0]
+
+
+@contextlib.contextmanager
+def stand_in_engine(seed: int = 0, work_dim: int = 0) -> Iterator[list[StandInEngine]]:
+    """在上下文内让 MortalBot 使用 StandInEngine。产出本次创建的引擎列表便于统计。"""
+    created: list[StandInEngine] = []
+
+    def _load(status: BotStatusContext, player_id: int, is_3p: bool = False) -> tuple[object, EngineProvider]:
+        if is_3p:
+            from akagi_ng.core.lib_loader import libriichi3p as libs
+        else:
+            from akagi_ng.core.lib_loader import libriichi as libs
+
+        engine = StandInEngine(status, is_3p, seed=seed + len(created), work_dim=work_dim)
+        created.append(engine)
+        provider = EngineProvider(status, None, engine, is_3p)
+        return libs.mjai.Bot(provider, player_id), provider
+
+    with patch("akagi_ng.mjai_bot.bot.load_bot_and_engine", side_effect=_load):
+        yield created
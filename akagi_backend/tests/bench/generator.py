@@ -0,0 +1,102 @@
+"""
+测试模块：akagi_backend/tests/bench/generator.py
+
+描述：确定性合成牌谱生成器，为基准测试提供可复现的 MJAI 事件序列。
+生成逻辑：
+- 按种子洗牌，构造符合牌数约束的牌山（四麻 136 张 / 三麻 108 张，含赤宝牌）。
+- 每名玩家摸切直到荒牌流局，保证事件序列对 libriichi 状态机合法。
+- 非本家的摸牌以 "?" 表示，与真实客户端看到的信息一致。
+"""
+
+import random
+
+from akagi_ng.schema.constants import MahjongConstants
+from akagi_ng.schema.types import (
+    DahaiEvent,
+    EndGameEvent,
+    EndKyokuEvent,
+    MJAIEvent,
+    RyukyokuEvent,
+    StartGameEvent,
+    StartKyokuEvent,
+    TsumoEvent,
+)
+
+DEAD_WALL_SIZE = 14
+_3P_EXCLUDED = {"2m", "3m", "4m", "5m", "6m", "7m", "8m"}
+
+
+def build_wall(rng: random.Random, is_3p: bool) -> list[str]:
+    """构造并洗好一副牌山。每种 5 的其中一张替换为赤宝牌。"""
+    wall: list[str] = []
+    for tile in MahjongConstants.BASE_TILES[:34]:
+        if is_3p and tile in _3P_EXCLUDED:
+            continue
+        copies = [tile] * 4
+        if tile in ("5m", "5p", "5s"):
+            copies[0] = f"{tile}r"
+        wall.extend(copies)
+    rng.shuffle(wall)
+    return wall
+
+
+def generate_kyoku(  # noqa: PLR0913
+    rng: random.Random,
+    player_id: int,
+    *,
+    bakaze: str,
+    kyoku: int,
+    scores: list[int],
+    is_3p: bool = False,
+) -> list[MJAIEvent]:
+    """生成一局摸切至荒牌流局的事件序列。kyoku 为场内局数（从 1 开始）。"""
+    seats = MahjongConstants.SEATS_3P if is_3p else MahjongConstants.SEATS_4P
+    wall = build_wall(rng, is_3p)
+    oya = kyoku - 1
+
+    hands = [wall[i * MahjongConstants.TEHAI_SIZE : (i + 1) * MahjongConstants.TEHAI_SIZE] for i in range(seats)]
+    tehais = [hand if seat == player_id else ["?"] * MahjongConstants.TEHAI_SIZE for seat, hand in enumerate(hands)]
+    if is_3p:
+        tehais.append(["?"] * MahjongConstants.TEHAI_SIZE)
+
+    live_wall = wall[seats * MahjongConstants.TEHAI_SIZE : len(wall) - DEAD_WALL_SIZE]
+    dora_marker = wall[-DEAD_WALL_SIZE + 4]
+
+    events: list[MJAIEvent] = [
+        StartKyokuEvent(
+            bakaze=bakaze,
+            dora_marker=dora_marker,
+            kyoku=kyoku,
+            honba=0,
+            kyotaku=0,
+            oya=oya,
+            scores=list(scores),
+            tehais=tehais,
+        )
+    ]
+
+    actor = oya
+    for tile in live_wall:
+        events.append(TsumoEvent(actor=actor, pai=tile if actor == player_id else "?"))
+        events.append(DahaiEvent(actor=actor, pai=tile, tsumogiri=True))
+        actor = (actor + 1) % seats
+
+    events.append(RyukyokuEvent(scores=list(scores), deltas=[0] * len(scores)))
+    events.append(EndKyokuEvent())
+    return events
+
+
+def generate_game(seed: int = 0, player_id: int = 0, kyokus: int = 4, is_3p: bool = False) -> list[MJAIEvent]:
+    """生成一场包含 kyokus 个流局的完整对局。相同参数总是返回相同序列。"""
+    rng = random.Random(seed)
+    seats = MahjongConstants.SEATS_3P if is_3p else MahjongConstants.SEATS_4P
+    scores = [35000, 35000, 35000, 0] if is_3p else [25000] * 4
+
+    events: list[MJAIEvent] = [StartGameEvent(id=player_id, is_3p=is_3p)]
+    for index in range(kyokus):
+        bakaze = "ESWN"[(index // seats) % 4]
+        events.extend(
+            generate_kyoku(rng, player_id, bakaze=bakaze, kyoku=index % seats + 1, scores=scores, is_3p=is_3p)
+        )
+    events.append(EndGameEvent())
+    return events
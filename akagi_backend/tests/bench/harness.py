@@ -0,0 +1,204 @@
+"""
+测试模块：akagi_backend/tests/bench/harness.py
+
+描述：离线回放基准测试框架。
+实现要点：
+- run_mjai_pipeline 按 AkagiApp Reactor 的 PROCESS/OUTPUT 顺序驱动 Controller + StateTracker。
+- replay_frames 将录制的平台原始帧（见 core.capture）逐条送入对应 Bridge，可与流水线串联。
+- StageTimer 记录各阶段耗时分布；BenchReport 汇总吞吐量、分位数与峰值 RSS。
+"""
+
+import json
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from akagi_ng.bridge import BaseBridge
+from akagi_ng.mjai_bot.controller import Controller
+from akagi_ng.mjai_bot.status import BotStatusContext
+from akagi_ng.mjai_bot.tracker import StateTracker
+from akagi_ng.mjai_bot.utils import parse_mjai_event
+from akagi_ng.schema.types import AkagiEvent, MJAIEventBase, MJAIResponse
+
+# ==========================================================
+# 计时与报告
+
+
+class StageTimer:
+    """按阶段收集耗时样本（秒）。"""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        result = {}
+        for stage, values in self.samples.items():
+            arr = np.asarray(values) * 1000.0
+            result[stage] = {
+                "count": len(values),
+                "mean_ms": float(arr.mean()),
+                "p50_ms": float(np.percentile(arr, 50)),
+                "p95_ms": float(np.percentile(arr, 95)),
+                "p99_ms": float(np.percentile(arr, 99)),
+                "max_ms": float(arr.max()),
+            }
+        return result
+
+
+@dataclass
+class BenchReport:
+    name: str
+    events: int = 0
+    decisions: int = 0
+    elapsed_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def events_per_s(self) -> float:
+        return self.events / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def decisions_per_s(self) -> float:
+        return self.decisions / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["events_per_s"] = self.events_per_s
+        data["decisions_per_s"] = self.decisions_per_s
+        return data
+
+    def format(self) -> str:
+        lines = [
+            f"[{self.name}] events={self.events} decisions={self.decisions} elapsed={self.elapsed_s:.3f}s",
+            f"  throughput: {self.events_per_s:,.0f} events/s, {self.decisions_per_s:,.0f} decisions/s",
+            f"  peak RSS: {self.peak_rss_mb:.1f} MB",
+        ]
+        for stage, stats in sorted(self.stages.items()):
+            lines.append(
+                f"  {stage:<32} n={stats['count']:<7} p50={stats['p50_ms']:.3f}ms "
+                f"p95={stats['p95_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms max={stats['max_ms']:.3f}ms"
+            )
+        return "\n".join(lines)
+
+
+def peak_rss_mb() -> float:
+    """返回当前进程的峰值常驻内存 (MB)。"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class _ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ==========================================================
+# 输入加载
+
+
+def load_mjai_log(path: Path, player_id: int = 0) -> list[AkagiEvent]:
+    """读取 MJAI jsonl 牌谱。缺少 id 的 start_game 使用 player_id 补全；无法解析的行跳过并打印到 stderr。"""
+    events: list[AkagiEvent] = []
+    with path.open(encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+                if isinstance(data, dict) and data.get("type") == "start_game":
+                    data.setdefault("id", player_id)
+                    data.setdefault("is_3p", False)
+                event = parse_mjai_event(data, lineno)
+            except ValueError as e:
+                print(f"{path}: skipping line {lineno}: {e}", file=sys.stderr)
+                continue
+            if event:
+                events.append(event)
+    return events
+
+
+# ==========================================================
+# 回放
+
+
+def replay_frames(bridge: BaseBridge, frames: Iterable[bytes], timer: StageTimer) -> Iterator[AkagiEvent]:
+    """逐帧解析并产出 Bridge 输出的事件，记录 bridge.parse 阶段耗时。"""
+    for frame in frames:
+        start = time.perf_counter()
+        events = bridge.parse(frame)
+        timer.record("bridge.parse", time.perf_counter() - start)
+        if events:
+            yield from events
+
+
+def run_mjai_pipeline(
+    events: Iterable[AkagiEvent], name: str = "pipeline", timer: StageTimer | None = None
+) -> BenchReport:
+    """按 Reactor 顺序回放事件：Controller.react → StateTracker.react → build_recommendations。
+
+    引擎由调用方提前替换（见 stand_in_engine）。同步事件只推进状态，不构建推荐。
+    """
+    timer = timer or StageTimer()
+    status = BotStatusContext()
+    controller = Controller(status=status)
+    tracker = StateTracker(status=status)
+    report = BenchReport(name=name)
+
+    started = time.perf_counter()
+    for event in events:
+        t0 = time.perf_counter()
+        controller.react(event)
+        t1 = time.perf_counter()
+        tracker.react(event)
+        t2 = time.perf_counter()
+        timer.record("controller.react", t1 - t0)
+        timer.record("tracker.react", t2 - t1)
+        report.events += 1
+
+        is_sync = isinstance(event, MJAIEventBase) and event.sync
+        if not is_sync:
+            response = controller.last_response or MJAIResponse(type="none")
+            t3 = time.perf_counter()
+            payload = tracker.build_recommendations(response)
+            timer.record("tracker.build_recommendations", time.perf_counter() - t3)
+            if payload:
+                report.decisions += 1
+
+        status.clear_flags()
+        timer.record("event.total", time.perf_counter() - t0)
+
+    report.elapsed_s = time.perf_counter() - started
+    report.stages = timer.summary()
+    report.peak_rss_mb = peak_rss_mb()
+    return report
@@ -0,0 +1,135 @@
+"""
+测试模块：akagi_backend/tests/bench/test_bench_liqi.py
+
+描述：雀魂 Liqi 协议解析的微基准，CI 中可通过 `-m performance` 单独执行。
+主要测试点：
+- 典型消息大小（64B ~ 16KB）下查表实现相对逐字节循环的耗时对比。
+- 外层包装拆分：原生解析的 split_frame 相对逐块生成 dict 的纯 Python 解析。
+- 基于内置 liqi.json，类型名索引相对逐个后缀扫描的解析耗时，以及完整描述符构建耗时。
+"""
+
+import json
+import random
+import timeit
+
+import pytest
+
+from akagi_ng.bridge.majsoul.descriptors import _SCALAR_TYPES, _TypeIndex, build_file_descriptor
+from akagi_ng.bridge.majsoul.liqi import decode, keys, split_frame
+from akagi_ng.core.paths import get_assets_dir
+
+SIZES = (64, 512, 4096, 16384)
+
+
+def _loop_decode(data: bytes) -> bytes:
+    buf = bytearray(data)
+    for i in range(len(buf)):
+        buf[i] ^= (23 ^ len(buf)) + 5 * i + keys[i % len(keys)] & 255
+    return bytes(buf)
+
+
+def _parse_varint(buf: bytes, p: int) -> tuple[int, int]:
+    data = 0
+    base = 0
+    while p < len(buf):
+        data += (buf[p] & 127) << base
+        base += 7
+        p += 1
+        if buf[p - 1] >> 7 == 0:
+            break
+    return data, p
+
+
+def _dict_blocks(buf: bytes) -> list[dict]:
+    """split_frame 之前逐块生成 dict 的纯 Python 解析，作为对比基线。"""
+    p = 0
+    result = []
+    while p < len(buf):
+        block_id, block_type = buf[p] >> 3, buf[p] & 7
+        p += 1
+        if block_type == 0:
+            data, p = _parse_varint(buf, p)
+        elif block_type == 2:
+            s_len, p = _parse_varint(buf, p)
+            data = buf[p : p + s_len]
+            p += s_len
+        else:
+            raise ValueError(f"unknown pb block type: {block_type}")
+        result.append({"id": block_id, "type": block_type, "data": data})
+    return result
+
+
+def _per_call(func, data: bytes, number: int) -> float:
+    return min(timeit.repeat(lambda: func(data), number=number, repeat=3)) / number
+
+
+@pytest.mark.performance
+def test_xor_decode_speedup():
+    rng = random.Random(0)
+    lines = []
+    for size in SIZES:
+        data = rng.randbytes(size)
+        baseline = _per_call(_loop_decode, data, number=20)
+        current = _per_call(decode, data, number=200)
+        lines.append(
+            f"{size:>6}B  loop {baseline * 1e6:9.1f}us  table {current * 1e6:7.2f}us  x{baseline / current:.0f}"
+        )
+        assert current < baseline
+    print("\n".join(lines))
+
+
+def _scan_resolve(p_type: str, type_info: dict[str, bool]) -> str:
+    resolved = f".lq.{p_type}"
+    if resolved in type_info:
+        return resolved
+    suffix = f".{p_type}"
+    for k in type_info:
+        if k.endswith(suffix):
+            return k
+    return resolved
+
+
+def _field_types(nested: dict) -> list[str]:
+    types = []
+    for obj in nested.values():
+        types.extend(f["type"] for f in obj.get("fields", {}).values() if f["type"] not in _SCALAR_TYPES)
+        types.extend(_field_types(obj.get("nested", {})))
+    return types
+
+
+@pytest.mark.performance
+def test_type_name_resolution_speedup():
+    json_proto = json.loads((get_assets_dir() / "liqi.json").read_text(encoding="utf-8"))
+    lq_data = json_proto["nested"]["lq"]["nested"]
+    index = _TypeIndex()
+    index.register(lq_data, ".lq")
+    field_types = _field_types(lq_data)
+
+    def scan():
+        for name in field_types:
+            _scan_resolve(name, index.is_enum)
+
+    def indexed():
+        for name in field_types:
+            index.resolve(name)
+
+    baseline = min(timeit.repeat(scan, number=1, repeat=3))
+    current = min(timeit.repeat(indexed, number=1, repeat=3))
+    build = min(timeit.repeat(lambda: build_file_descriptor(json_proto), number=1, repeat=3))
+    print(
+        f"{len(index.is_enum)} types, {len(field_types)} typed fields: "
+        f"scan {baseline * 1e3:.2f}ms  index {current * 1e3:.2f}ms  full build {build * 1e3:.1f}ms"
+    )
+    assert current <= baseline
+
+
+@pytest.mark.performance
+def test_split_frame_speedup():
+    rng = random.Random(0)
+    payload = rng.randbytes(1024)
+    buf = b"\x0a\x13.lq.ActionPrototype\x12\x80\x08" + payload
+    baseline = _per_call(_dict_blocks, buf, number=20000)
+    current = _per_call(split_frame, buf, number=20000)
+    print(f"frame split: dict blocks {baseline * 1e6:.2f}us  native {current * 1e6:.2f}us")
+    assert split_frame(buf).data == _dict_blocks(buf)[1]["data"]
+    assert current < baseline
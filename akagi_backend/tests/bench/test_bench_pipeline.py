@@ -0,0 +1,94 @@
+"""
+测试模块：akagi_backend/tests/bench/test_bench_pipeline.py
+
+描述：离线回放基准测试在 pytest 下的入口，CI 中可通过 `-m performance` 单独执行。
+主要测试点：
+- 合成牌谱生成的确定性与牌数合法性。
+- 替身引擎遵守动作掩码且输出确定。
+- 原始帧回放对 Bridge 解析阶段的计时。
+- 完整决策流水线的吞吐量与分阶段耗时（阈值由 AKAGI_BENCH_MIN_EVENTS_PER_S 控制）。
+"""
+
+import os
+from collections import Counter
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from akagi_ng.mjai_bot.status import BotStatusContext
+from akagi_ng.schema.types import DahaiEvent, StartKyokuEvent, TsumoEvent
+from tests.bench.engine import StandInEngine, stand_in_engine
+from tests.bench.generator import generate_game
+from tests.bench.harness import StageTimer, replay_frames, run_mjai_pipeline
+from tests.conftest import HAS_LIBRIICHI
+
+
+@pytest.mark.parametrize("is_3p", [False, True])
+def test_generator_is_deterministic_and_legal(is_3p):
+    events = generate_game(seed=7, kyokus=2, is_3p=is_3p)
+    assert events == generate_game(seed=7, kyokus=2, is_3p=is_3p)
+    assert events != generate_game(seed=8, kyokus=2, is_3p=is_3p)
+
+    start = next(e for e in events if isinstance(e, StartKyokuEvent))
+    seen = Counter(start.tehais[0])
+    seen[start.dora_marker] += 1
+    for e in events:
+        if isinstance(e, DahaiEvent) and e.actor != 0:
+            seen[e.pai] += 1
+        if isinstance(e, TsumoEvent) and e.actor == 0:
+            seen[e.pai] += 1
+        if isinstance(e, StartKyokuEvent) and e is not start:
+            break
+
+    assert all(count <= 4 for count in seen.values())
+    assert all(seen[f"{n}r"] <= 1 for n in ("5m", "5p", "5s"))
+    if is_3p:
+        assert not any(t in seen for t in ("2m", "5m", "8m"))
+
+
+def test_stand_in_engine_respects_masks():
+    engine = StandInEngine(BotStatusContext(), is_3p=False, seed=1, work_dim=16)
+    obs = np.zeros((2, 4, 34), dtype=np.float32)
+    masks = np.zeros((2, 46), dtype=bool)
+    masks[0, 3] = True
+    masks[1, [5, 45]] = True
+
+    actions, q_values, out_masks, is_greedy = engine.react_batch(obs, masks)
+
+    assert actions[0] == 3
+    assert actions[1] in (5, 45)
+    assert q_values[0][0] == -np.inf
+    assert out_masks == masks.tolist()
+    assert is_greedy == [True, True]
+    assert (
+        engine.fork().react_batch(obs, masks)[1]
+        == StandInEngine(BotStatusContext(), False, seed=1).react_batch(obs, masks)[1]
+    )
+
+
+def test_replay_frames_records_parse_stage():
+    bridge = MagicMock()
+    bridge.parse.side_effect = [[DahaiEvent(actor=0, pai="1m", tsumogiri=True)], [], None]
+    timer = StageTimer()
+
+    events = list(replay_frames(bridge, [b"a", b"b", b"c"], timer))
+
+    assert len(events) == 1
+    assert timer.summary()["bridge.parse"]["count"] == 3
+
+
+@pytest.mark.skipif(not HAS_LIBRIICHI, reason="libriichi not available")
+def test_pipeline_throughput():
+    events = generate_game(seed=0, kyokus=2)
+
+    with stand_in_engine(seed=0) as engines:
+        report = run_mjai_pipeline(events, name="synthetic-4p")
+
+    print(report.format())
+    assert engines
+    assert report.events == len(events)
+    assert report.decisions > 0
+    assert {"controller.react", "tracker.react", "tracker.build_recommendations"} <= report.stages.keys()
+    assert report.peak_rss_mb > 0
+    assert report.events_per_s >= float(os.environ.get("AKAGI_BENCH_MIN_EVENTS_PER_S", "0"))
@@ -60,6 +60,8 @@ def pytest_collection_modifyitems(items: list[pytest.Item]):
             item.add_marker("unit")
         elif "/tests/integration/" in norm:
             item.add_marker("integration")
+        elif "/tests/bench/" in norm:
+            item.add_marker("performance")
 
         for marker in _infer_domain_markers(path):
             item.add_marker(marker)
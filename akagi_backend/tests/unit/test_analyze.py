@@ -0,0 +1,286 @@
+"""
+测试模块：akagi_backend/tests/unit/test_analyze.py
+
+描述：针对批量牌谱分析子系统 (akagi_ng.analyze) 的单元测试。
+主要测试点：
+- MJAI 动作到模型动作标签的映射与实际动作推断（吃的三种位置、杠、多家荣和、跳过）。
+- BatchingEngine 将多线程请求合并为单次推理、超时兜底与异常分发。
+- 列式决策记录的 q 值展开与 npz 输出。
+- analyze_logs 端到端流程：分片、逐座位分析、一致率统计与 summary.json。
+- 牌谱中无法解析的行与字段缺失的事件按行号报告并跳过，不影响整局分析。
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from akagi_ng.analyze import (
+    AgreementStats,
+    AnalyzeOptions,
+    BatchingEngine,
+    DecisionColumns,
+    action_label,
+    actual_action,
+    analyze_logs,
+    load_game,
+)
+from akagi_ng.analyze.worker import GameAnalyzer
+from akagi_ng.mjai_bot.engine.base import BaseEngine
+from akagi_ng.mjai_bot.status import BotStatusContext
+
+
+class RecordingEngine(BaseEngine):
+    def __init__(self, fail: bool = False):
+        super().__init__(status=BotStatusContext(), is_3p=False, version=4, name="Recording")
+        self.calls: list[int] = []
+        self.fail = fail
+
+    def react_batch(self, obs, masks, invisible_obs=None):
+        if self.fail:
+            raise RuntimeError("boom")
+        self.calls.append(len(obs))
+        rows = obs[:, 0].astype(int).tolist()
+        return rows, [[float(r)] for r in rows], masks.tolist(), [True] * len(rows)
+
+
+# ==========================================================
+# 动作标签
+# ==========================================================
+
+
+@pytest.mark.parametrize(
+    ("action", "label"),
+    [
+        ({"type": "dahai", "pai": "5mr"}, "5mr"),
+        ({"type": "chi", "pai": "3m", "consumed": ["4m", "5m"]}, "chi_low"),
+        ({"type": "chi", "pai": "4m", "consumed": ["3m", "5mr"]}, "chi_mid"),
+        ({"type": "chi", "pai": "5m", "consumed": ["3m", "4m"]}, "chi_high"),
+        ({"type": "ankan", "consumed": ["E", "E", "E", "E"]}, "kan_select"),
+        ({"type": "reach", "actor": 0}, "reach"),
+        ({"type": "hora", "actor": 0}, "hora"),
+        ({"type": "none"}, "none"),
+    ],
+)
+def test_action_label(action, label):
+    assert action_label(action) == label
+
+
+def test_actual_action():
+    events = [
+        {"type": "dahai", "actor": 1, "pai": "3m"},
+        {"type": "pon", "actor": 0, "target": 1, "pai": "3m", "consumed": ["3m", "3m"]},
+        {"type": "tsumo", "actor": 0, "pai": "1m"},
+        {"type": "hora", "actor": 2, "target": 3},
+        {"type": "hora", "actor": 0, "target": 3},
+    ]
+    assert actual_action(events, 0, 0) == "pon"
+    assert actual_action(events, 0, 2) == "none"
+    # 自家摸牌不是对上一张打牌的响应
+    assert actual_action(events, 1, 0) == "none"
+    # 多家荣和：第二条 hora 也属于对同一张牌的响应
+    assert actual_action(events, 2, 0) == "hora"
+
+
+# ==========================================================
+# 合批引擎
+# ==========================================================
+
+
+def _call_in_threads(batcher: BatchingEngine, count: int) -> dict[int, tuple]:
+    results: dict[int, tuple] = {}
+    barrier = threading.Barrier(count)
+
+    def worker(i: int):
+        with batcher.client():
+            barrier.wait()
+            results[i] = batcher.react_batch(np.array([[i]]), np.array([[True]]))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+def test_batching_merges_concurrent_requests():
+    inner = RecordingEngine()
+    batcher = BatchingEngine(inner, max_batch=64, max_wait=2.0)
+
+    results = _call_in_threads(batcher, 4)
+
+    assert inner.calls == [4]
+    assert {i: r[0] for i, r in results.items()} == {i: [i] for i in range(4)}
+    assert batcher.batches == 1
+    assert batcher.rows == 4
+
+
+def test_batching_respects_max_batch():
+    inner = RecordingEngine()
+    batcher = BatchingEngine(inner, max_batch=2, max_wait=2.0)
+
+    results = _call_in_threads(batcher, 4)
+
+    assert len(results) == 4
+    assert sum(inner.calls) == 4
+    assert max(inner.calls) <= 3
+
+
+def test_batching_flushes_after_max_wait():
+    inner = RecordingEngine()
+    batcher = BatchingEngine(inner, max_wait=0.01)
+
+    # 另一个已登记但尚未发起推理的线程不应导致永久等待
+    with batcher.client(), batcher.client():
+        actions, *_ = batcher.react_batch(np.array([[7]]), np.array([[True]]))
+
+    assert actions == [7]
+    assert inner.calls == [1]
+
+
+def test_batching_propagates_errors():
+    batcher = BatchingEngine(RecordingEngine(fail=True), max_wait=0.01)
+    with batcher.client(), pytest.raises(RuntimeError, match="boom"):
+        batcher.react_batch(np.array([[1]]), np.array([[True]]))
+
+
+# ==========================================================
+# 列式输出与统计
+# ==========================================================
+
+
+def test_decision_columns_expand_q_values(tmp_path):
+    columns = DecisionColumns()
+    columns.append(game=0, seat=1, event=5, chosen=2, actual=2, mask_bits=0b101, q_values=[0.5, 1.5], action_dims=4)
+    columns.append(game=0, seat=1, event=9, chosen=0, actual=3, mask_bits=0b1001, q_values=[0.1, 0.2], action_dims=4)
+
+    path = tmp_path / "d.npz"
+    columns.save(path)
+    data = np.load(path)
+
+    assert data["agree"].tolist() == [True, False]
+    np.testing.assert_array_equal(data["q_values"][0], [0.5, np.nan, 1.5, np.nan])
+    np.testing.assert_array_equal(data["q_values"][1], [np.float32(0.1), np.nan, np.nan, np.float32(0.2)])
+
+
+def test_agreement_stats_merge():
+    a, b = AgreementStats(), AgreementStats()
+    a.add("discard", True)
+    b.add("discard", False)
+    b.add("call", True)
+    a.merge(b)
+
+    assert a.to_dict()["by_kind"]["discard"] == {"decisions": 2, "agreed": 1, "rate": 0.5}
+    assert a.rate == pytest.approx(2 / 3)
+
+
+# ==========================================================
+# 端到端
+# ==========================================================
+
+
+class ScriptedBot:
+    """在自家摸牌时推荐打出摸到的牌，其余事件不响应。"""
+
+    def __init__(self, seat: int):
+        self.seat = seat
+
+    def react(self, event_json: str, can_act: bool = True) -> str | None:
+        event = json.loads(event_json)
+        if not can_act or event["type"] != "tsumo" or event["actor"] != self.seat:
+            return None
+        return json.dumps(
+            {
+                "type": "dahai",
+                "actor": self.seat,
+                "pai": event["pai"],
+                "meta": {
+                    "q_values": [1.0],
+                    "mask_bits": 1,
+                },
+            }
+        )
+
+
+def _write_game(path, discards):
+    events = [
+        {"type": "start_game", "names": ["a", "b", "c", "d"]},
+        {
+            "type": "start_kyoku",
+            "bakaze": "E",
+            "dora_marker": "1m",
+            "kyoku": 1,
+            "honba": 0,
+            "kyotaku": 0,
+            "oya": 0,
+            "scores": [25000] * 4,
+            "tehais": [["?"] * 13] * 4,
+        },
+    ]
+    for seat, (tsumo, discard) in enumerate(discards):
+        events.append({"type": "tsumo", "actor": seat, "pai": tsumo})
+        events.append({"type": "dahai", "actor": seat, "pai": discard, "tsumogiri": tsumo == discard})
+    path.write_text("\n".join(json.dumps(e) for e in events), encoding="utf-8")
+
+
+def test_load_game_detects_seats(tmp_path):
+    path = tmp_path / "g.jsonl"
+    _write_game(path, [("1m", "1m")])
+    assert load_game(path).seats == [0, 1, 2, 3]
+    assert load_game(path, seats=(2,)).seats == [2]
+    assert not load_game(path).is_3p
+
+
+def test_bad_lines_are_skipped(tmp_path):
+    path = tmp_path / "g.jsonl"
+    _write_game(path, [("1m", "1m"), ("2m", "9p")])
+    lines = path.read_text(encoding="utf-8").splitlines()
+    # 第 3 行改为字段缺失的摸牌，末尾追加被截断的一行
+    lines[2] = '{"type": "tsumo", "actor": 0}'
+    path.write_text("\n".join([*lines, '{"type": "dahai", "ac']), encoding="utf-8")
+
+    game = load_game(path, seats=(0, 1))
+    assert len(game.events) == 6
+    assert game.lines == [1, 2, 3, 4, 5, 6]
+
+    analyzer = GameAnalyzer(AnalyzeOptions(output_dir=tmp_path))
+    with (
+        patch.object(GameAnalyzer, "_load_engine", return_value=RecordingEngine()),
+        patch.object(GameAnalyzer, "create_bot", side_effect=lambda _is_3p, seat: ScriptedBot(seat)),
+        patch("akagi_ng.analyze.worker.logger") as mock_logger,
+    ):
+        columns, _stats = analyzer.analyze_seat(0, game, 0)
+        analyzer.analyze_seat(0, game, 1)
+
+    assert columns.event == []
+    assert "line 3" in mock_logger.warning.call_args.args[0]
+
+
+def test_analyze_logs_end_to_end(tmp_path):
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    _write_game(logs / "a.jsonl", [("1m", "1m"), ("2m", "9p")])
+    _write_game(logs / "b.jsonl", [("3s", "3s")])
+    (logs / "broken.jsonl").write_text('{"type": "start_kyoku"}\n', encoding="utf-8")
+
+    options = AnalyzeOptions(output_dir=tmp_path / "out", games_per_shard=2, concurrency=8)
+    with (
+        patch.object(GameAnalyzer, "_load_engine", return_value=RecordingEngine()),
+        patch.object(GameAnalyzer, "create_bot", side_effect=lambda _is_3p, seat: ScriptedBot(seat)),
+    ):
+        summary = analyze_logs([logs], options)
+
+    assert summary["agreement"]["decisions"] == 3
+    assert summary["agreement"]["agreed"] == 2
+    assert summary["failed"] == [str(logs / "broken.jsonl")]
+    # broken.jsonl 单独落在第二个分片，该分片没有决策，不输出文件
+    assert summary["shards"] == ["decisions_0000.npz"]
+    assert json.loads((tmp_path / "out" / "summary.json").read_text(encoding="utf-8")) == summary
+
+    data = np.load(tmp_path / "out" / "decisions_0000.npz")
+    assert data["game"].tolist() == [0, 0, 1]
+    assert data["seat"].tolist() == [0, 1, 0]
+    assert data["agree"].tolist() == [True, False, True]
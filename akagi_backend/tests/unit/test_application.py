@@ -41,6 +41,25 @@ def test_app_initialization(app) -> None:
         mock_set_ctx.assert_called_once()
 
 
+def test_app_initialization_dataserver_process(app, monkeypatch) -> None:
+    """测试 AKAGI_DATASERVER_PROCESS=1 时使用独立进程的 DataServer。"""
+    monkeypatch.setenv("AKAGI_DATASERVER_PROCESS", "1")
+    with (
+        patch("akagi_ng.application.configure_logging"),
+        patch("akagi_ng.application.DataServer") as mock_ds_class,
+        patch("akagi_ng.application.DataServerProcess") as mock_process_class,
+        patch("akagi_ng.application.MitmClient"),
+        patch("akagi_ng.mjai_bot.Controller"),
+        patch("akagi_ng.mjai_bot.StateTracker"),
+        patch("akagi_ng.electron_client.create_electron_client"),
+        patch("akagi_ng.application.set_app_context"),
+    ):
+        app.initialize()
+
+        assert app.ds is mock_process_class.return_value
+        mock_ds_class.assert_not_called()
+
+
 def test_app_start_stop(app) -> None:
     """测试应用的启动和停止信号。"""
     app.ds = MagicMock()
@@ -93,6 +112,45 @@ def test_app_main_loop_flow(app) -> None:
         mock_emit.assert_called_once()
 
 
+def test_app_main_loop_records_decisions(app) -> None:
+    """测试主循环在开启决策日志时登记决策，同步事件不登记。"""
+    app.ds = MagicMock()
+    app.decision_sink = MagicMock()
+    app._stop_event = threading.Event()
+
+    mock_ctx = MagicMock(spec=AppContext)
+    mock_ctx.state_tracker = MagicMock()
+    mock_ctx.controller = MagicMock()
+    response = MJAIResponse(type="dahai", actor=0, pai="1m", meta={"q_values": [1.0], "mask_bits": 1})
+    results = iter(
+        [
+            ProcessResult(response=response, notifications=[], is_sync=False),
+            ProcessResult(response=response, notifications=[], is_sync=True),
+        ]
+    )
+
+    def process_side_effect(*args, **kwargs):
+        result = next(results)
+        if result.is_sync:
+            app.stop()
+        return result
+
+    with (
+        patch("akagi_ng.application.get_app_context", return_value=mock_ctx),
+        patch.object(app.message_queue, "get", side_effect=[{"type": "tsumo"}, {"type": "tsumo"}]),
+        patch.object(app, "_process_event", side_effect=process_side_effect),
+        patch.object(app, "_emit_outputs"),
+        patch.object(app, "cleanup"),
+    ):
+        app.run()
+
+    app.decision_sink.record.assert_called_once()
+    event_index, recorded, latency = app.decision_sink.record.call_args.args
+    assert event_index == 1
+    assert recorded is response
+    assert latency >= 0
+
+
 def test_app_cleanup(app) -> None:
     """测试清理逻辑。"""
     app.ds = MagicMock()
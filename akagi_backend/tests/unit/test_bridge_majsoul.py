@@ -7,12 +7,16 @@
 - Liqi 协议中各种 ActionPrototype 消息到 MJAI 事件的转换。
 - 雀魂特有的牌面编码 (Tile Mapping) 到 MJAI 格式的映射。
 - 游戏结束统计与排名计算。
+- 方法名/动作名分派表的完整性，以及按方法名记录的处理耗时。
 """
 
 import unittest
+from unittest.mock import patch
 
 from akagi_ng.bridge.majsoul import MajsoulBridge
+from akagi_ng.bridge.majsoul.liqi import MsgType
 from akagi_ng.bridge.majsoul.tile_mapping import MS_TILE_2_MJAI_TILE
+from akagi_ng.core.metrics import MAJSOUL_METHOD_LATENCY
 
 
 class TestMajsoulBridge(unittest.TestCase):
@@ -504,6 +508,56 @@ class TestMajsoulBridge(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestMajsoulBridgeDispatch(unittest.TestCase):
+    def setUp(self):
+        self.bridge = MajsoulBridge()
+
+    def test_dispatch_tables_point_to_handlers(self):
+        tables = [
+            MajsoulBridge.LIQI_HANDLERS.values(),
+            MajsoulBridge.STREAMING_HANDLERS.values(),
+            MajsoulBridge.ACTION_HANDLERS.values(),
+        ]
+        for handlers in tables:
+            for name in handlers:
+                self.assertTrue(callable(getattr(self.bridge, name)), name)
+        self.assertEqual(MajsoulBridge.LIQI_METHODS, {method for method, _ in MajsoulBridge.LIQI_HANDLERS})
+        self.assertLessEqual(MajsoulBridge.STREAMING_HANDLERS.keys(), MajsoulBridge.LIQI_METHODS)
+
+    def test_dispatch_respects_message_type(self):
+        msg = {"method": ".lq.FastTest.syncGame", "type": MsgType.Req, "data": {}}
+        with patch.object(self.bridge, "_parse_sync_game") as handler:
+            self.assertEqual(self.bridge.parse_liqi(msg), [])
+        handler.assert_not_called()
+
+        msg = {"method": ".lq.NotifyGameTerminate", "type": MsgType.Notify, "data": {}}
+        with patch.object(self.bridge, "_handle_game_end", return_value=["end"]) as handler:
+            self.assertEqual(self.bridge.parse_liqi(msg), ["end"])
+        handler.assert_called_once_with(msg)
+
+    def test_unknown_action_only_flushes_reach(self):
+        self.bridge.accept_reach = self.bridge.make_reach_accepted(1)
+        msg = {"method": ".lq.ActionPrototype", "type": MsgType.Notify, "data": {"name": "ActionUnknown", "data": {}}}
+        events = self.bridge.parse_liqi(msg)
+        self.assertEqual([e.type for e in events], ["reach_accepted"])
+
+    def test_handle_time_recorded_per_method(self):
+        child = MAJSOUL_METHOD_LATENCY.labels(".lq.NotifyGameEndResult", "handle")
+        before = child.snapshot()[0]
+        self.bridge.parse_liqi({"method": ".lq.NotifyGameEndResult", "type": MsgType.Notify, "data": {}})
+        self.bridge.parse_liqi({"method": ".lq.SomeUnknownMethod", "type": MsgType.Notify, "data": {}})
+        self.assertEqual(child.snapshot()[0], before + 1)
+        self.assertNotIn((".lq.SomeUnknownMethod", "handle"), dict(MAJSOUL_METHOD_LATENCY._items()))
+
+    def test_streamed_handle_time_recorded_once(self):
+        child = MAJSOUL_METHOD_LATENCY.labels(".lq.FastTest.syncGame", "handle")
+        before = child.snapshot()[0]
+        msg = {"method": ".lq.FastTest.syncGame", "type": MsgType.Res, "data": {}}
+        events = list(self.bridge.iter_liqi(msg))
+        self.assertEqual(events[0].type, "system_event")
+        self.assertEqual(child.snapshot()[0], before + 1)
+
+
 class TestMajsoulBridgeTileMapping(unittest.TestCase):
     """测试牌面映射功能"""
 
@@ -7,11 +7,17 @@
 - 副露（吃、碰、暗杠、加杠）后的手牌更新准确性。
 - 三麻拔北 (Kita) 场景下的手牌与自摸牌处理逻辑。
 - 庄家 14 张初始手牌的排序与分割。
+- 计数数组手牌 (HandCounts) 与排序列表实现在随机操作序列及赤五/杠场景下的结果一致。
 """
 
+import random
 import unittest
+from functools import cmp_to_key
 
 from akagi_ng.bridge.majsoul import MajsoulBridge
+from akagi_ng.bridge.majsoul.hand import HandCounts
+from akagi_ng.bridge.majsoul.tile_mapping import compare_pai
+from akagi_ng.schema.constants import MahjongConstants
 
 
 class TestMajsoulBridgeHandTracking(unittest.TestCase):
@@ -534,3 +540,95 @@ class TestMajsoulBridgeKitaDebug(unittest.TestCase):
 
         all_bot_tiles = [*bot_tehais, bot_tsumo]
         self.assertIn("N", all_bot_tiles, "Bot 的视野中应该包含 'N' 牌")
+
+
+class _ListHand:
+    """改为计数数组之前的列表实现，作为对照。"""
+
+    def __init__(self, tiles):
+        self.tiles = sorted(tiles, key=cmp_to_key(compare_pai))
+
+    def add(self, tile):
+        self.tiles.append(tile)
+        self.tiles.sort(key=cmp_to_key(compare_pai))
+
+    def remove(self, tile):
+        if tile in self.tiles:
+            self.tiles.remove(tile)
+            return True
+        return False
+
+    def remove_like(self, tile):
+        if self.remove(tile):
+            return True
+        base = tile.rstrip("r")
+        for h in self.tiles:
+            if h.rstrip("r") == base:
+                self.tiles.remove(h)
+                return True
+        return False
+
+
+class TestHandCounts(unittest.TestCase):
+    def test_matches_sorted_list_under_random_operations(self):
+        tiles = MahjongConstants.PAI_ORDER
+        for seed in range(200):
+            rng = random.Random(seed)
+            initial = [rng.choice(tiles) for _ in range(13)]
+            hand, expected = HandCounts(initial), _ListHand(initial)
+            for _ in range(60):
+                op, tile = rng.choice(("add", "remove", "remove_like")), rng.choice(tiles)
+                self.assertEqual(getattr(hand, op)(tile), getattr(expected, op)(tile), (seed, op, tile))
+                self.assertEqual(hand.to_list(), expected.tiles, (seed, op, tile))
+                self.assertEqual(len(hand), len(expected.tiles))
+                self.assertEqual(tile in hand, tile in expected.tiles)
+
+    def test_red_five_ordering_and_pop_last(self):
+        hand = HandCounts(["5m", "C", "5mr", "?", "4m", "6m"])
+        self.assertEqual(hand.to_list(), ["4m", "5mr", "5m", "6m", "C", "?"])
+        self.assertEqual(hand.pop_last(), "?")
+        self.assertEqual(hand.pop_last(), "C")
+        self.assertEqual(HandCounts().pop_last(), None)
+
+    def test_remove_like_crosses_red_and_plain_fives(self):
+        hand = HandCounts(["5p", "5sr", "E"])
+        self.assertTrue(hand.remove_like("5pr"))
+        self.assertTrue(hand.remove_like("5s"))
+        self.assertFalse(hand.remove_like("5s"))
+        self.assertFalse(hand.remove_like("S"))
+        self.assertEqual(hand.to_list(), ["E"])
+
+    def test_bridge_kan_with_red_fives(self):
+        bridge = MajsoulBridge()
+        bridge.seat = 0
+        cases = [
+            # (手牌, 摸牌, 杠的消耗牌, 是否加杠, 加杠牌, 期望手牌)
+            (["5m", "5m", "5mr", "E"], "5m", ["5mr", "5m", "5m", "5m"], False, None, ["E"]),
+            (["5mr", "5m", "5m", "5m", "E"], "9p", ["5m", "5m", "5m", "5m"], False, None, ["9p", "E"]),
+            (["5p", "E"], "S", [], True, "5pr", ["E", "S"]),
+            (["5sr", "E"], None, [], True, "5s", ["E"]),
+            (["5sr", "5s", "E"], None, [], True, "5s", ["5sr", "E"]),
+        ]
+        for tiles, tsumohai, consumed, is_kakan, pai, expected in cases:
+            bridge.my_tehais = tiles
+            bridge.my_tsumohai = tsumohai
+            bridge._update_hand_kan(0, consumed, is_kakan, pai)
+            self.assertEqual(bridge.my_tehais, expected, (tiles, consumed, pai))
+            self.assertIsNone(bridge.my_tsumohai)
+
+    def test_bridge_discard_paths(self):
+        bridge = MajsoulBridge()
+        bridge.seat = 0
+        bridge.my_tehais = ["1m", "2m", "3m"]
+        bridge.my_tsumohai = "9s"
+        bridge._update_hand_discard(0, "2m", tsumogiri=False)
+        self.assertEqual(bridge.my_tehais, ["1m", "3m", "9s"])
+        self.assertIsNone(bridge.my_tsumohai)
+
+        bridge.my_tsumohai = "E"
+        bridge._update_hand_discard(0, "E", tsumogiri=True)
+        self.assertEqual(bridge.my_tehais, ["1m", "3m", "9s"])
+
+        bridge.my_tsumohai = "4m"
+        bridge._update_hand_discard(0, "7p", tsumogiri=False)
+        self.assertEqual(bridge.my_tehais, ["1m", "3m", "4m", "9s"])
@@ -0,0 +1,235 @@
+"""
+测试模块：akagi_backend/tests/unit/test_capture.py
+
+描述：针对原始帧录制 (core.capture) 与回放 (bridge.replay) 的单元测试。
+主要测试点：
+- 录制文件的写入与读取往返，包括 zstd 压缩与按大小滚动分片。
+- 进程被强制终止时尾部不完整记录的容错。
+- 写入失败（磁盘已满、权限）时只记录一次错误并停止录制，不向 Bridge 抛出异常。
+- 环境变量开关与 MITM / Electron 两条接入路径的录制行为，天凤 Electron 客户端同样录制上行帧。
+- 回放器按最大速度与按原始节奏将帧送入 Bridge。
+"""
+
+import queue
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from akagi_ng.bridge.replay import create_bridge, iter_frames, replay_capture
+from akagi_ng.bridge.tenhou import TenhouBridge
+from akagi_ng.core.capture import (
+    CaptureConfig,
+    CaptureWriter,
+    capture_config_from_env,
+    capture_platform,
+    iter_capture,
+    open_capture,
+)
+from akagi_ng.electron_client.majsoul import MajsoulElectronClient
+from akagi_ng.electron_client.tenhou import TenhouElectronClient
+from akagi_ng.mitm_client.bridge_addon import BridgeAddon
+from akagi_ng.schema.constants import Platform
+from akagi_ng.schema.types import WebSocketFrameMessage
+
+
+@pytest.fixture
+def capture_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("AKAGI_CAPTURE", "1")
+    monkeypatch.setenv("AKAGI_CAPTURE_DIR", str(tmp_path))
+    monkeypatch.delenv("AKAGI_CAPTURE_MAX_MB", raising=False)
+    monkeypatch.delenv("AKAGI_CAPTURE_ZSTD", raising=False)
+    return tmp_path
+
+
+def _write(tmp_path: Path, frames: list[bytes], **config) -> CaptureWriter:
+    writer = CaptureWriter(CaptureConfig(directory=tmp_path, **config), "majsoul", tag="t")
+    for i, data in enumerate(frames):
+        writer.write(data, outbound=i % 2 == 1, timestamp=100.0 + i)
+    writer.close()
+    return writer
+
+
+# ==========================================================
+# 录制格式
+# ==========================================================
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_roundtrip(tmp_path, compress):
+    if compress:
+        pytest.importorskip("zstandard")
+    frames = [b"\x00\x01binary", b"", b"x" * 4096]
+    writer = _write(tmp_path, frames, compress=compress)
+
+    assert len(writer.paths) == 1
+    assert capture_platform(writer.paths[0]) == "majsoul"
+    result = list(iter_capture(writer.paths[0]))
+    assert [f.data for f in result] == frames
+    assert [f.outbound for f in result] == [False, True, False]
+    assert [f.timestamp for f in result] == [100.0, 101.0, 102.0]
+
+
+def test_rotation_by_size(tmp_path):
+    frames = [bytes([i]) * 100 for i in range(10)]
+    writer = _write(tmp_path, frames, max_bytes=250)
+
+    assert len(writer.paths) > 1
+    assert all(p.name.startswith("majsoul_") and p.suffix == ".akcap" for p in writer.paths)
+    assert [f.data for f in iter_frames(writer.paths)] == frames
+
+
+def test_write_error_disables_capture(tmp_path):
+    writer = CaptureWriter(CaptureConfig(directory=tmp_path), "majsoul")
+    writer.write(b"ok")
+    writer._stream.write = MagicMock(side_effect=OSError(28, "No space left on device"))
+
+    with patch("akagi_ng.core.capture.logger") as mock_logger:
+        writer.write(b"lost")
+        writer.write(b"ignored")
+        writer.close()
+
+    assert writer.disabled
+    assert writer.frames == 1
+    mock_logger.exception.assert_called_once()
+
+
+def test_rotation_error_disables_capture(tmp_path):
+    writer = CaptureWriter(CaptureConfig(directory=tmp_path, max_bytes=20), "majsoul")
+    writer.write(b"x" * 10)
+
+    with (
+        patch.object(Path, "open", side_effect=PermissionError("denied")),
+        patch("akagi_ng.core.capture.logger") as mock_logger,
+    ):
+        writer.write(b"y" * 10)
+        writer.write(b"z" * 10)
+
+    assert writer.disabled
+    assert writer.frames == 1
+    mock_logger.exception.assert_called_once()
+    assert [f.data for f in iter_capture(writer.paths[0])] == [b"x" * 10]
+
+
+def test_truncated_tail_ignored(tmp_path):
+    writer = _write(tmp_path, [b"first", b"second"])
+    path = writer.paths[0]
+    path.write_bytes(path.read_bytes()[:-3])
+
+    assert [f.data for f in iter_capture(path)] == [b"first"]
+
+
+def test_invalid_file_rejected(tmp_path):
+    path = tmp_path / "bad.akcap"
+    path.write_bytes(b"NOPE\x01\x00\x00\x00")
+    with pytest.raises(ValueError):
+        list(iter_capture(path))
+
+
+def test_config_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("AKAGI_CAPTURE", raising=False)
+    assert capture_config_from_env() is None
+    assert open_capture("majsoul") is None
+
+    monkeypatch.setenv("AKAGI_CAPTURE", "1")
+    monkeypatch.setenv("AKAGI_CAPTURE_DIR", str(tmp_path))
+    monkeypatch.setenv("AKAGI_CAPTURE_MAX_MB", "0.5")
+    monkeypatch.setenv("AKAGI_CAPTURE_ZSTD", "1")
+    config = capture_config_from_env()
+    assert config == CaptureConfig(directory=tmp_path, max_bytes=512 * 1024, compress=True)
+
+
+# ==========================================================
+# 回放
+# ==========================================================
+
+
+def test_replay_capture_max_speed(tmp_path):
+    writer = _write(tmp_path, [b"a", b"b", b"c"])
+    bridge = MagicMock()
+    bridge.iter_parse.side_effect = lambda data: [data.decode()] if data != b"b" else []
+
+    started = time.perf_counter()
+    events = list(replay_capture(writer.paths, bridge=bridge))
+
+    assert events == ["a", "c"]
+    assert bridge.iter_parse.call_count == 3
+    assert time.perf_counter() - started < 1.0
+
+
+def test_replay_respects_speed(tmp_path):
+    writer = CaptureWriter(CaptureConfig(directory=tmp_path), "tenhou")
+    writer.write(b"1", timestamp=10.0)
+    writer.write(b"2", timestamp=10.2)
+    writer.close()
+
+    started = time.perf_counter()
+    frames = list(iter_frames(writer.paths, speed=2.0))
+    assert len(frames) == 2
+    assert time.perf_counter() - started >= 0.09
+
+
+def test_create_bridge():
+    assert isinstance(create_bridge(Platform.TENHOU), TenhouBridge)
+    assert isinstance(create_bridge("tenhou"), TenhouBridge)
+    with pytest.raises(ValueError):
+        create_bridge("unknown")
+
+
+# ==========================================================
+# 接入路径
+# ==========================================================
+
+
+def test_bridge_addon_records_frames(capture_env):
+    addon = BridgeAddon(queue.Queue())
+    flow = MagicMock()
+    flow.id = "flow12345678"
+    flow.request.url = "wss://tenhou.net/socket"
+    message = MagicMock(content=b'{"tag":"HELO"}', from_client=True, timestamp=123.5)
+    flow.websocket.messages = [message]
+
+    with patch("akagi_ng.mitm_client.bridge_addon.local_settings") as mock_settings:
+        mock_settings.platform = "tenhou"
+        addon.websocket_start(flow)
+        addon.websocket_message(flow)
+        addon.websocket_end(flow)
+
+    assert not addon.captures
+    paths = sorted(capture_env.glob("tenhou_*.akcap"))
+    assert len(paths) == 1
+    assert list(iter_capture(paths[0])) == [(123.5, True, b'{"tag":"HELO"}')]
+
+
+def test_electron_client_records_frames(capture_env):
+    client = MajsoulElectronClient(shared_queue=queue.Queue())
+    client.bridge = MagicMock(platform=Platform.MAJSOUL)
+    client.bridge.iter_parse.return_value = []
+
+    client.start()
+    list(client._iter_frame(b"\x02frame", outbound=True))
+    client.stop()
+
+    paths = sorted(capture_env.glob("majsoul_*_electron_*.akcap"))
+    assert len(paths) == 1
+    assert [(f.outbound, f.data) for f in iter_capture(paths[0])] == [(True, b"\x02frame")]
+
+
+def test_tenhou_electron_client_records_both_directions(capture_env):
+    client = TenhouElectronClient(shared_queue=queue.Queue())
+    client.bridge = MagicMock(platform=Platform.TENHOU)
+    client.bridge.iter_parse.return_value = []
+
+    client.start()
+    client._handle_websocket_frame(WebSocketFrameMessage(direction="outbound", data='{"tag":"HELO"}'))
+    client._handle_websocket_frame(WebSocketFrameMessage(direction="inbound", data='{"tag":"INIT"}'))
+    client.stop()
+
+    paths = sorted(capture_env.glob("tenhou_*_electron_*.akcap"))
+    assert len(paths) == 1
+    assert [(f.outbound, f.data) for f in iter_capture(paths[0])] == [
+        (True, b'{"tag":"HELO"}'),
+        (False, b'{"tag":"INIT"}'),
+    ]
+    client.bridge.iter_parse.assert_called_once_with(b'{"tag":"INIT"}')
@@ -6,18 +6,21 @@
 - CORS 中间件对允许/禁止来源 (Origin) 的过滤逻辑。
 - 获取、修改和重置设置 (Settings) 的 API 接口。
 - 消息注入 (Ingest) 和系统关闭 (Shutdown) 接口的功能与错误处理。
-- 修改配置时触发的资源缓存清理逻辑。
+- 修改配置时触发的资源缓存清理与模型热切换逻辑。
 """
 
 import queue
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from aiohttp import web
 from aiohttp.test_utils import TestClient, TestServer
 
-from akagi_ng.dataserver.api import _is_allowed_origin, cors_middleware, setup_routes
-from akagi_ng.schema.types import SystemShutdownEvent, WebSocketClosedMessage
+from akagi_ng.dataserver.api import setup_routes
+from akagi_ng.dataserver.handlers import _is_allowed_origin, cors_middleware
+from akagi_ng.schema.notifications import NotificationCode
+from akagi_ng.schema.types import SystemEvent, SystemShutdownEvent, WebSocketClosedMessage
 
 
 @pytest.fixture
@@ -50,7 +53,7 @@ async def test_cors_middleware_forbidden(cli):
 
 
 async def test_get_settings(cli):
-    with patch("akagi_ng.dataserver.api.get_settings_dict", return_value={"test": "val"}):
+    with patch("akagi_ng.dataserver.handlers.get_settings_dict", return_value={"test": "val"}):
         resp = await cli.get("/api/settings")
         assert resp.status == 200
         data = await resp.json()
@@ -146,28 +149,57 @@ async def test_shutdown_with_message_queue(cli):
 
 
 async def test_save_settings_triggers_cache_clear(cli):
-    """验证保存设置时会触发缓存清理"""
+    """验证保存设置时按新旧设置差异淘汰缓存"""
+    old = {"model_config": {"device": "cuda"}}
+    new = {"model_config": {"device": "cpu"}}
+    with (
+        patch("akagi_ng.dataserver.api.verify_settings", return_value=True),
+        patch("akagi_ng.dataserver.api.local_settings") as mock_settings,
+        patch("akagi_ng.dataserver.api.evict_stale_resources") as mock_evict,
+        patch("akagi_ng.dataserver.api.get_settings_dict", return_value=old),
+    ):
+        resp = await cli.post("/api/settings", json=new)
+        assert resp.status == 200
+        mock_settings.save.assert_called_once()
+        mock_evict.assert_called_once_with(old, new)
+
+
+async def test_save_settings_starts_model_swap(cli):
+    """验证更换模型文件时启动后台热切换，进度通知写入消息队列"""
+    mock_app = MagicMock()
+    mock_app.shared_queue = queue.Queue()
+    old = {"model_config": {"model_4p": "mortal.pth", "model_3p": "mortal3p.pth"}}
+    new = {"model_config": {"model_4p": "other.pth", "model_3p": "mortal3p.pth"}}
     with (
         patch("akagi_ng.dataserver.api.verify_settings", return_value=True),
         patch("akagi_ng.dataserver.api.local_settings"),
-        patch("akagi_ng.dataserver.api.clear_resource_cache") as mock_clear,
-        patch("akagi_ng.dataserver.api.get_settings_dict", return_value={}),
+        patch("akagi_ng.dataserver.api.evict_stale_resources"),
+        patch("akagi_ng.dataserver.api.get_settings_dict", return_value=old),
+        patch("akagi_ng.dataserver.api.get_app_context", return_value=mock_app),
+        patch("akagi_ng.dataserver.api.get_models_dir", return_value=Path("models")),
+        patch("akagi_ng.dataserver.api.start_model_swap") as mock_swap,
     ):
-        resp = await cli.post("/api/settings", json={"model_config": {"device": "cpu"}})
+        resp = await cli.post("/api/settings", json=new)
         assert resp.status == 200
-        mock_clear.assert_called_once()
+
+    mock_swap.assert_called_once()
+    path, is_3p, notify = mock_swap.call_args.args
+    assert (path, is_3p) == (Path("models") / "other.pth", False)
+    notify(NotificationCode.MODEL_SWAPPED)
+    assert mock_app.shared_queue.get_nowait() == SystemEvent(code=NotificationCode.MODEL_SWAPPED)
 
 
 async def test_reset_settings_triggers_cache_clear(cli):
-    """验证重置设置时会触发缓存清理"""
+    """验证重置设置时按新旧设置差异淘汰缓存"""
     with (
         patch("akagi_ng.dataserver.api.local_settings"),
-        patch("akagi_ng.dataserver.api.clear_resource_cache") as mock_clear,
+        patch("akagi_ng.dataserver.api.evict_stale_resources") as mock_evict,
+        patch("akagi_ng.dataserver.api.get_settings_dict", return_value={"old": True}),
         patch("akagi_ng.dataserver.api.get_default_settings_dict", return_value={}),
     ):
         resp = await cli.post("/api/settings/reset")
         assert resp.status == 200
-        mock_clear.assert_called_once()
+        mock_evict.assert_called_once_with({"old": True}, {})
 
 
 async def test_save_settings_internal_error(cli):
@@ -185,6 +217,7 @@ async def test_save_settings_internal_error(cli):
 
 async def test_reset_settings_internal_error(cli):
     with (
+        patch("akagi_ng.dataserver.api.get_settings_dict", return_value={}),
         patch("akagi_ng.dataserver.api.get_default_settings_dict", return_value={"default": True}),
         patch("akagi_ng.dataserver.api.local_settings") as mock_settings,
     ):
@@ -208,3 +241,12 @@ async def test_shutdown_queue_full(cli):
         data = await resp.json()
         assert data["ok"] is False
         assert data["error"] == "Message queue is full"
+
+
+async def test_metrics_endpoint(cli):
+    resp = await cli.get("/metrics")
+    assert resp.status == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = await resp.text()
+    assert "# TYPE akagi_message_queue_depth gauge" in text
+    assert "# TYPE akagi_inference_latency_seconds histogram" in text
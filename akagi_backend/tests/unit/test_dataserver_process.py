@@ -0,0 +1,249 @@
+"""
+测试模块：akagi_backend/tests/unit/test_dataserver_process.py
+
+描述：针对多进程 DataServer (dataserver.process / dataserver.shm) 的单元测试。
+主要测试点：
+- 共享内存环形缓冲区的写入、增量读取、落后一圈时的丢失计数与超长记录拒绝。
+- 子进程路由：只读查询本地处理，其余 API 反向代理到控制服务器，控制服务器不可用时返回 502。
+- 子进程 /metrics 合并控制服务器与自身的指标，控制服务器不可用时仍导出自身指标。
+- 子进程入口模块不导入推理引擎 (torch / libriichi / mjai_bot.engine)。
+- DataServerProcess 的发送接口写入共享内存并过滤空数据。
+- 子进程在 DataServer 事件循环运行后才开始转发共享内存事件，启动失败时直接退出。
+"""
+
+import pickle
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from akagi_ng.core.metrics import MetricsRegistry
+from akagi_ng.dataserver.dataserver import DataServer
+from akagi_ng.dataserver.process import DataServerProcess, _serve, _ServeConfig, setup_proxy_routes
+from akagi_ng.dataserver.shm import SharedRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedRing(slots=4, slot_size=64)
+    yield ring
+    ring.close()
+
+
+def test_ring_roundtrip(ring):
+    reader = SharedRing(ring.name, slots=4, slot_size=64)
+    try:
+        assert ring.publish(b"a")
+        assert ring.publish(b"bc")
+        records, seq, lost = reader.read_since(0)
+        assert records == [b"a", b"bc"]
+        assert (seq, lost) == (2, 0)
+
+        ring.publish(b"d")
+        assert reader.read_since(seq) == ([b"d"], 3, 0)
+        assert reader.read_since(3) == ([], 3, 0)
+    finally:
+        reader.close()
+
+
+def test_ring_counts_overwritten_records(ring):
+    for i in range(6):
+        ring.publish(bytes([i]))
+
+    records, seq, lost = ring.read_since(0)
+    assert records == [bytes([i]) for i in range(2, 6)]
+    assert (seq, lost) == (6, 2)
+
+
+def test_ring_rejects_oversize(ring):
+    assert not ring.publish(b"x" * (ring.capacity + 1))
+    assert ring.publish(b"x" * ring.capacity)
+    assert ring.read_since(0)[0] == [b"x" * ring.capacity]
+
+
+@pytest.fixture
+async def proxy_env():
+    received = []
+
+    async def upstream_handler(request: web.Request) -> web.Response:
+        received.append((request.method, request.path_qs, await request.read()))
+        if request.path == "/metrics":
+            return web.Response(
+                text=(
+                    "# HELP akagi_ws_clients Connected WebSocket clients.\n"
+                    "# TYPE akagi_ws_clients gauge\n"
+                    'akagi_ws_clients{format="json"} 0.0\n'
+                    "# HELP akagi_parent_only Parent-only metric.\n"
+                    "# TYPE akagi_parent_only counter\n"
+                    "akagi_parent_only 7.0\n"
+                )
+            )
+        return web.json_response({"ok": True}, status=201)
+
+    upstream_app = web.Application()
+    upstream_app.router.add_route("*", "/{tail:.*}", upstream_handler)
+    upstream = TestServer(upstream_app)
+    await upstream.start_server()
+
+    app = web.Application()
+    setup_proxy_routes(app, str(upstream.make_url("/")))
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    yield client, upstream, received
+    await client.close()
+    await upstream.close()
+
+
+async def test_proxy_forwards_api(proxy_env):
+    client, _upstream, received = proxy_env
+    resp = await client.post("/api/ingest?x=1", data=b'{"a":1}', headers={"Content-Type": "application/json"})
+
+    assert resp.status == 201
+    assert resp.headers["Content-Type"].startswith("application/json")
+    assert await resp.json() == {"ok": True}
+    assert received == [("POST", "/api/ingest?x=1", b'{"a":1}')]
+
+
+async def test_proxy_serves_settings_locally(proxy_env):
+    client, _upstream, received = proxy_env
+    with patch("akagi_ng.dataserver.handlers.get_settings_dict", return_value={"k": "v"}):
+        resp = await client.get("/api/settings")
+
+    assert await resp.json() == {"ok": True, "data": {"k": "v"}}
+    assert received == []
+
+
+async def test_proxy_upstream_unavailable(proxy_env):
+    client, upstream, _received = proxy_env
+    await upstream.close()
+
+    resp = await client.get("/api/profiler")
+    assert resp.status == 502
+
+
+async def test_metrics_merges_child_registry(proxy_env):
+    client, _upstream, received = proxy_env
+    child = MetricsRegistry()
+    child.gauge("akagi_sse_clients", "Connected SSE clients.").set(3)
+    child.gauge("akagi_ws_clients", "Connected WebSocket clients.", labelnames=("format",)).labels("json").set(2)
+    with patch("akagi_ng.dataserver.process.registry", child):
+        resp = await client.get("/metrics")
+        text = await resp.text()
+
+    assert resp.status == 200
+    assert resp.headers["Content-Type"].startswith("text/plain")
+    assert received == [("GET", "/metrics", b"")]
+    assert "akagi_parent_only 7.0" in text
+    assert "akagi_sse_clients 3.0" in text
+    assert 'akagi_ws_clients{format="json"} 2.0' in text
+    assert text.count("# TYPE akagi_ws_clients gauge") == 1
+
+
+async def test_metrics_without_control_server(proxy_env):
+    client, upstream, _received = proxy_env
+    await upstream.close()
+
+    resp = await client.get("/metrics")
+    assert resp.status == 200
+    assert "# TYPE akagi_sse_clients gauge" in await resp.text()
+
+
+def test_process_module_does_not_import_engine():
+    code = (
+        "import sys, akagi_ng.dataserver.process; "
+        "print(sorted(m for m in ('torch', 'libriichi', 'akagi_ng.mjai_bot.engine') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_process_send_publishes_to_ring():
+    ds = DataServerProcess(host="127.0.0.1", external_port=0, slots=4, slot_size=256)
+    ds.ring = SharedRing(slots=4, slot_size=256)
+    try:
+        ds.send_recommendations({"recommendations": []})
+        ds.send_notifications([])
+        ds.send_recommendations({"recommendations": [{"action": "1m"}]})
+        ds.send_notifications([{"code": "a"}])
+        ds.broadcast_event("notification", {"list": ["x" * 512]})
+
+        records, _seq, _lost = ds.ring.read_since(0)
+        assert [pickle.loads(r) for r in records] == [
+            ("recommendations", {"recommendations": [{"action": "1m"}]}),
+            ("notification", {"list": [{"code": "a"}]}),
+        ]
+        assert ds._doorbell.is_set()
+    finally:
+        ds.ring.close()
+
+
+def test_dataserver_ready_after_loop_runs():
+    ds = DataServer(host="127.0.0.1", external_port=0, setup=lambda app: None)
+    ds.start()
+    try:
+        assert ds.ready.wait(timeout=5.0)
+        assert ds.running
+        assert ds.loop.is_running()
+    finally:
+        ds.stop()
+
+
+def _serve_config(ring: SharedRing) -> _ServeConfig:
+    return _ServeConfig(
+        ring_name=ring.name,
+        slots=4,
+        slot_size=64,
+        host="127.0.0.1",
+        port=0,
+        upstream="http://127.0.0.1:1",
+        log_level="INFO",
+    )
+
+
+def test_serve_starts_pump_after_ready(ring):
+    server = MagicMock()
+    server.ready = threading.Event()
+    started = []
+    stop = threading.Event()
+
+    def fake_pump(*_args):
+        started.append(server.ready.is_set())
+        stop.set()
+
+    server.start.side_effect = lambda: threading.Timer(0.05, server.ready.set).start()
+    server.running = True
+    with (
+        patch("akagi_ng.dataserver.process.configure_logging"),
+        patch("akagi_ng.dataserver.process.DataServer", return_value=server),
+        patch("akagi_ng.dataserver.process._pump", side_effect=fake_pump),
+    ):
+        _serve(_serve_config(ring), threading.Event(), stop)
+
+    assert started == [True]
+    server.stop.assert_called_once()
+
+
+def test_serve_exits_when_server_fails(ring):
+    server = MagicMock()
+    server.ready = threading.Event()
+    server.ready.set()
+    server.running = False
+    with (
+        patch("akagi_ng.dataserver.process.configure_logging"),
+        patch("akagi_ng.dataserver.process.DataServer", return_value=server),
+        patch("akagi_ng.dataserver.process._pump") as mock_pump,
+    ):
+        _serve(_serve_config(ring), threading.Event(), threading.Event())
+
+    mock_pump.assert_not_called()
@@ -0,0 +1,128 @@
+"""
+测试模块：akagi_backend/tests/unit/test_decision_log.py
+
+描述：针对列式决策日志 (core.decision_log) 的单元测试。
+主要测试点：
+- 决策记录的写入与按列读取往返，包括 q 值按 mask 展开与 top-k 计算。
+- 三麻决策按三麻动作空间展开，并按所在行的模式解读 top-k 标签。
+- 按行数与时间间隔的攒批写盘，以及关闭时的最终 flush。
+- 尾部不完整批次的容错与非法文件校验。
+- 环境变量开关。
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from akagi_ng.core.decision_log import (
+    TOP_K,
+    DecisionSink,
+    iter_decision_batches,
+    open_decision_sink,
+    read_decision_log,
+    top_k_labels,
+)
+from akagi_ng.schema.types import MJAIResponse
+
+
+def _response(q_values: list[float], mask_bits: int, **meta) -> MJAIResponse:
+    return MJAIResponse(type="dahai", actor=0, pai="1m", meta={"q_values": q_values, "mask_bits": mask_bits, **meta})
+
+
+def test_roundtrip(tmp_path):
+    sink = DecisionSink(tmp_path / "d.akdl")
+    sink.record(1, _response([0.1, 0.9, 0.5, 0.3], 0b1000_0111_0000, engine_type="mortal", shanten=2), 0.004)
+    sink.record(2, _response([1.0], 0b1, fallback_used=True, online_service_reconnecting=True), 0.001)
+    sink.record(3, MJAIResponse(type="none"), 0.0)  # 无 meta，不记录
+    sink.close()
+
+    data = read_decision_log(tmp_path / "d.akdl")
+
+    assert data["event"].tolist() == [1, 2]
+    assert data["action"].tolist() == ["dahai", "dahai"]
+    assert data["engine_type"].tolist() == ["mortal", "unknown"]
+    assert data["fallback_used"].tolist() == [False, True]
+    assert data["circuit_open"].tolist() == [False, True]
+    assert data["shanten"].tolist() == [2, -1]
+    assert data["latency_ms"][0] == pytest.approx(4.0)
+    assert data["q_values"].shape == (2, 46)
+    np.testing.assert_allclose(data["q_values"][0, [4, 5, 6, 11]], [0.1, 0.9, 0.5, 0.3])
+    assert np.isnan(data["q_values"][0, 0])
+    assert data["top_k"][0].tolist() == [5, 6, 11]
+    assert data["top_k"][1].tolist() == [0] + [-1] * (TOP_K - 1)
+
+
+def test_roundtrip_3p(tmp_path):
+    # 下标 40 在三麻中是拔北，在四麻中是 chi_high；三麻没有第 44、45 维
+    mask_bits = 1 << 4 | 1 << 40 | 1 << 43 | 1 << 45
+    sink = DecisionSink(tmp_path / "d.akdl")
+    sink.record(1, _response([0.2, 0.9, 0.1, 0.5], mask_bits), 0.0, is_3p=True)
+    sink.record(2, _response([0.2, 0.9, 0.1], 1 << 4 | 1 << 40 | 1 << 45), 0.0)
+    sink.close()
+
+    data = read_decision_log(tmp_path / "d.akdl")
+
+    assert data["is_3p"].tolist() == [True, False]
+    np.testing.assert_allclose(data["q_values"][0, [4, 40, 43]], [0.2, 0.9, 0.1])
+    assert np.isnan(data["q_values"][0, 44:]).all()
+    np.testing.assert_allclose(data["q_values"][1, [4, 40, 45]], [0.2, 0.9, 0.1])
+    assert data["top_k"][0].tolist() == [40, 4, 43]
+    assert top_k_labels(data) == [["nukidora", "5m", "none"], ["chi_high", "5m", "none"]]
+
+
+def test_flush_by_rows(tmp_path):
+    sink = DecisionSink(tmp_path / "d.akdl", flush_rows=2, flush_interval=60.0)
+    for i in range(5):
+        sink.record(i, _response([1.0], 1), 0.0)
+
+    deadline = time.monotonic() + 2.0
+    while sink.rows_written < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sink.rows_written == 4
+
+    sink.close()
+    batches = list(iter_decision_batches(tmp_path / "d.akdl"))
+    assert [len(b["event"]) for b in batches] == [2, 2, 1]
+
+
+def test_flush_by_interval(tmp_path):
+    sink = DecisionSink(tmp_path / "d.akdl", flush_rows=100, flush_interval=0.05)
+    sink.record(1, _response([1.0], 1), 0.0)
+
+    deadline = time.monotonic() + 2.0
+    while sink.rows_written < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sink.rows_written == 1
+    sink.close()
+
+
+def test_truncated_tail_ignored(tmp_path):
+    path = tmp_path / "d.akdl"
+    sink = DecisionSink(path, flush_rows=1)
+    sink.record(1, _response([1.0], 1), 0.0)
+    sink.record(2, _response([1.0], 1), 0.0)
+    sink.close()
+    path.write_bytes(path.read_bytes()[:-50])
+
+    assert read_decision_log(path)["event"].tolist() == [1]
+
+
+def test_invalid_file_rejected(tmp_path):
+    path = tmp_path / "bad.akdl"
+    path.write_bytes(b"NOPE\x01\x00\x00\x00\x00")
+    with pytest.raises(ValueError):
+        read_decision_log(path)
+
+
+def test_open_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("AKAGI_DECISION_LOG", raising=False)
+    assert open_decision_sink() is None
+
+    monkeypatch.setenv("AKAGI_DECISION_LOG", "1")
+    monkeypatch.setenv("AKAGI_DECISION_LOG_DIR", str(tmp_path))
+    sink = open_decision_sink()
+    assert sink is not None
+    sink.close()
+    assert sink.path.parent == tmp_path
+    assert read_decision_log(sink.path)["event"].size == 0
@@ -98,7 +98,7 @@ def test_majsoul_liqi_update(ms_client):
 
 
 def test_majsoul_frames(ms_client):
-    ms_client.bridge.parse.return_value = [TsumoEvent(actor=0, pai="1m"), EndGameEvent()]
+    ms_client.bridge.iter_parse.return_value = [TsumoEvent(actor=0, pai="1m"), EndGameEvent()]
     ms_client.push_message(WebSocketFrameMessage(direction="inbound", data=base64.b64encode(b"raw").decode()))
 
     assert ms_client.message_queue.get(timeout=2.0).type == "tsumo"
@@ -140,7 +140,7 @@ def test_tenhou_non_target_url_ignored(th_client):
 
 def test_tenhou_frames(th_client):
     # Text frame
-    th_client.bridge.parse.return_value = [TsumoEvent(actor=0, pai="1m")]
+    th_client.bridge.iter_parse.return_value = [TsumoEvent(actor=0, pai="1m")]
     th_client.push_message(WebSocketFrameMessage(direction="inbound", data="HELO"))
 
     msg = th_client.message_queue.get(timeout=2.0)
@@ -150,10 +150,10 @@ def test_tenhou_frames(th_client):
     th_client.push_message(
         WebSocketFrameMessage(direction="inbound", opcode=2, data=base64.b64encode(b"binary").decode())
     )
-    th_client.bridge.parse.assert_called_with(b"binary")
+    th_client.bridge.iter_parse.assert_called_with(b"binary")
 
     # Exception handle
-    th_client.bridge.parse.side_effect = Exception("crash")
+    th_client.bridge.iter_parse.side_effect = Exception("crash")
     th_client.push_message(WebSocketFrameMessage(direction="inbound", data="FAIL"))
 
     # Process remaining binary message if any
@@ -165,7 +165,7 @@ def test_tenhou_frames(th_client):
 
 def test_tenhou_outbound_frame_ignored(th_client):
     th_client.push_message(WebSocketFrameMessage(direction="outbound", data="ignore"))
-    th_client.bridge.parse.assert_not_called()
+    th_client.bridge.iter_parse.assert_not_called()
     assert th_client.message_queue.empty()
 
 
@@ -189,7 +189,7 @@ def test_tenhou_queue_full_drops_event():
 
     with patch("akagi_ng.electron_client.tenhou.TenhouBridge") as mock_bridge_cls:
         mock_bridge = mock_bridge_cls.return_value
-        mock_bridge.parse.return_value = [TsumoEvent(actor=0, pai="1m")]
+        mock_bridge.iter_parse.return_value = [TsumoEvent(actor=0, pai="1m")]
         client = TenhouElectronClient(shared_queue=q)
     client.start()
 
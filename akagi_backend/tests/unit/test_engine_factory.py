@@ -6,15 +6,30 @@
 - 延迟加载引擎 (LazyLocalEngine) 的初始化、代理和按需加载逻辑。
 - 根据 3P/4P 配置加载对应的 Bot 和引擎实例。
 - 根据在线/本地配置加载 EngineProvider 及其组合逻辑。
+- 按设置差异淘汰资源缓存，修改无关设置时保留已加载的模型。
+- 模型热切换：后台加载预热后登记到存活引擎，下一次决策时生效，失败时保留原模型。
+- 连续的热切换请求按请求顺序生效，被更新请求取代的旧请求放弃切换；预热不计入推理耗时指标。
 """
 
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
-
-from akagi_ng.mjai_bot.engine.factory import _RESOURCE_CACHE, LazyLocalEngine, load_bot_and_engine
+import torch
+
+from akagi_ng.core.metrics import STAGE_LATENCY
+from akagi_ng.mjai_bot.engine.factory import (
+    _RESOURCE_CACHE,
+    LazyLocalEngine,
+    _next_swap_generation,
+    _warm_up,
+    evict_stale_resources,
+    load_bot_and_engine,
+    swap_model,
+)
 from akagi_ng.mjai_bot.status import BotStatusContext
+from akagi_ng.schema.notifications import NotificationCode
 
 # 自动应用 mock_lib_loader_module fixture（定义在 unit/conftest.py 中）
 pytestmark = pytest.mark.usefixtures("mock_lib_loader_module")
@@ -113,3 +128,154 @@ def test_load_bot_and_engine_online(mock_lib_loader_module) -> None:
         # 应该创建了 AkagiOTEngine
         mock_ot.assert_called_once()
         assert engine.name.startswith("Provider")
+
+
+def _settings(model_4p: str = "mortal.pth", model_3p: str = "mortal3p.pth", **extra) -> dict:
+    return {"model_config": {"model_4p": model_4p, "model_3p": model_3p, "temperature": 0.3}, **extra}
+
+
+def test_evict_keeps_models_on_unrelated_change(tmp_path) -> None:
+    """测试修改无关设置时不淘汰模型与联网客户端。"""
+    _RESOURCE_CACHE[f"model:{tmp_path / 'mortal.pth'}"] = MagicMock()
+    _RESOURCE_CACHE["network:http://ot"] = MagicMock()
+    with patch("akagi_ng.mjai_bot.engine.factory.get_models_dir", return_value=tmp_path):
+        evict_stale_resources(_settings(log_level="INFO"), _settings(log_level="DEBUG"))
+    assert len(_RESOURCE_CACHE) == 2
+
+
+def test_evict_only_replaced_model(tmp_path) -> None:
+    """测试只淘汰不再使用的模型文件。"""
+    _RESOURCE_CACHE[f"model:{tmp_path / 'mortal.pth'}"] = MagicMock()
+    _RESOURCE_CACHE[f"model:{tmp_path / 'mortal3p.pth'}"] = MagicMock()
+    with patch("akagi_ng.mjai_bot.engine.factory.get_models_dir", return_value=tmp_path):
+        evict_stale_resources(_settings(), _settings(model_4p="other.pth"))
+    assert list(_RESOURCE_CACHE) == [f"model:{tmp_path / 'mortal3p.pth'}"]
+
+
+def test_evict_on_ot_change(tmp_path) -> None:
+    """测试在线服务配置变化只淘汰联网客户端，保留模型。"""
+    _RESOURCE_CACHE[f"model:{tmp_path / 'mortal.pth'}"] = MagicMock()
+    _RESOURCE_CACHE["network:http://ot"] = MagicMock()
+    with patch("akagi_ng.mjai_bot.engine.factory.get_models_dir", return_value=tmp_path):
+        evict_stale_resources(
+            _settings(ot={"online": True, "server": "http://ot"}),
+            _settings(ot={"online": False, "server": "http://ot"}),
+        )
+    assert list(_RESOURCE_CACHE) == [f"model:{tmp_path / 'mortal.pth'}"]
+
+
+def test_swap_model_switches_live_engines(mock_consts) -> None:
+    """测试热切换只影响同类引擎，并在下一次决策时生效。"""
+    old_engine = MagicMock()
+    engine_4p = LazyLocalEngine(BotStatusContext(), Path("old.pth"), mock_consts, is_3p=False)
+    engine_4p._real_engine = old_engine
+    engine_3p = LazyLocalEngine(BotStatusContext(), Path("old3p.pth"), mock_consts, is_3p=True)
+    notify = MagicMock()
+    resource = MagicMock()
+
+    with (
+        patch("akagi_ng.mjai_bot.engine.factory.load_mortal_resource", return_value=resource),
+        patch("akagi_ng.mjai_bot.engine.factory._warm_up") as mock_warm_up,
+    ):
+        assert swap_model(Path("new.pth"), False, notify)
+
+    mock_warm_up.assert_called_once()
+    assert [c.args[0] for c in notify.call_args_list] == [
+        NotificationCode.MODEL_SWAPPING,
+        NotificationCode.MODEL_SWAPPED,
+    ]
+    assert _RESOURCE_CACHE["model:new.pth"] is resource
+    # 切换前的引擎保持不变
+    assert engine_4p._real_engine is old_engine
+    assert engine_3p._pending is None
+
+    with patch("akagi_ng.mjai_bot.engine.factory.MortalEngine") as mock_mortal:
+        engine_4p.react_batch(MagicMock(), MagicMock())
+    mock_mortal.assert_called_once_with(engine_4p.status, resource, False)
+    mock_mortal.return_value.react_batch.assert_called_once()
+    assert engine_4p.model_path == Path("new.pth")
+    old_engine.react_batch.assert_not_called()
+
+
+def test_swap_model_failure_keeps_engine(mock_consts) -> None:
+    """测试新模型加载失败时通知失败并保留原模型。"""
+    engine = LazyLocalEngine(BotStatusContext(), Path("old.pth"), mock_consts, is_3p=False)
+    notify = MagicMock()
+
+    with patch("akagi_ng.mjai_bot.engine.factory.load_mortal_resource", return_value=None):
+        assert not swap_model(Path("missing.pth"), False, notify)
+
+    notify.assert_called_with(NotificationCode.BOT_SWITCH_FAILED)
+    assert engine._pending is None
+    assert _RESOURCE_CACHE == {}
+
+
+def test_swap_model_drops_stale_request(mock_consts) -> None:
+    """测试先请求的切换晚于后请求取得锁时被丢弃，存活引擎保持最新模型。"""
+    engine = LazyLocalEngine(BotStatusContext(), Path("old.pth"), mock_consts, is_3p=False)
+    generation_a = _next_swap_generation(False)
+    generation_b = _next_swap_generation(False)
+    resource_b = MagicMock()
+
+    with (
+        patch("akagi_ng.mjai_bot.engine.factory.load_mortal_resource", return_value=resource_b) as mock_load,
+        patch("akagi_ng.mjai_bot.engine.factory._warm_up"),
+    ):
+        assert swap_model(Path("b.pth"), False, MagicMock(), generation_b)
+        assert not swap_model(Path("a.pth"), False, MagicMock(), generation_a)
+
+    mock_load.assert_called_once()
+    assert engine._pending == (Path("b.pth"), resource_b)
+
+
+def test_swap_model_superseded_while_loading(mock_consts) -> None:
+    """测试加载期间出现更新的请求时放弃本次切换，由更新的请求完成。"""
+    engine = LazyLocalEngine(BotStatusContext(), Path("old.pth"), mock_consts, is_3p=True)
+    generation = _next_swap_generation(True)
+
+    def load(*_args):
+        _next_swap_generation(True)
+        return MagicMock()
+
+    with (
+        patch("akagi_ng.mjai_bot.engine.factory.load_mortal_resource", side_effect=load),
+        patch("akagi_ng.mjai_bot.engine.factory._warm_up"),
+    ):
+        assert not swap_model(Path("a.pth"), True, MagicMock(), generation)
+
+    assert engine._pending is None
+    assert _RESOURCE_CACHE == {}
+
+
+def test_warm_up_not_timed() -> None:
+    """测试预热推理校验输出维度，但不计入推理耗时指标。"""
+    resource = SimpleNamespace(
+        brain=lambda obs: obs,
+        dqn=lambda phi, masks: torch.zeros(phi.shape[0], 46),
+        version=4,
+        device=torch.device("cpu"),
+        stochastic_latent=False,
+        boltzmann_epsilon=0.0,
+        boltzmann_temp=1.0,
+        top_p=1.0,
+        engine_name="test",
+    )
+    consts = SimpleNamespace(obs_shape=lambda _version: (4,), ACTION_SPACE=46)
+    child = STAGE_LATENCY.labels("mortal.react_batch")
+    before = child.snapshot()[0]
+
+    _warm_up(resource, consts, is_3p=False)
+    with pytest.raises(RuntimeError, match="dim mismatch"):
+        _warm_up(resource, consts, is_3p=True)
+
+    assert child.snapshot()[0] == before
+
+
+def test_fork_inherits_pending_swap(mock_consts) -> None:
+    """测试切换生效前 fork 出的引擎同样使用新模型。"""
+    engine = LazyLocalEngine(BotStatusContext(), Path("old.pth"), mock_consts, is_3p=False)
+    engine.swap_resource(Path("new.pth"), MagicMock())
+
+    forked = engine.fork()
+    forked._apply_pending()
+    assert forked.model_path == Path("new.pth")
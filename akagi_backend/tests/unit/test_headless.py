@@ -0,0 +1,149 @@
+"""
+测试模块：akagi_backend/tests/unit/test_headless.py
+
+描述：针对无界面 (Headless) 模式的单元测试。
+主要测试点：
+- 单条事件的 PROCESS/OUTPUT 流程与输出记录结构（同步事件屏蔽推荐、通知透传）。
+- 空行、非法 JSON 与未知事件类型的跳过逻辑。
+- 流式输出、批量文件处理（含进程池）与命令行入口。
+- Headless 模式不导入 aiohttp / mitmproxy。
+"""
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from akagi_ng import headless
+from akagi_ng.headless import HeadlessSession, process_files, process_stream
+from akagi_ng.schema.notifications import NotificationCode
+from akagi_ng.schema.types import FullRecommendationData, MJAIResponse
+
+PAYLOAD = FullRecommendationData(
+    recommendations=[{"action": "1m", "confidence": 0.9}],
+    engine_type="mortal",
+    fallback_used=False,
+    circuit_open=False,
+)
+
+
+@pytest.fixture
+def session():
+    s = HeadlessSession(player_id=2)
+    s.controller = MagicMock()
+    s.controller.last_response = MJAIResponse(type="dahai", actor=2, pai="1m", tsumogiri=False, meta={"q_values": []})
+    s.tracker = MagicMock()
+    s.tracker.build_recommendations.return_value = PAYLOAD
+    return s
+
+
+def test_feed_builds_record(session):
+    record = session.feed({"type": "tsumo", "actor": 2, "pai": "1m"})
+
+    assert record["type"] == "tsumo"
+    assert record["response"] == {"type": "dahai", "actor": 2, "pai": "1m", "tsumogiri": False}
+    assert record["recommendations"] == PAYLOAD["recommendations"]
+    assert record["engine_type"] == "mortal"
+    session.controller.react.assert_called_once()
+    session.tracker.react.assert_called_once()
+
+
+def test_feed_fills_start_game_id(session):
+    session.feed({"type": "start_game"})
+    event = session.controller.react.call_args.args[0]
+    assert event.id == 2
+
+
+def test_feed_sync_event_suppresses_recommendations(session):
+    session.status.set_flag(NotificationCode.GAME_SYNCING)
+    session.controller.react.side_effect = lambda _e: session.status.set_flag(NotificationCode.GAME_SYNCING)
+
+    record = session.feed({"type": "tsumo", "actor": 2, "pai": "1m", "sync": True})
+
+    session.tracker.build_recommendations.assert_not_called()
+    assert "recommendations" not in record
+    assert record["notifications"] == [NotificationCode.GAME_SYNCING]
+    assert not session.status.flags
+
+
+def test_feed_without_output_returns_none(session):
+    session.controller.last_response = None
+    session.tracker.build_recommendations.return_value = None
+    assert session.feed({"type": "tsumo", "actor": 1, "pai": "?"}) is None
+    assert session.feed({"type": "unknown_event"}) is None
+    assert session.feed({"type": "tsumo", "actor": 1}) is None
+
+
+def test_process_stream_skips_invalid_lines(session):
+    lines = [
+        "",
+        '{"type": "tsumo", "actor": 2, "pai": "1m"}',
+        "not json",
+        '{"type": "tsumo", "actor": 2}',
+        '{"type": "tsumo", "actor": 2, "pai": "2m"}',
+    ]
+    source = io.StringIO("\n".join(lines))
+    sink = io.StringIO()
+
+    with (
+        patch.object(headless, "HeadlessSession", return_value=session),
+        patch.object(headless, "logger") as mock_logger,
+    ):
+        count = process_stream(source, sink)
+
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert count == 2
+    assert [record["line"] for record in records] == [2, 5]
+    assert "line 4" in mock_logger.warning.call_args.args[0]
+
+
+def test_process_files_with_pool(tmp_path):
+    inputs = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.jsonl"
+        path.write_text('{"type": "unknown_event"}\n\n', encoding="utf-8")
+        inputs.append(path)
+
+    results = process_files(inputs, tmp_path / "out", jobs=2)
+
+    assert results == {inputs[0]: 0, inputs[1]: 0}
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["a.jsonl", "b.jsonl"]
+
+
+def test_process_files_reports_failures(tmp_path):
+    missing = tmp_path / "missing.jsonl"
+    assert process_files([missing], tmp_path / "out") == {missing: -1}
+
+
+def test_main_reads_stdin(session, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"type": "tsumo", "actor": 2, "pai": "1m"}\n'))
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+
+    with (
+        patch.object(headless, "HeadlessSession", return_value=session),
+        patch.object(headless, "configure_logging") as mock_logging,
+    ):
+        assert headless.main([]) == 0
+
+    mock_logging.assert_called_once_with("INFO", console=False)
+    assert json.loads(stdout.getvalue())["response"]["pai"] == "1m"
+
+
+def test_headless_does_not_import_server_stack():
+    code = (
+        "import sys, akagi_ng.headless, akagi_ng.__main__; "
+        "print(sorted({m.split('.')[0] for m in sys.modules} & {'aiohttp', 'mitmproxy'}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,148 @@
+"""
+测试模块：akagi_backend/tests/unit/test_majsoul_descriptors.py
+
+描述：针对 liqi.json 描述池编译与缓存 (bridge.majsoul.descriptors) 的单元测试。
+主要测试点：
+- 类型名索引的解析结果与逐个后缀扫描一致。
+- 同一份定义在进程内只编译一次，多个 LiqiProto 共享描述池。
+- 磁盘缓存按内容摘要命中；定义变化时重新编译并清理旧缓存；缓存损坏时回退为重新编译。
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from akagi_ng.bridge.majsoul import descriptors
+from akagi_ng.bridge.majsoul.liqi import LiqiProto
+from akagi_ng.core.paths import get_assets_dir
+
+SAMPLE = {
+    "nested": {
+        "lq": {
+            "nested": {
+                "Outer": {
+                    "fields": {"inner": {"type": "Inner", "id": 1}, "kind": {"type": "Kind", "id": 2}},
+                    "nested": {
+                        "Inner": {"fields": {"v": {"type": "uint32", "id": 1}}},
+                        "Kind": {"values": {"A": 0, "B": 1}},
+                    },
+                },
+                "Top": {
+                    "fields": {"o": {"type": "Outer", "id": 1}, "i": {"rule": "repeated", "type": "Inner", "id": 2}}
+                },
+            }
+        }
+    }
+}
+
+
+@pytest.fixture
+def isolated(tmp_path):
+    """把缓存目录指向临时目录，并清空进程内缓存。"""
+    cache_dir = tmp_path / "cache"
+    with (
+        patch("akagi_ng.bridge.majsoul.descriptors.get_cache_dir", return_value=cache_dir),
+        patch.object(descriptors, "_current", None),
+    ):
+        yield tmp_path, cache_dir
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def _linear_resolve(p_type: str, type_info: dict[str, bool]) -> str:
+    resolved = f".lq.{p_type}"
+    if resolved in type_info:
+        return resolved
+    return next((k for k in type_info if k.endswith(f".{p_type}")), resolved)
+
+
+def test_type_index_matches_linear_scan():
+    json_proto = json.loads((get_assets_dir() / "liqi.json").read_text(encoding="utf-8"))
+    index = descriptors._TypeIndex()
+    index.register(json_proto["nested"]["lq"]["nested"], ".lq")
+
+    def field_types(nested):
+        for obj in nested.values():
+            for field in obj.get("fields", {}).values():
+                yield field["type"]
+            yield from field_types(obj.get("nested", {}))
+
+    names = set(field_types(json_proto["nested"]["lq"]["nested"])) - descriptors._SCALAR_TYPES.keys()
+    assert names
+    for name in names:
+        assert index.resolve(name) == _linear_resolve(name, index.is_enum)
+
+
+def test_build_resolves_nested_types(isolated):
+    tmp_path, _cache_dir = isolated
+    schema = descriptors.load_schema(_write(tmp_path / "liqi.json", SAMPLE))
+
+    top = schema.pool.FindMessageTypeByName("lq.Top")
+    assert top.fields_by_name["i"].message_type.full_name == "lq.Outer.Inner"
+    outer = schema.pool.FindMessageTypeByName("lq.Outer")
+    assert outer.fields_by_name["kind"].enum_type.full_name == "lq.Outer.Kind"
+
+
+def test_load_schema_shared_in_process(isolated):
+    tmp_path, _cache_dir = isolated
+    path = _write(tmp_path / "liqi.json", SAMPLE)
+
+    first = descriptors.load_schema(path)
+    with patch.object(descriptors, "build_file_descriptor") as build:
+        second = descriptors.load_schema(path)
+    assert second is first
+    build.assert_not_called()
+
+
+def test_load_schema_uses_disk_cache(isolated):
+    tmp_path, cache_dir = isolated
+    path = _write(tmp_path / "liqi.json", SAMPLE)
+    first = descriptors.load_schema(path)
+    assert [p.name for p in cache_dir.iterdir()] == [f"liqi-{first.digest}.desc"]
+
+    # 模拟进程重启：进程内缓存为空，但磁盘缓存命中，不再逐类型构建
+    with (
+        patch.object(descriptors, "_current", None),
+        patch.object(descriptors, "build_file_descriptor") as build,
+    ):
+        second = descriptors.load_schema(path)
+    build.assert_not_called()
+    assert second is not first
+    assert second.pool.FindMessageTypeByName("lq.Top") is not None
+
+
+def test_load_schema_rebuilds_on_change(isolated):
+    tmp_path, cache_dir = isolated
+    path = _write(tmp_path / "liqi.json", SAMPLE)
+    first = descriptors.load_schema(path)
+
+    changed = json.loads(json.dumps(SAMPLE))
+    changed["nested"]["lq"]["nested"]["Extra"] = {"fields": {"x": {"type": "string", "id": 1}}}
+    second = descriptors.load_schema(_write(path, changed))
+
+    assert second.digest != first.digest
+    assert second.pool.FindMessageTypeByName("lq.Extra") is not None
+    assert [p.name for p in cache_dir.iterdir()] == [f"liqi-{second.digest}.desc"]
+
+
+def test_load_schema_ignores_corrupt_cache(isolated):
+    tmp_path, cache_dir = isolated
+    path = _write(tmp_path / "liqi.json", SAMPLE)
+    digest = descriptors.load_schema(path).digest
+    (cache_dir / f"liqi-{digest}.desc").write_bytes(b"\xff\xff\xff")
+
+    with patch.object(descriptors, "_current", None):
+        schema = descriptors.load_schema(path)
+    assert schema.pool.FindMessageTypeByName("lq.Top") is not None
+
+
+def test_liqi_protos_share_pool(isolated):
+    first = LiqiProto()
+    second = LiqiProto(interested_methods={".lq.ActionPrototype"})
+    assert first.pool is second.pool
+    assert first.jsonProto is second.jsonProto
+    assert second.get_message_class("ActionNewRound") is not None
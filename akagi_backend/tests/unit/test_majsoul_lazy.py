@@ -0,0 +1,177 @@
+"""
+测试模块：akagi_backend/tests/unit/test_majsoul_lazy.py
+
+描述：针对雀魂 Protobuf 惰性映射 (bridge.majsoul.lazy) 与 LiqiProto 关注方法快速路径的单元测试。
+主要测试点：
+- LazyMessage 的键、取值与 MessageToDict(always_print_fields_with_no_presence=True) 完全一致。
+- 未设置的消息字段不出现，嵌套消息按需包装，to_dict() 物化为普通 dict。
+- 指定 interested_methods 后，无关的 Notify/Request/Response 被跳过且不产生告警，关注的方法返回 LazyMessage。
+- 方法名驻留复用同一字符串对象，关注方法的解码耗时按方法名记录。
+"""
+
+import struct
+from unittest.mock import patch
+
+import pytest
+from google.protobuf.json_format import MessageToDict
+
+from akagi_ng.bridge.majsoul.lazy import LazyMessage
+from akagi_ng.bridge.majsoul.liqi import LiqiProto, MsgType
+from akagi_ng.core.metrics import MAJSOUL_METHOD_LATENCY
+
+
+@pytest.fixture(scope="module")
+def lp():
+    return LiqiProto()
+
+
+def _frame(name: str, payload: bytes) -> bytes:
+    # 外层两个块均为 length-delimited 字段；响应的方法名块为空，需要显式写出
+    encoded = name.encode()
+    return bytes([0x0A, len(encoded)]) + encoded + bytes([0x12, len(payload)]) + payload
+
+
+def _new_round(lp: LiqiProto):
+    msg = lp.get_message_class("ActionNewRound")()
+    msg.chang = 1
+    msg.ju = 2
+    msg.ben = 1
+    msg.tiles.extend(["1m", "2m", "3p", "5z"])
+    msg.dora = "5s"
+    msg.scores.extend([25000, 25000, 24000, 26000])
+    msg.liqibang = 1
+    msg.md5 = "abc"
+    msg.left_tile_count = 69
+    msg.doras.extend(["5s"])
+    return msg
+
+
+def test_lazy_message_matches_message_to_dict(lp):
+    msg = _new_round(lp)
+    lazy = LazyMessage(msg)
+    expected = MessageToDict(msg, always_print_fields_with_no_presence=True)
+
+    assert dict(lazy.items()) == expected
+    assert lazy.to_dict() == expected
+    assert set(lazy) == set(expected)
+    assert len(lazy) == len(expected)
+    assert lazy == expected
+    assert lazy["leftTileCount"] == 69
+    assert lazy["tiles"] == ["1m", "2m", "3p", "5z"]
+    assert lazy.message is msg
+
+
+def test_lazy_message_nested_and_unset_fields(lp):
+    msg = lp.get_message_class("ResAuthGame")()
+    msg.players.add(account_id=42, nickname="a")
+    msg.seat_list.extend([42, 0, 7, 8])
+    expected = MessageToDict(msg, always_print_fields_with_no_presence=True)
+    lazy = LazyMessage(msg)
+
+    # 未设置的消息字段（gameConfig、error）与 MessageToDict 一样不出现
+    assert "gameConfig" not in lazy
+    assert lazy.get("gameConfig") is None
+    with pytest.raises(KeyError):
+        lazy["gameConfig"]
+    assert "unknownKey" not in lazy
+
+    player = lazy["players"][0]
+    assert isinstance(player, LazyMessage)
+    assert player["accountId"] == 42
+    assert lazy.to_dict() == expected
+
+    msg.game_config.mode.mode = 11
+    lazy = LazyMessage(msg)
+    assert lazy["gameConfig"]["mode"]["mode"] == 11
+    assert lazy.to_dict() == MessageToDict(msg, always_print_fields_with_no_presence=True)
+
+
+def test_lazy_message_caches_conversion(lp):
+    lazy = LazyMessage(_new_round(lp))
+    assert lazy["tiles"] is lazy["tiles"]
+
+
+def test_interested_methods_skip_notify(lp):
+    fast = LiqiProto(interested_methods={".lq.ActionPrototype"})
+    payload = lp.get_message_class("NotifyAccountUpdate")().SerializeToString()
+    buf = bytes([MsgType.Notify]) + _frame(".lq.NotifyAccountUpdate", payload)
+
+    with patch.object(fast, "get_message_class", wraps=fast.get_message_class) as get_cls:
+        result = fast.parse(buf)
+
+    assert result["method"] == ".lq.NotifyAccountUpdate"
+    assert result["data"] is None
+    get_cls.assert_not_called()
+
+
+def test_interested_methods_returns_lazy_action(lp):
+    fast = LiqiProto(interested_methods={".lq.ActionPrototype"})
+    inner = _new_round(lp).SerializeToString()
+    action = lp.get_message_class("ActionPrototype")(step=3, name="ActionNewRound", data=inner)
+    buf = bytes([MsgType.Notify]) + _frame(".lq.ActionPrototype", action.SerializeToString())
+
+    # 解析器会对 ActionPrototype 内层数据做 XOR 解码，这里关闭以直接构造明文
+    with patch("akagi_ng.bridge.majsoul.liqi.decode", side_effect=lambda data: data):
+        result = fast.parse(buf)
+
+    data = result["data"]
+    assert result["method"] == ".lq.ActionPrototype"
+    assert data["name"] == "ActionNewRound"
+    assert data["data"] == MessageToDict(_new_round(lp), always_print_fields_with_no_presence=True)
+
+
+def test_interested_methods_skip_request_response(lp):
+    fast = LiqiProto(interested_methods={".lq.FastTest.authGame"})
+    req = bytes([MsgType.Req]) + struct.pack("<H", 7) + _frame(".lq.Lobby.fetchFriendList", b"")
+    res = bytes([MsgType.Res]) + struct.pack("<H", 7) + _frame("", b"\x08\x01")
+
+    assert fast.parse(req)["data"] is None
+    assert fast.res_type[7] == (".lq.Lobby.fetchFriendList", None)
+
+    with patch("akagi_ng.bridge.majsoul.liqi.logger") as mock_logger:
+        result = fast.parse(res)
+    assert result["method"] == ".lq.Lobby.fetchFriendList"
+    assert result["data"] is None
+    assert 7 not in fast.res_type
+    mock_logger.warning.assert_not_called()
+
+
+def test_interested_methods_parse_auth_game(lp):
+    fast = LiqiProto(interested_methods={".lq.FastTest.authGame"})
+    req_msg = lp.get_message_class("ReqAuthGame")(account_id=42, token="t", game_uuid="g")
+    req = bytes([MsgType.Req]) + struct.pack("<H", 9) + _frame(".lq.FastTest.authGame", req_msg.SerializeToString())
+    res_msg = lp.get_message_class("ResAuthGame")(seat_list=[42, 1, 2, 3])
+    res = bytes([MsgType.Res]) + struct.pack("<H", 9) + _frame("", res_msg.SerializeToString())
+
+    req_data = fast.parse(req)["data"]
+    res_data = fast.parse(res)["data"]
+
+    assert isinstance(req_data, LazyMessage)
+    assert req_data["accountId"] == 42
+    assert res_data["seatList"] == [42, 1, 2, 3]
+
+
+def test_method_names_are_interned(lp):
+    fast = LiqiProto(interested_methods={".lq.ActionPrototype"})
+    payload = lp.get_message_class("NotifyAccountUpdate")().SerializeToString()
+    buf = bytes([MsgType.Notify]) + _frame(".lq.NotifyAccountUpdate", payload)
+
+    first = fast.parse(buf)["method"]
+    second = fast.parse(bytes(buf))["method"]
+    assert first is second
+    assert first == ".lq.NotifyAccountUpdate"
+
+
+def test_decode_time_recorded_for_interested_methods(lp):
+    fast = LiqiProto(interested_methods={".lq.FastTest.authGame"})
+    decoded = MAJSOUL_METHOD_LATENCY.labels(".lq.FastTest.authGame", "decode")
+    before = decoded.snapshot()[0]
+
+    req_msg = lp.get_message_class("ReqAuthGame")(account_id=1)
+    fast.parse(
+        bytes([MsgType.Req]) + struct.pack("<H", 3) + _frame(".lq.FastTest.authGame", req_msg.SerializeToString())
+    )
+    fast.parse(bytes([MsgType.Req]) + struct.pack("<H", 4) + _frame(".lq.Lobby.fetchFriendList", b""))
+
+    assert decoded.snapshot()[0] == before + 1
+    assert (".lq.Lobby.fetchFriendList", "decode") not in dict(MAJSOUL_METHOD_LATENCY._items())
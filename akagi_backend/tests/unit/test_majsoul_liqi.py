@@ -5,6 +5,7 @@
 主要测试点：
 - LiqiProto 对 Request、Response 和 Notify 三种消息类型的二进制解析逻辑。
 - Protobuf Varint 编码解析及 XOR 解码逻辑。
+- 外层包装的原生拆分 (split_frame) 及畸形数据的报错。
 - 嵌套消息 (ActionPrototype 在 Wrapper 中) 的自动提取与解析。
 - 心跳包处理及消息类找不到时的容错机制。
 """
@@ -13,8 +14,13 @@ import struct
 from unittest.mock import MagicMock, patch
 
 import pytest
+from google.protobuf.message import DecodeError
 
-from akagi_ng.bridge.majsoul.liqi import LiqiProto
+from akagi_ng.bridge.majsoul.liqi import LiqiFrame, LiqiProto, split_frame
+
+
+def _frame(name: bytes, data: bytes) -> LiqiFrame:
+    return LiqiFrame(name=name, data=data)
 
 
 @pytest.fixture
@@ -37,7 +43,7 @@ def test_liqi_proto_empty_payload():
 
 def test_liqi_proto_parse_request(proto) -> None:
     # 请求块需包含方法名和数据
-    block = [{"data": b".lq.Lobby.oauth2Auth"}, {"data": b"data"}]
+    block = _frame(b".lq.Lobby.oauth2Auth", b"data")
 
     # 模拟 jsonProto 中的方法映射
     proto.jsonProto = {
@@ -59,7 +65,7 @@ def test_liqi_proto_parse_request(proto) -> None:
 def test_liqi_proto_parse_response(proto) -> None:
     # 响应块：第一个为空，第二个为数据
     proto.res_type[123] = (".lq.Lobby.oauth2Auth", MagicMock())  # (method, class)
-    block = [{"data": b""}, {"data": b"data"}]
+    block = _frame(b"", b"data")
 
     with patch("akagi_ng.bridge.majsoul.liqi.MessageToDict", return_value={"res": "ok"}):
         method, dict_obj = proto._parse_response(123, block)
@@ -79,7 +85,7 @@ def test_liqi_proto_full_parse_flow(proto) -> None:
     data = header + b"payload"
 
     with (
-        patch("akagi_ng.bridge.majsoul.liqi.from_protobuf", return_value=[]),
+        patch("akagi_ng.bridge.majsoul.liqi.split_frame"),
         patch.object(proto, "_parse_request", return_value=(".lq.Method", {"k": "v"})),
     ):
         res = proto.parse(data)
@@ -91,7 +97,7 @@ def test_liqi_proto_full_parse_flow(proto) -> None:
 def test_liqi_proto_parse_notify_with_nested_wrapper(proto):
     """测试 Notify 包含 Wrapper/ActionPrototype 嵌套 Base64 数据的解析"""
     # 模拟数据块
-    block = [{"data": b".lq.Lobby.notifyAction"}, {"data": b"wrapped_proto_data"}]
+    block = _frame(b".lq.Lobby.notifyAction", b"wrapped_proto_data")
 
     # 模拟 get_message_class
     with patch.object(proto, "get_message_class") as mock_get_cls:
@@ -134,32 +140,26 @@ def test_liqi_proto_parse_notify_with_nested_wrapper(proto):
             assert dict_obj["step"] == 1
 
 
-def test_liqi_proto_varint_parsing():
-    """测试 parse_varint 的各种边界情况"""
-    from akagi_ng.bridge.majsoul.liqi import parse_varint
-
-    # Single byte
-    val, p = parse_varint(b"\x01", 0)
-    assert val == 1
-    assert p == 1
+def _reference_decode(data: bytes) -> bytes:
+    """逐字节循环的原始实现，用于校验查表实现。"""
+    from akagi_ng.bridge.majsoul.liqi import keys
 
-    # Multi-byte (128 = 0x80 0x01)
-    val, p = parse_varint(b"\x80\x01", 0)
-    assert val == 128
-    assert p == 2
+    buf = bytearray(data)
+    for i in range(len(buf)):
+        buf[i] ^= (23 ^ len(buf)) + 5 * i + keys[i % len(keys)] & 255
+    return bytes(buf)
 
-    # 300 (0xAC 0x02)
-    val, p = parse_varint(b"\xac\x02", 0)
-    assert val == 300
-    assert p == 2
 
+@pytest.mark.parametrize("length", [0, 1, 8, 9, 255, 256, 257, 1000, 2303, 2304, 2305, 5000, 70000])
+def test_liqi_xor_decode_matches_reference(length):
+    """测试查表实现与逐字节实现逐字节一致（含跨密钥周期与长度偏移溢出的情况）"""
+    import random
 
-def test_liqi_proto_from_protobuf_error():
-    """测试 from_protobuf 遇到未知 block type 的情况"""
-    from akagi_ng.bridge.majsoul.liqi import from_protobuf
+    from akagi_ng.bridge.majsoul.liqi import decode
 
-    with pytest.raises(Exception, match="unknown pb block type"):
-        from_protobuf(b"\x07")  # Type 7 is unknown (only 0 and 2 supported)
+    data = random.Random(length).randbytes(length)
+    assert decode(data) == _reference_decode(data)
+    assert decode(decode(data)) == data
 
 
 def test_liqi_proto_xor_decode():
@@ -176,7 +176,7 @@ def test_liqi_proto_xor_decode():
 
 def test_liqi_proto_parse_heartbeat(proto):
     """测试心跳包解析并更新时间"""
-    block = [{"data": b".lq.Route.heartbeat"}, {"data": b""}]
+    block = _frame(b".lq.Route.heartbeat", b"")
     proto.jsonProto = {
         "nested": {
             "lq": {"nested": {"Route": {"methods": {"heartbeat": {"requestType": "Req", "responseType": "Res"}}}}}
@@ -194,7 +194,7 @@ def test_liqi_proto_parse_heartbeat(proto):
 
 def test_liqi_proto_parse_notify_unknown_cls(proto):
     """测试 Notify 遇到未知消息类时抛出 AttributeError"""
-    block = [{"data": b".lq.Unknown.msg"}, {"data": b""}]
+    block = _frame(b".lq.Unknown.msg", b"")
     with (
         patch.object(proto, "get_message_class", return_value=None),
         pytest.raises(AttributeError, match="Unknown Notify Message"),
@@ -204,7 +204,7 @@ def test_liqi_proto_parse_notify_unknown_cls(proto):
 
 def test_liqi_proto_parse_request_unknown_cls(proto):
     """测试 Request 遇到未知消息类"""
-    block = [{"data": b".lq.Lobby.oauth2Auth"}, {"data": b""}]
+    block = _frame(b".lq.Lobby.oauth2Auth", b"")
     proto.jsonProto = {
         "nested": {
             "lq": {"nested": {"Lobby": {"methods": {"oauth2Auth": {"requestType": "Req", "responseType": "Res"}}}}}
@@ -220,14 +220,14 @@ def test_liqi_proto_parse_request_unknown_cls(proto):
 def test_liqi_proto_parse_response_unknown_cls(proto):
     """测试 Response 遇到未知消息类"""
     proto.res_type[1] = ("method", None)
-    block = [{"data": b""}, {"data": b""}]  # first block empty (0 length) for res
+    block = _frame(b"", b"")  # first block empty (0 length) for res
     with pytest.raises(AttributeError, match="Unknown Response Message"):
         proto._parse_response(1, block)
 
 
 def test_liqi_proto_parse_notify_inner_unknown_cls(proto):
     """测试 Notify 嵌套数据时，内层消息类找不到的情况（应该跳过内层解析）"""
-    block = [{"data": b".lq.Lobby.notifyAction"}, {"data": b"wrapped_proto_data"}]
+    block = _frame(b".lq.Lobby.notifyAction", b"wrapped_proto_data")
     with (
         patch.object(proto, "get_message_class") as mock_get_cls,
         patch("akagi_ng.bridge.majsoul.liqi.MessageToDict") as mock_m2d,
@@ -253,7 +253,7 @@ def test_liqi_proto_full_parse_notify(proto):
     """测试 parse 方法处理 Notify 类型"""
     buf = bytes([1]) + b"dummy_pb"
     with (
-        patch("akagi_ng.bridge.majsoul.liqi.from_protobuf", return_value=[]),
+        patch("akagi_ng.bridge.majsoul.liqi.split_frame"),
         patch.object(proto, "_parse_notify", return_value=("method", {"d": 1})),
     ):
         res = proto.parse(buf)
@@ -265,7 +265,7 @@ def test_liqi_proto_full_parse_response(proto):
     """测试 parse 方法处理 Res 类型"""
     buf = bytes([3]) + struct.pack("<H", 123) + b"dummy_pb"
     with (
-        patch("akagi_ng.bridge.majsoul.liqi.from_protobuf", return_value=[]),
+        patch("akagi_ng.bridge.majsoul.liqi.split_frame"),
         patch.object(proto, "_parse_response", return_value=("method", {"d": 1})),
     ):
         res = proto.parse(buf)
@@ -282,7 +282,7 @@ def test_liqi_proto_full_parse_error(proto):
 
 def test_liqi_proto_duplicate_msg_id(proto):
     """测试重复 msg_id 的容错处理（登录网络延迟检查场景）"""
-    block = [{"data": b".lq.Lobby.oauth2Auth"}, {"data": b"data"}]
+    block = _frame(b".lq.Lobby.oauth2Auth", b"data")
     proto.jsonProto = {
         "nested": {
             "lq": {"nested": {"Lobby": {"methods": {"oauth2Auth": {"requestType": "Req", "responseType": "Res"}}}}}
@@ -302,19 +302,22 @@ def test_liqi_proto_duplicate_msg_id(proto):
         assert dict_obj == {"key": "val"}
 
 
-def test_liqi_proto_from_protobuf_varint_and_string():
-    """覆盖 from_protobuf 中的 varint 和 string 分支"""
-    from akagi_ng.bridge.majsoul.liqi import from_protobuf
+def test_split_frame():
+    """split_frame 从指定偏移处解析外层包装，覆盖多字节长度前缀与空方法名块"""
+    payload = bytes(range(200))
+    buf = b"\x03\x07\x00" + b"\x0a\x00" + b"\x12\xc8\x01" + payload
+    frame = split_frame(buf, 3)
+    assert frame.name == b""
+    assert frame.data == payload
+
+    frame = split_frame(b"\x01\x0a\x03abc\x12\x02\x08\x01", 1)
+    assert (frame.name, frame.data) == (b"abc", b"\x08\x01")
+
 
-    # Field 1 (type 0: varint): 1 -> 0x08 0x01
-    # Field 2 (type 2: string): "a" -> 0x12 0x01 0x61
-    buf = b"\x08\x01\x12\x01\x61"
-    res = from_protobuf(buf)
-    assert len(res) == 2
-    assert res[0]["type"] == "varint"
-    assert res[0]["data"] == 1
-    assert res[1]["type"] == "string"
-    assert res[1]["data"] == b"a"
+@pytest.mark.parametrize("buf", [b"\x0a\x05ab", b"\x0f"])
+def test_split_frame_malformed(buf):
+    with pytest.raises(DecodeError):
+        split_frame(buf)
 
 
 # ===== 真实数据集成测试（原 test_liqi.py）=====
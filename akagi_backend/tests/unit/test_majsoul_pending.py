@@ -0,0 +1,120 @@
+"""
+测试模块：akagi_backend/tests/unit/test_majsoul_pending.py
+
+描述：针对 Liqi 请求/响应配对表 (bridge.majsoul.pending) 的单元测试。
+主要测试点：
+- 请求登记后按 msg_id 取出，取出后即移除，未登记的 msg_id 返回 None。
+- 超过 TTL 的请求被清理并计为孤儿请求，过期后的响应不再匹配。
+- 容量满时淘汰最早的请求；同一 msg_id 重复登记时旧请求作废，均按原因计数。
+- LiqiProto 收到无对应请求的响应时按解析失败处理。
+"""
+
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from akagi_ng.bridge.majsoul.liqi import LiqiFrame, LiqiProto, MsgType
+from akagi_ng.bridge.majsoul.pending import MSG_ID_LIMIT, PendingRequests
+from akagi_ng.core.metrics import LIQI_ORPHANED_REQUESTS
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = _Clock()
+    with patch("akagi_ng.bridge.majsoul.pending.time.monotonic", clock):
+        yield clock
+
+
+def _orphans(reason: str) -> float:
+    return LIQI_ORPHANED_REQUESTS.labels(reason).get()
+
+
+def test_put_and_pop(clock):
+    table = PendingRequests()
+    table.put(7, ".lq.Lobby.login", None)
+
+    assert 7 in table
+    assert table[7] == (".lq.Lobby.login", None)
+    assert table.pop(7) == (".lq.Lobby.login", None)
+    assert table.pop(7) is None
+    assert len(table) == 0
+    assert table.orphaned == 0
+
+
+def test_rejects_out_of_range_msg_id(clock):
+    table = PendingRequests()
+    with pytest.raises(ValueError, match="exceeds max value"):
+        table.put(MSG_ID_LIMIT, "m", None)
+
+
+def test_expired_requests_are_orphaned(clock):
+    table = PendingRequests(ttl=10)
+    before = _orphans("expired")
+    table.put(1, "a", None)
+    clock.now += 5
+    table.put(2, "b", None)
+
+    clock.now += 6
+    assert table.pop(1) is None
+    assert table.pop(2) == ("b", None)
+    assert table.orphaned == 1
+    assert _orphans("expired") == before + 1
+
+
+def test_capacity_evicts_oldest(clock):
+    table = PendingRequests(capacity=3)
+    before = _orphans("evicted")
+    for msg_id in range(5):
+        table.put(msg_id, f"m{msg_id}", None)
+
+    assert len(table) == 3
+    assert 0 not in table
+    assert 1 not in table
+    assert table[4] == ("m4", None)
+    assert table.orphaned == 2
+    assert _orphans("evicted") == before + 2
+
+
+def test_duplicate_msg_id_overwrites(clock):
+    table = PendingRequests()
+    before = _orphans("overwritten")
+    table[3] = ("old", None)
+    table[3] = ("new", None)
+
+    assert len(table) == 1
+    assert table.pop(3) == ("new", None)
+    assert _orphans("overwritten") == before + 1
+
+
+def test_table_stays_bounded_over_long_session(clock):
+    table = PendingRequests(capacity=64, ttl=30)
+    # 模拟全天运行：msg_id 回绕多次，约三分之一的请求没有响应
+    total = 2 * MSG_ID_LIMIT
+    for i in range(total):
+        msg_id = i % MSG_ID_LIMIT
+        table.put(msg_id, "m", None)
+        clock.now += 0.5
+        if i % 3:
+            table.pop(msg_id)
+
+    assert len(table) <= 64
+    assert table.orphaned + len(table) == len(range(0, total, 3))
+
+
+def test_liqi_response_without_request(clock):
+    lp = LiqiProto(interested_methods=set())
+    frame = LiqiFrame(name=b"", data=b"").SerializeToString()
+    buf = bytes([MsgType.Res]) + struct.pack("<H", 42) + frame
+
+    with patch("akagi_ng.bridge.majsoul.liqi.logger") as mock_logger:
+        assert lp.parse(buf) == {}
+    assert "not found in pending requests" in mock_logger.debug.call_args.args[0]
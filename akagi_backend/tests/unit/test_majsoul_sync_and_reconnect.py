@@ -7,12 +7,17 @@
 - 对重连 Actions 的回放逻辑，包括 sync 标志的正确设置。
 - 修复 ActionNewRound 事件被后续动作意外修改的不可变性校验。
 - 真实对局日志数据下的同步逻辑回归测试。
+- 对局恢复的流式处理：动作按需解码，事件边解码边产出。
 """
 
+import base64
 import unittest
 from unittest.mock import patch
 
 from akagi_ng.bridge.majsoul.bridge import MajsoulBridge
+from akagi_ng.bridge.majsoul.lazy import LazyMessage
+from akagi_ng.bridge.majsoul.liqi import MsgType
+from akagi_ng.schema.notifications import NotificationCode
 
 
 class TestMajsoulSyncAndReconnect(unittest.TestCase):
@@ -200,3 +205,83 @@ class TestMajsoulSyncAndReconnect(unittest.TestCase):
             start_kyoku_event.tehais[0],
             "ActionNewRound event was mutated by subsequent discard! 1m should still be there.",
         )
+
+
+class TestMajsoulSyncStreaming(unittest.TestCase):
+    def setUp(self):
+        self.bridge = MajsoulBridge()
+        self.bridge.seat = 1
+
+    def _restore(self, count: int) -> dict:
+        actions = [{"name": "ActionDealTile", "step": i, "data": ""} for i in range(count)]
+        return {
+            "method": ".lq.FastTest.syncGame",
+            "type": MsgType.Res,
+            "data": {"gameRestore": {"actions": actions}},
+        }
+
+    def test_iter_parse_decodes_actions_lazily(self):
+        decoded = []
+
+        def fake_item(action):
+            decoded.append(action["step"])
+            return {"data": {"name": "ActionDealTile", "data": {"seat": 0, "tile": "1m"}}}
+
+        with (
+            patch.object(self.bridge.liqi_proto, "parse", return_value=self._restore(100)),
+            patch.object(self.bridge, "_parse_sync_game_action_item", side_effect=fake_item),
+        ):
+            events = self.bridge.iter_parse(b"frame")
+            self.assertEqual(next(events).code, "game_syncing")
+            self.assertEqual(decoded, [])
+
+            # 产出第一个动作的事件时只多预读了一个动作
+            first = next(events)
+            self.assertEqual(first.type, "tsumo")
+            self.assertTrue(first.sync)
+            self.assertEqual(decoded, [0, 1])
+
+            rest = list(events)
+
+        self.assertEqual(len(rest), 99)
+        self.assertTrue(all(e.sync for e in rest[:-1]))
+        self.assertFalse(rest[-1].sync)
+        self.assertFalse(self.bridge.syncing)
+
+    def test_iter_parse_matches_parse(self):
+        with patch.object(
+            self.bridge,
+            "_parse_sync_game_action_item",
+            return_value={"data": {"name": "ActionDealTile", "data": {"seat": 0, "tile": "1m"}}},
+        ):
+            with patch.object(self.bridge.liqi_proto, "parse", return_value=self._restore(3)):
+                streamed = list(self.bridge.iter_parse(b"frame"))
+            with patch.object(self.bridge.liqi_proto, "parse", return_value=self._restore(3)):
+                parsed = self.bridge.parse(b"frame")
+
+        self.assertEqual(streamed, parsed)
+
+    def test_iter_parse_error_after_partial_output(self):
+        with (
+            patch.object(self.bridge.liqi_proto, "parse", return_value=self._restore(3)),
+            patch.object(self.bridge, "_handle_action_prototype", side_effect=RuntimeError("boom")),
+        ):
+            events = list(self.bridge.iter_parse(b"frame"))
+
+        self.assertEqual([e.code for e in events], [NotificationCode.GAME_SYNCING, NotificationCode.PARSE_ERROR])
+        self.assertFalse(self.bridge.syncing)
+
+    def test_lazy_action_item_uses_raw_bytes(self):
+        proto = self.bridge.liqi_proto
+        inner = proto.get_message_class("ActionDealTile")(seat=2, tile="5m")
+        action = proto.get_message_class("ActionPrototype")(
+            step=4, name="ActionDealTile", data=inner.SerializeToString()
+        )
+
+        with patch("akagi_ng.bridge.majsoul.bridge.base64.b64decode", wraps=base64.b64decode) as b64decode:
+            item = self.bridge._parse_sync_game_action_item(LazyMessage(action))
+
+        b64decode.assert_not_called()
+        self.assertEqual(item["data"]["name"], "ActionDealTile")
+        self.assertEqual(item["data"]["data"]["seat"], 2)
+        self.assertEqual(item["data"]["data"]["tile"], "5m")
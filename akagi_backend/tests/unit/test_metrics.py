@@ -0,0 +1,173 @@
+"""
+测试模块：akagi_backend/tests/unit/test_metrics.py
+
+描述：针对进程内指标注册表 (core.metrics) 的单元测试。
+主要测试点：
+- Counter / Gauge / Histogram 的基本语义与标签子项。
+- 多线程无锁写入后汇总结果的正确性。
+- Prometheus 文本格式导出与抓取前回调 (collector)。
+- 多进程导出文本的合并：同族只保留一份 HELP/TYPE，同名同标签样本求和。
+- 热路径埋点：引擎回退计数、推理耗时、熔断状态与 SSE 客户端指标。
+"""
+
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from akagi_ng.core.metrics import (
+    ENGINE_FALLBACKS,
+    INFERENCE_LATENCY,
+    OT_CIRCUIT_OPEN,
+    SSE_CLIENT_QUEUE_FILL,
+    SSE_CLIENTS,
+    MetricsRegistry,
+    merge_exposition,
+)
+from akagi_ng.dataserver.sse import SSEManager
+from akagi_ng.mjai_bot.engine.akagi_ot import AkagiOTClient
+from akagi_ng.mjai_bot.engine.provider import EngineProvider
+from akagi_ng.schema.types import SSEClientData
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_labels(registry):
+    counter = registry.counter("events_total", "Events.", labelnames=("platform",))
+    counter.labels("majsoul").inc()
+    counter.labels("majsoul").inc(2)
+    counter.labels("tenhou").inc()
+
+    assert counter.labels("majsoul").get() == 3
+    assert counter.labels("tenhou").get() == 1
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_registry_returns_existing_metric(registry):
+    first = registry.counter("dup_total", "Dup.")
+    assert registry.counter("dup_total", "Dup.") is first
+    with pytest.raises(ValueError):
+        registry.gauge("dup_total", "Dup.")
+
+
+def test_counter_concurrent_increments(registry):
+    counter = registry.counter("concurrent_total", "Concurrent.")
+
+    def worker():
+        for _ in range(10000):
+            counter.inc()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.get() == 80000
+
+
+def test_gauge_set_and_function(registry):
+    gauge = registry.gauge("depth", "Depth.")
+    gauge.set(5)
+    assert gauge.get() == 5
+
+    gauge.set_function(lambda: 42)
+    assert gauge.get() == 42
+
+    gauge.set_function(None)
+    assert gauge.get() == 5
+
+
+def test_histogram_render(registry):
+    hist = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    hist.observe(0.05)
+    hist.observe(0.5)
+    hist.observe(5.0)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3.0' in text
+    assert "latency_seconds_count 3.0" in text
+    assert "latency_seconds_sum 5.55" in text
+
+
+def test_render_escapes_labels_and_runs_collectors(registry):
+    gauge = registry.gauge("fill", "Fill.", labelnames=("client_id",))
+    collector = MagicMock(side_effect=lambda: gauge.labels('a"b').set(0.5))
+    registry.add_collector(collector)
+
+    text = registry.render()
+    collector.assert_called_once()
+    assert 'fill{client_id="a\\"b"} 0.5' in text
+
+    registry.remove_collector(collector)
+    registry.render()
+    collector.assert_called_once()
+
+
+def test_merge_exposition_sums_samples():
+    parent = MetricsRegistry()
+    child = MetricsRegistry()
+    for reg, source in ((parent, "shm"), (child, "sse")):
+        reg.counter("dropped_total", "Dropped.", labelnames=("source",)).labels(source).inc()
+        reg.histogram("latency_seconds", "Latency.", buckets=(0.1,)).observe(0.05)
+    child.gauge("clients", "Clients.").set(2)
+
+    text = merge_exposition(parent.render(), child.render())
+    assert text.count("# TYPE dropped_total counter") == 1
+    assert 'dropped_total{source="shm"} 1.0' in text
+    assert 'dropped_total{source="sse"} 1.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2.0' in text
+    assert "latency_seconds_count 2.0" in text
+    assert "clients 2.0" in text
+    assert merge_exposition("", child.render()) == child.render()
+
+
+def test_provider_records_latency_and_fallback():
+    status = MagicMock()
+    status.metadata = {}
+    online = MagicMock(engine_type="akagiot")
+    online.react_batch.side_effect = RuntimeError("offline")
+    local = MagicMock(engine_type="mortal")
+    local.react_batch.return_value = ([0], [[0.0]], [[True]], [True])
+
+    fallbacks_before = ENGINE_FALLBACKS.get()
+    count_before = INFERENCE_LATENCY.labels("mortal").snapshot()[0]
+
+    provider = EngineProvider(status, online, local, is_3p=False)
+    provider.react_batch(MagicMock(), MagicMock())
+
+    assert ENGINE_FALLBACKS.get() == fallbacks_before + 1
+    assert INFERENCE_LATENCY.labels("mortal").snapshot()[0] == count_before + 1
+
+
+def test_circuit_breaker_gauge():
+    client = AkagiOTClient("http://localhost", "key")
+    status = MagicMock()
+
+    client._open_circuit(status)
+    assert OT_CIRCUIT_OPEN.get() == 1
+
+    client._reset_breaker(status)
+    assert OT_CIRCUIT_OPEN.get() == 0
+
+
+async def test_sse_collector_reports_clients():
+    manager = SSEManager()
+    queue = asyncio.Queue(maxsize=4)
+    queue.put_nowait(b"x")
+    await manager.add_client("c1", SSEClientData(response=MagicMock(), queue=queue))
+
+    manager._collect_metrics()
+
+    assert SSE_CLIENTS.get() == 1
+    assert SSE_CLIENT_QUEUE_FILL.labels("c1").get() == 0.25
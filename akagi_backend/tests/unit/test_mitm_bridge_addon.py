@@ -137,7 +137,7 @@ def test_bridge_addon_websocket_lifecycle(addon, shared_queue) -> None:
     msg.from_client = True
     flow.websocket.messages = [msg]
 
-    with patch.object(addon.bridges[flow.id], "parse", return_value=[{"type": "hello"}]):
+    with patch.object(addon.bridges[flow.id], "iter_parse", return_value=[{"type": "hello"}]):
         addon.websocket_message(flow)
         mjai_msg = shared_queue.get(timeout=1)
         assert mjai_msg["type"] == "hello"
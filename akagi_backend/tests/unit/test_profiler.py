@@ -0,0 +1,136 @@
+"""
+测试模块：akagi_backend/tests/unit/test_profiler.py
+
+描述：针对运行时采样分析器 (core.profiler) 与热路径耗时装饰器的单元测试。
+主要测试点：
+- 采样线程按线程名聚合调用栈，输出 collapsed-stack 格式。
+- 会话互斥：运行中再次启动返回 False，stop 可提前结束采样。
+- timed 装饰器在正常与异常路径下均记录耗时。
+- /api/profiler 相关接口的启动、冲突、参数校验与结果下载。
+- 停止接口在线程池中等待采样线程退出，不阻塞事件循环。
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from akagi_ng.core.metrics import STAGE_LATENCY, timed
+from akagi_ng.core.profiler import SamplingProfiler, profiler
+from akagi_ng.dataserver.api import setup_routes
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=_busy_loop, args=(stop,), name="BusyWorker", daemon=True)
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+@pytest.fixture
+async def cli():
+    app = web.Application()
+    setup_routes(app)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    yield client
+    profiler.stop()
+    await client.close()
+
+
+def test_profiler_collects_thread_stacks(busy_thread):
+    prof = SamplingProfiler()
+    assert prof.start(duration=5.0, interval=0.001) is True
+    assert prof.start(duration=5.0) is False
+
+    time.sleep(0.1)
+    prof.stop()
+
+    assert prof.running is False
+    status = prof.status()
+    assert status["samples"] > 0
+    assert status["finished_at"] >= status["started_at"]
+
+    lines = prof.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("BusyWorker;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert "_busy_loop" in stack
+    assert int(count) > 0
+    # 采样线程自身不应出现在结果中
+    assert not any(line.startswith("SamplingProfiler;") for line in lines)
+
+
+def test_profiler_stops_after_duration():
+    prof = SamplingProfiler()
+    prof.start(duration=0.05, interval=0.01)
+    time.sleep(0.3)
+    assert prof.running is False
+
+
+def test_timed_records_latency_and_exceptions():
+    child = STAGE_LATENCY.labels("test.stage")
+    before = child.snapshot()[0]
+
+    @timed("test.stage")
+    def work(x: int) -> int:
+        if x < 0:
+            raise ValueError("negative")
+        return x * 2
+
+    assert work(2) == 4
+    assert work.__name__ == "work"
+    with pytest.raises(ValueError):
+        work(-1)
+
+    assert child.snapshot()[0] == before + 2
+
+
+async def test_profiler_api_roundtrip(cli):
+    resp = await cli.post("/api/profiler/start", json={"duration": 5, "interval": 0.001})
+    assert resp.status == 200
+    assert (await resp.json())["data"]["running"] is True
+
+    resp = await cli.post("/api/profiler/start", json={"duration": 5})
+    assert resp.status == 409
+
+    resp = await cli.post("/api/profiler/stop")
+    data = await resp.json()
+    assert data["data"]["running"] is False
+
+    resp = await cli.get("/api/profiler/result")
+    assert resp.status == 200
+    assert "attachment" in resp.headers["Content-Disposition"]
+    assert ".collapsed" in resp.headers["Content-Disposition"]
+
+
+async def test_profiler_stop_runs_off_event_loop(cli):
+    stop_threads = []
+    with patch.object(profiler, "stop", side_effect=lambda: stop_threads.append(threading.get_ident())):
+        resp = await cli.post("/api/profiler/stop")
+
+    assert resp.status == 200
+    assert stop_threads
+    assert stop_threads != [threading.get_ident()]
+
+
+async def test_profiler_api_rejects_invalid_params(cli):
+    resp = await cli.post("/api/profiler/start", json={"duration": -1})
+    assert resp.status == 400
+
+    resp = await cli.post("/api/profiler/start", json={"duration": "abc"})
+    assert resp.status == 400
+
+    resp = await cli.get("/api/profiler")
+    assert (await resp.json())["data"]["running"] is False
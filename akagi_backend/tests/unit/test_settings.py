@@ -139,6 +139,11 @@ class TestSettingsLifecycle(unittest.TestCase):
         invalid_data["log_level"] = "INVALID_LEVEL"
         self.assertFalse(verify_settings(invalid_data))
 
+    def test_verify_settings_uses_cached_validator(self):
+        with patch("akagi_ng.settings.settings._get_schema") as mock_get_schema:
+            self.assertTrue(verify_settings(get_default_settings_dict()))
+            mock_get_schema.assert_not_called()
+
     def test_get_schema_file_not_found(self):
         with patch("akagi_ng.settings.settings.SCHEMA_PATH") as mock_path:
             mock_path.exists.return_value = False
@@ -4,23 +4,47 @@
 描述：针对服务器发送事件 (SSE) 管理逻辑的单元测试。
 主要测试点：
 - SSEManager 对客户端 (Client) 的增加、移除及连接清理逻辑。
-- 异步广播事件 (_broadcast_async) 与历史通知 (Notification History) 的管理。
+- 广播分发 (_fan_out)：推荐按客户端只保留最新一条，通知进入有界队列并在满时丢弃最旧的一条。
+- 推荐与通知按事件 ID 顺序送达，续传时不会跳过排在推荐之前的通知。
+- 历史通知 (Notification History) 的管理与新连接回放。
+- 广播只移交引用，去重、缓存、编码均在事件循环内完成。
+- 事件日志 (EventJournal) 的环形覆盖与 Last-Event-ID 断线续传。
+- 推荐差量协议：相同推荐跳过、delta 客户端首次完整同步、后续只发送变化字段，删除的字段单独列出。
 - 心跳维持 (Keep-alive) 逻辑。
 - SSE 处理程序 (sse_handler) 的并发请求与重复连接处理。
 """
 
 import asyncio
 import contextlib
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aiohttp import web
 
-from akagi_ng.dataserver.sse import SSEManager, _format_sse_message
+from akagi_ng.dataserver.journal import EventJournal
+from akagi_ng.dataserver.sse import SSEManager, _diff_recommendations, _format_sse_message
 from akagi_ng.schema.constants import ServerConstants
 from akagi_ng.schema.types import SSEClientData
 
 
+def _n(code: str) -> dict:
+    return {"list": [{"code": code}]}
+
+
+def _r(action: str) -> dict:
+    return {"recommendations": [{"action": action, "confidence": 1.0}]}
+
+
+def _payload(event: str, data: dict) -> bytes:
+    return _format_sse_message(data, event)
+
+
+def _body(payload: bytes) -> bytes:
+    """去掉 SSE id 行，便于与不带 ID 的期望值比较。"""
+    return payload.split(b"\n", 1)[1] if payload.startswith(b"id: ") else payload
+
+
 @pytest.fixture
 def sse_manager():
     manager = SSEManager()
@@ -82,53 +106,104 @@ async def test_remove_client_mismatch(sse_manager):
 
 
 @pytest.mark.asyncio
-async def test_broadcast_async(sse_manager):
-    """测试异步广播消息"""
-    q1 = asyncio.Queue()
-    q2 = asyncio.Queue()
+async def test_fan_out_notifications(sse_manager):
+    """测试通知按序分发到每个客户端的队列"""
+    c1 = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    c2 = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    await sse_manager.add_client("c1", c1)
+    await sse_manager.add_client("c2", c2)
 
-    await sse_manager.add_client("c1", SSEClientData(response=MagicMock(), queue=q1))
-    await sse_manager.add_client("c2", SSEClientData(response=MagicMock(), queue=q2))
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("notification", _n("n2"))
 
-    payload = b"test message"
-    await sse_manager._broadcast_async(payload)
+    expected = [_payload("notification", _n("n1")), _payload("notification", _n("n2"))]
+    for client in (c1, c2):
+        assert client.wakeup.is_set()
+        assert [_body(client.queue.get_nowait()), _body(client.queue.get_nowait())] == expected
 
-    assert await q1.get() == payload
-    assert await q2.get() == payload
+
+@pytest.mark.asyncio
+async def test_fan_out_coalesces_recommendations(sse_manager):
+    """测试推荐只保留最新一条，不占用通知队列，并排在之前入队的通知之后"""
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue(maxsize=1))
+    await sse_manager.add_client("c1", client)
+
+    sse_manager._fan_out("recommendations", _r("r1"))
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r2"))
+
+    assert _body(sse_manager._next_payload(client)) == _payload("notification", _n("n1"))
+    assert _body(sse_manager._next_payload(client)) == _payload("recommendations", _r("r2"))
+    assert sse_manager._next_payload(client) is None
+
+
+@pytest.mark.asyncio
+async def test_fan_out_preserves_event_id_order(sse_manager):
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    await sse_manager.add_client("c1", client)
+
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+    sse_manager._fan_out("notification", _n("n2"))
+
+    payloads = [sse_manager._next_payload(client) for _ in range(3)]
+    assert [_body(p) for p in payloads] == [
+        _payload("notification", _n("n1")),
+        _payload("recommendations", _r("r1")),
+        _payload("notification", _n("n2")),
+    ]
+    seqs = [int(p.split(b"\n", 1)[0].rpartition(b"-")[2]) for p in payloads]
+    assert seqs == sorted(seqs)
+
+
+@pytest.mark.asyncio
+async def test_fan_out_full_queue_drops_oldest(sse_manager):
+    """测试通知队列满时丢弃最旧的通知，最新推荐不受影响"""
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue(maxsize=2))
+    await sse_manager.add_client("c1", client)
+
+    for code in ("n1", "n2", "n3"):
+        sse_manager._fan_out("notification", _n(code))
+    sse_manager._fan_out("recommendations", _r("r1"))
+
+    assert [_body(sse_manager._next_payload(client)) for _ in range(3)] == [
+        _payload("notification", _n("n2")),
+        _payload("notification", _n("n3")),
+        _payload("recommendations", _r("r1")),
+    ]
 
 
 @pytest.mark.asyncio
 async def test_broadcast_event(sse_manager):
     """测试事件广播与缓存更新"""
-    q = asyncio.Queue()
-    await sse_manager.add_client("c1", SSEClientData(response=MagicMock(), queue=q))
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    await sse_manager.add_client("c1", client)
 
     event_data = {"key": "value"}
 
-    # 模拟 run_coroutine_threadsafe 为立即执行，防止在一个 loop 中死锁
-    with patch("asyncio.run_coroutine_threadsafe") as mock_run:
+    with (
+        patch.object(sse_manager.loop, "call_soon_threadsafe") as mock_call,
+        patch("akagi_ng.dataserver.sse._format_sse_message") as mock_format,
+    ):
         sse_manager.broadcast_event("recommendations", event_data)
 
-        # 验证缓存更新
-        assert sse_manager.latest_recommendations == event_data
+        # 调用方线程只移交引用，不做编码，也不更新缓存
+        mock_call.assert_called_once_with(sse_manager._fan_out, "recommendations", event_data)
+        mock_format.assert_not_called()
+        assert sse_manager.latest_recommendations is None
 
-        # 验证是否尝试调用广播
-        mock_run.assert_called_once()
-
-        # 直接调用底层的 _broadcast_async 来验证数据流
-        payload = _format_sse_message(event_data, event="recommendations")
-        await sse_manager._broadcast_async(payload)
-        assert await q.get() == payload
+    # 在事件循环内完成缓存更新与编码
+    sse_manager._fan_out("recommendations", event_data)
+    assert sse_manager.latest_recommendations == event_data
+    assert _body(client.latest_recommendation) == _format_sse_message(event_data, event="recommendations")
 
 
 @pytest.mark.asyncio
 async def test_notification_history(sse_manager):
     """测试通知历史记录"""
-    # 模拟广播以避免真正的协程调度
-    with patch("asyncio.run_coroutine_threadsafe"):
-        max_history = ServerConstants.SSE_MAX_NOTIFICATION_HISTORY
-        for i in range(max_history + 5):
-            sse_manager.broadcast_event("notification", {"id": i})
+    max_history = ServerConstants.SSE_MAX_NOTIFICATION_HISTORY
+    for i in range(max_history + 5):
+        sse_manager._fan_out("notification", {"id": i})
 
     assert len(sse_manager.notification_history) == max_history
     assert sse_manager.notification_history[-1] == {"id": max_history + 4}
@@ -143,12 +218,9 @@ def test_format_sse_message_with_event():
 
 @pytest.mark.asyncio
 async def test_keep_alive_logic(sse_manager):
-    queue1 = asyncio.Queue()
-    queue2 = asyncio.Queue()
-    sse_manager.clients = {
-        "c1": SSEClientData(response=MagicMock(), queue=queue1),
-        "c2": SSEClientData(response=MagicMock(), queue=queue2),
-    }
+    c1 = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    c2 = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    sse_manager.clients = {"c1": c1, "c2": c2}
 
     # We want to test one iteration of keep_alive
     # Patch sleep to return immediately or raise to exit
@@ -158,8 +230,11 @@ async def test_keep_alive_logic(sse_manager):
     ):
         await sse_manager.keep_alive()
 
-    assert queue1.get_nowait() == b": keep-alive\n\n"
-    assert queue2.get_nowait() == b": keep-alive\n\n"
+    # 保活不占用通知队列
+    for client in (c1, c2):
+        assert client.queue.empty()
+        assert client.wakeup.is_set()
+        assert sse_manager._next_payload(client) == b": keep-alive\n\n"
 
     sse_manager.stop()
     assert sse_manager.running is False
@@ -192,17 +267,19 @@ async def test_remove_client_failure_branches(sse_manager):
 
 
 @pytest.mark.asyncio
-async def test_broadcast_async_empty(sse_manager):
+async def test_fan_out_empty(sse_manager):
     sse_manager.clients = {}
-    await sse_manager._broadcast_async(b"msg")
-    # 应该直接返回
+    sse_manager._fan_out("notification", _n("msg"))
+    # 没有客户端时只更新回放缓存
+    assert [_body(p) for p in sse_manager._notification_payloads] == [_payload("notification", _n("msg"))]
 
 
 @pytest.mark.asyncio
 async def test_broadcast_event_no_loop(sse_manager):
     sse_manager.loop = None
     sse_manager.broadcast_event("notification", {"a": 1})
-    # 应该不抛出错误
+    # 没有事件循环时直接更新缓存，不抛出错误
+    assert list(sse_manager.notification_history) == [{"a": 1}]
 
 
 @pytest.mark.asyncio
@@ -218,6 +295,7 @@ async def test_sse_handler_success_flow(sse_manager):
     mock_request = MagicMock(spec=web.Request)
     mock_request.query = {"clientId": "c1"}
     mock_request.remote = "127.0.0.1"
+    mock_request.headers = {}
 
     mock_response = AsyncMock(spec=web.StreamResponse)
     with patch("aiohttp.web.StreamResponse", return_value=mock_response):
@@ -226,8 +304,8 @@ async def test_sse_handler_success_flow(sse_manager):
             await asyncio.sleep(0.1)
             await sse_manager._remove_client("c1", expected_response=mock_response)
 
-        # 模拟 queue.get() 抛出异常来退出 while True 循环
-        with patch.object(asyncio.Queue, "get", side_effect=asyncio.CancelledError):
+        # 模拟 wakeup.wait() 抛出异常来退出 while True 循环
+        with patch.object(asyncio.Event, "wait", side_effect=asyncio.CancelledError):
             await sse_manager.sse_handler(mock_request)
 
         # 验证是否写入了初始消息
@@ -243,11 +321,12 @@ async def test_sse_handler_duplicate_client_id_no_deadlock(sse_manager):
     mock_request = MagicMock(spec=web.Request)
     mock_request.query = {"clientId": "c1"}
     mock_request.remote = "127.0.0.1"
+    mock_request.headers = {}
 
     new_response = AsyncMock(spec=web.StreamResponse)
     with (
         patch("aiohttp.web.StreamResponse", return_value=new_response),
-        patch.object(asyncio.Queue, "get", side_effect=asyncio.CancelledError),
+        patch.object(asyncio.Event, "wait", side_effect=asyncio.CancelledError),
     ):
         await asyncio.wait_for(sse_manager.sse_handler(mock_request), timeout=1.0)
 
@@ -255,19 +334,270 @@ async def test_sse_handler_duplicate_client_id_no_deadlock(sse_manager):
 
 
 @pytest.mark.asyncio
-async def test_keep_alive_execution_logic(sse_manager):
-    # 覆盖 keep_alive 协程的内部逻辑（不运行无限循环）
-    q = asyncio.Queue()
-    await sse_manager.add_client("c1", SSEClientData(response=MagicMock(), queue=q))
+async def test_sse_handler_replays_cached_payloads(sse_manager):
+    """测试新连接回放缓存的历史通知与最新推荐，推荐直接复用已编码的 payload"""
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+    sse_manager._fan_out("recommendations", _r("r2"))
 
-    # 通过手动调用逻辑块来模拟一次循环
-    async with sse_manager.lock:
-        targets = list(sse_manager.clients.values())
+    mock_request = MagicMock(spec=web.Request)
+    mock_request.query = {"clientId": "c1"}
+    mock_request.remote = "127.0.0.1"
+    mock_request.headers = {}
+
+    mock_response = AsyncMock(spec=web.StreamResponse)
+    with (
+        patch("aiohttp.web.StreamResponse", return_value=mock_response),
+        patch.object(asyncio.Event, "wait", side_effect=asyncio.CancelledError),
+    ):
+        await sse_manager.sse_handler(mock_request)
+
+    written = [_body(call.args[0]) for call in mock_response.write.call_args_list]
+    assert written == [b": connected\n\n", _payload("notification", _n("n1")), _payload("recommendations", _r("r2"))]
+
+
+@pytest.mark.asyncio
+async def test_clients_snapshot_is_copy_on_write(sse_manager):
+    """测试增删客户端替换整个字典，已取得的快照不受影响"""
+    await sse_manager.add_client("c1", SSEClientData(response=AsyncMock(), queue=asyncio.Queue()))
+    snapshot = sse_manager.clients
+
+    await sse_manager.add_client("c2", SSEClientData(response=AsyncMock(), queue=asyncio.Queue()))
+    await sse_manager._remove_client("c1")
+
+    assert list(snapshot) == ["c1"]
+    assert list(sse_manager.clients) == ["c2"]
+
+
+# ==========================================================
+# 推荐差量协议
+# ==========================================================
 
-    payload = b": keep-alive\n\n"
-    for client_data in targets:
-        queue = client_data.queue
-        if queue:
-            queue.put_nowait(payload)
 
-    assert await q.get() == payload
+def _rec(*confidences: float, engine_type: str = "mortal") -> dict:
+    return {
+        "recommendations": [{"action": f"{i + 1}m", "confidence": c} for i, c in enumerate(confidences)],
+        "engine_type": engine_type,
+        "fallback_used": False,
+        "circuit_open": False,
+    }
+
+
+def _decode(payload: bytes) -> tuple[str, dict]:
+    event_line, data_line, *_ = _body(payload).decode().split("\n")
+    return event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))
+
+
+def test_diff_recommendations():
+    assert _diff_recommendations(_rec(0.5, 0.3), _rec(0.5, 0.3)) == {}
+    assert _diff_recommendations(_rec(0.5, 0.3), _rec(0.6, 0.3, engine_type="akagiot")) == {
+        "fields": {"engine_type": "akagiot"},
+        "items": {"0": {"confidence": 0.6}},
+    }
+    # 数量变化时整体替换列表
+    assert _diff_recommendations(_rec(0.5, 0.3), _rec(0.9)) == {
+        "fields": {"recommendations": _rec(0.9)["recommendations"]}
+    }
+
+    base, target = _rec(0.5), _rec(0.5)
+    base["recommendations"][0]["tile"] = "1m"
+    assert _diff_recommendations(base, target) == {"removed": {"0": ["tile"]}}
+
+
+def test_diff_recommendations_null_value():
+    """字段变为 null 时按值下发，与删除字段区分"""
+    base, target = _rec(0.5, 0.3), _rec(0.5, 0.3)
+    base["recommendations"][0]["tile"] = "1m"
+    target["recommendations"][0]["tile"] = None
+    base["recommendations"][1]["sim_candidates"] = []
+    assert _diff_recommendations(base, target) == {
+        "items": {"0": {"tile": None}},
+        "removed": {"1": ["sim_candidates"]},
+    }
+
+
+@pytest.mark.asyncio
+async def test_identical_recommendations_skipped(sse_manager):
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    await sse_manager.add_client("c1", client)
+
+    sse_manager._fan_out("recommendations", _rec(0.5))
+    assert sse_manager._next_payload(client) is not None
+    client.wakeup.clear()
+
+    with patch("akagi_ng.dataserver.sse._format_sse_message") as mock_format:
+        sse_manager._fan_out("recommendations", _rec(0.5))
+
+    mock_format.assert_not_called()
+    assert not client.wakeup.is_set()
+    assert sse_manager._next_payload(client) is None
+
+
+@pytest.mark.asyncio
+async def test_delta_client_resync_then_delta(sse_manager):
+    sse_manager._fan_out("recommendations", _rec(0.5, 0.3))
+
+    client = SSEClientData(
+        response=MagicMock(),
+        queue=asyncio.Queue(),
+        latest_recommendation=sse_manager._recommendation_payload,
+        delta=True,
+    )
+    await sse_manager.add_client("c1", client)
+
+    # 首次发送完整推荐
+    assert _decode(sse_manager._next_payload(client)) == ("recommendations", _rec(0.5, 0.3))
+
+    # 之后只发送变化部分
+    sse_manager._fan_out("recommendations", _rec(0.5, 0.4))
+    assert _decode(sse_manager._next_payload(client)) == (
+        "recommendations_delta",
+        {"items": {"1": {"confidence": 0.4}}},
+    )
+
+    # 合并后内容与已送达状态相同时不发送
+    sse_manager._fan_out("recommendations", _rec(0.9))
+    sse_manager._fan_out("recommendations", _rec(0.5, 0.4))
+    assert sse_manager._next_payload(client) is None
+
+
+@pytest.mark.asyncio
+async def test_delta_shared_between_clients(sse_manager):
+    full = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    deltas = [SSEClientData(response=MagicMock(), queue=asyncio.Queue(), delta=True) for _ in range(2)]
+    for i, client in enumerate([full, *deltas]):
+        await sse_manager.add_client(f"c{i}", client)
+
+    for data in (_rec(0.5), _rec(0.7)):
+        sse_manager._fan_out("recommendations", data)
+        payloads = [sse_manager._next_payload(c) for c in (full, *deltas)]
+
+    assert _decode(payloads[0]) == ("recommendations", _rec(0.7))
+    assert _decode(payloads[1])[0] == "recommendations_delta"
+    # 处于同一版本的客户端共享同一份编码结果
+    assert payloads[1] is payloads[2]
+
+
+# ==========================================================
+# 事件日志与断线续传
+# ==========================================================
+
+
+def test_event_journal_since():
+    journal = EventJournal(capacity=3)
+    ids = []
+    for i in range(5):
+        ids.append(journal.next_id())
+        journal.append("notification", f"p{i}".encode())
+
+    assert journal.since(ids[-1]) == []
+    assert journal.since(ids[2]) == [("notification", b"p3"), ("notification", b"p4")]
+    assert journal.since(ids[1]) == [("notification", b"p2"), ("notification", b"p3"), ("notification", b"p4")]
+    # 已被覆盖、未来的、其他 epoch 的 ID 都视为未知
+    assert journal.since(ids[0]) is None
+    assert journal.since(f"{journal.epoch}-99") is None
+    assert journal.since("deadbeef-4") is None
+    assert journal.since("garbage") is None
+
+
+async def _connect(sse_manager, last_event_id: str | None, delta: bool = False) -> tuple[list[bytes], SSEClientData]:
+    mock_request = MagicMock(spec=web.Request)
+    mock_request.query = {"clientId": "c1", **({"delta": "1"} if delta else {})}
+    mock_request.remote = "127.0.0.1"
+    mock_request.headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+
+    registered: list[SSEClientData] = []
+    original = sse_manager._initial_payloads
+
+    def spy(client_data, event_id):
+        registered.append(client_data)
+        return original(client_data, event_id)
+
+    mock_response = AsyncMock(spec=web.StreamResponse)
+    with (
+        patch("aiohttp.web.StreamResponse", return_value=mock_response),
+        patch.object(asyncio.Event, "wait", side_effect=asyncio.CancelledError),
+        patch.object(sse_manager, "_initial_payloads", side_effect=spy),
+    ):
+        await sse_manager.sse_handler(mock_request)
+    return [call.args[0] for call in mock_response.write.call_args_list][1:], registered[0]
+
+
+def _event_id(payload: bytes) -> str:
+    return payload.split(b"\n", 1)[0].decode().removeprefix("id: ")
+
+
+@pytest.mark.asyncio
+async def test_resume_from_last_event_id(sse_manager):
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+    resume_from = _event_id(sse_manager._recommendation_payload)
+    sse_manager._fan_out("notification", _n("n2"))
+    sse_manager._fan_out("recommendations", _r("r2"))
+    sse_manager._fan_out("recommendations", _r("r3"))
+
+    written, _client = await _connect(sse_manager, resume_from)
+
+    # 只补发断线期间的通知与最新推荐，不重发 n1
+    assert [_body(p) for p in written] == [_payload("notification", _n("n2")), _payload("recommendations", _r("r3"))]
+
+
+@pytest.mark.asyncio
+async def test_resume_after_notification_before_recommendation(sse_manager):
+    client = SSEClientData(response=MagicMock(), queue=asyncio.Queue())
+    await sse_manager.add_client("c1", client)
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+
+    # 客户端只收到第一条事件就断线
+    received = sse_manager._next_payload(client)
+    assert _body(received) == _payload("notification", _n("n1"))
+    sse_manager.clients = {}
+
+    written, _client = await _connect(sse_manager, _event_id(received))
+
+    assert [_body(p) for p in written] == [_payload("recommendations", _r("r1"))]
+
+
+@pytest.mark.asyncio
+async def test_resync_keeps_recommendation_position(sse_manager):
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+    sse_manager._fan_out("notification", _n("n2"))
+
+    written, _client = await _connect(sse_manager, None)
+
+    assert [_body(p) for p in written] == [
+        _payload("notification", _n("n1")),
+        _payload("recommendations", _r("r1")),
+        _payload("notification", _n("n2")),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resume_with_unknown_id_resyncs(sse_manager):
+    sse_manager._fan_out("notification", _n("n1"))
+    sse_manager._fan_out("recommendations", _r("r1"))
+
+    written, _client = await _connect(sse_manager, "stale-1")
+
+    assert [_body(p) for p in written] == [_payload("notification", _n("n1")), _payload("recommendations", _r("r1"))]
+
+
+@pytest.mark.asyncio
+async def test_resume_up_to_date_delta_client(sse_manager):
+    sse_manager._fan_out("recommendations", _rec(0.5))
+    last_id = _event_id(sse_manager._recommendation_payload)
+
+    written, client = await _connect(sse_manager, last_id, delta=True)
+
+    # 没有错过任何事件：不重发推荐，差量基准设为客户端已持有的最新推荐
+    assert written == []
+    assert client.sent_recommendation == _rec(0.5)
+    # handler 退出时已移除客户端，这里重新登记以观察后续差量
+    await sse_manager.add_client("c1", client)
+    sse_manager._fan_out("recommendations", _rec(0.7))
+    assert _decode(sse_manager._next_payload(client)) == (
+        "recommendations_delta",
+        {"items": {"0": {"confidence": 0.7}}},
+    )
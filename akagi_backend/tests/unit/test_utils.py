@@ -6,6 +6,7 @@
 - 3P/4P 模式下的动作掩码 Unicode 列表完整性。
 - 元数据转推荐列表 (meta_to_recommend) 的排序、温度参数及边界情况处理。
 - 优化后的 MJAI 事件序列化 (serialize_mjai_event) 与标准 asdict 序列化的一致性校验。
+- MJAI JSON 反序列化 (parse_mjai_event) 的往返一致性与未知字段/类型处理。
 """
 
 import json
@@ -16,6 +17,7 @@ from akagi_ng.mjai_bot.utils import (
     mask_unicode_3p,
     mask_unicode_4p,
     meta_to_recommend,
+    parse_mjai_event,
     serialize_mjai_event,
 )
 from akagi_ng.schema.types import (
@@ -202,3 +204,25 @@ class TestMJAIEventSerialization(unittest.TestCase):
     def test_serialize_dahai_matches_legacy(self):
         event = DahaiEvent(actor=1, pai="5mr", tsumogiri=False)
         self.assertEqual(serialize_mjai_event(event), self._legacy_serialize(event))
+
+
+class TestMJAIEventParsing(unittest.TestCase):
+    """测试 MJAI 事件反序列化"""
+
+    def test_roundtrip_dahai(self):
+        event = DahaiEvent(actor=1, pai="5mr", tsumogiri=False)
+        self.assertEqual(parse_mjai_event(json.loads(serialize_mjai_event(event))), event)
+
+    def test_ignores_unknown_fields(self):
+        event = parse_mjai_event({"type": "start_game", "id": 2, "is_3p": False, "names": ["a", "b", "c", "d"]})
+        self.assertEqual(event, StartGameEvent(id=2, is_3p=False))
+
+    def test_malformed_event_raises_value_error(self):
+        with self.assertRaisesRegex(ValueError, "dahai event at line 7"):
+            parse_mjai_event({"type": "dahai", "actor": 0}, line=7)
+        with self.assertRaisesRegex(ValueError, "not a JSON object"):
+            parse_mjai_event(["dahai"])
+
+    def test_unknown_type_returns_none(self):
+        self.assertIsNone(parse_mjai_event({"type": "unknown"}))
+        self.assertIsNone(parse_mjai_event({}))
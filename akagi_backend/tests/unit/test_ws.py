@@ -0,0 +1,122 @@
+"""
+测试模块：akagi_backend/tests/unit/test_ws.py
+
+描述：针对 WebSocket 推送端点 (dataserver.ws) 的单元测试。
+主要测试点：
+- msgpack 二进制帧与 JSON 文本帧的选择，以及非法参数的拒绝。
+- permessage-deflate 仅在客户端请求时启用。
+- 新连接回放最新推荐与历史通知。
+- 推荐按客户端只保留最新一条，每种格式只编码一次。
+"""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import msgpack
+import pytest
+from aiohttp import WSMsgType, web
+from aiohttp.test_utils import TestClient, TestServer
+
+from akagi_ng.dataserver.ws import WSManager, _encode_ws_message
+from akagi_ng.schema.types import WSClientData
+
+
+@pytest.fixture
+async def ws_env():
+    manager = WSManager()
+    manager.set_loop(asyncio.get_running_loop())
+    manager.start()
+    app = web.Application()
+    app.router.add_get("/ws", manager.ws_handler)
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    yield manager, client
+    await client.close()
+    manager.stop()
+
+
+async def _wait_for_client(manager: WSManager, client_id: str):
+    for _ in range(100):
+        if client_id in manager.clients:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{client_id} did not register")
+
+
+async def test_msgpack_stream(ws_env):
+    manager, client = ws_env
+    async with client.ws_connect("/ws?clientId=c1") as ws:
+        await _wait_for_client(manager, "c1")
+        manager.broadcast_event("recommendations", {"recommendations": [{"action": "1m"}]})
+
+        msg = await ws.receive(timeout=2)
+        assert msg.type == WSMsgType.BINARY
+        assert msgpack.unpackb(msg.data) == {
+            "event": "recommendations",
+            "data": {"recommendations": [{"action": "1m"}]},
+        }
+
+
+async def test_json_stream_with_replay(ws_env):
+    manager, client = ws_env
+    manager.broadcast_event("notification", {"list": [{"code": "a"}]})
+    manager.broadcast_event("recommendations", {"recommendations": [{"action": "old"}]})
+    manager.broadcast_event("recommendations", {"recommendations": [{"action": "new"}]})
+    await asyncio.sleep(0)
+
+    async with client.ws_connect("/ws?clientId=c1&format=json") as ws:
+        first = await ws.receive(timeout=2)
+        second = await ws.receive(timeout=2)
+
+    assert first.type == WSMsgType.TEXT
+    # 最新推荐优先发送，旧推荐被覆盖
+    assert json.loads(first.data)["data"] == {"recommendations": [{"action": "new"}]}
+    assert json.loads(second.data) == {"event": "notification", "data": {"list": [{"code": "a"}]}}
+
+
+async def test_compression_is_opt_in(ws_env):
+    _manager, client = ws_env
+    async with client.ws_connect("/ws?clientId=c1", compress=15) as ws:
+        assert not ws.compress
+    async with client.ws_connect("/ws?clientId=c2&compress=1", compress=15) as ws:
+        assert ws.compress
+
+
+@pytest.mark.parametrize("query", ["", "?clientId=c1&format=xml"])
+async def test_rejects_bad_request(ws_env, query):
+    _manager, client = ws_env
+    resp = await client.get(f"/ws{query}")
+    assert resp.status == 400
+
+
+async def test_disconnect_removes_client(ws_env):
+    manager, client = ws_env
+    async with client.ws_connect("/ws?clientId=c1"):
+        await _wait_for_client(manager, "c1")
+    for _ in range(100):
+        if "c1" not in manager.clients:
+            break
+        await asyncio.sleep(0.01)
+    assert "c1" not in manager.clients
+
+
+async def test_fan_out_encodes_once_per_format():
+    manager = WSManager()
+    clients = {
+        f"c{i}": WSClientData(response=MagicMock(), binary=i < 2, queue=asyncio.Queue(maxsize=1)) for i in range(3)
+    }
+    manager.clients = clients
+
+    with patch("akagi_ng.dataserver.ws._encode_ws_message", wraps=_encode_ws_message) as encode:
+        manager._fan_out("recommendations", {"r": 1})
+        manager._fan_out("recommendations", {"r": 2})
+        manager._fan_out("notification", {"n": 1})
+        manager._fan_out("notification", {"n": 2})
+
+    assert encode.call_count == 8
+    assert msgpack.unpackb(manager._next_payload(clients["c0"]))["data"] == {"r": 2}
+    # 通知队列满时丢弃最旧的一条
+    assert json.loads(manager._next_payload(clients["c2"]))["data"] == {"r": 2}
+    assert json.loads(manager._next_payload(clients["c2"]))["data"] == {"n": 2}
+    assert manager._next_payload(clients["c2"]) is None
@@ -41,7 +41,7 @@ export function ConnectionProvider({ children }: { children: ReactNode }) {
 
   const value = useMemo(() => {
     const apiBase = `${protocol}://${backendAddress}`;
-    const backendUrl = `${protocol}://${backendAddress}/sse?clientId=${clientId}`;
+    const backendUrl = `${protocol}://${backendAddress}/sse?clientId=${clientId}&delta=1`;
     return {
       protocol,
       backendAddress,
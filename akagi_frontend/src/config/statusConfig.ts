@@ -168,6 +168,20 @@ export const STATUS_UI_MAP = {
     lifecycle: STATUS_LIFECYCLE.EPHEMERAL,
     autoHide: TOAST_DURATION_SHORT,
   },
+  model_swapping: {
+    level: STATUS_LEVEL.INFO,
+    placement: STATUS_PLACEMENT.TOAST,
+    domain: STATUS_DOMAIN.MODEL,
+    lifecycle: STATUS_LIFECYCLE.EPHEMERAL,
+    autoHide: TOAST_DURATION_SHORT,
+  },
+  model_swapped: {
+    level: STATUS_LEVEL.SUCCESS,
+    placement: STATUS_PLACEMENT.TOAST,
+    domain: STATUS_DOMAIN.MODEL,
+    lifecycle: STATUS_LIFECYCLE.EPHEMERAL,
+    autoHide: TOAST_DURATION_SHORT,
+  },
   majsoul_proto_updated: {
     level: STATUS_LEVEL.SUCCESS,
     placement: STATUS_PLACEMENT.TOAST,
@@ -1,7 +1,13 @@
 import { useEffect, useMemo, useState } from 'react';
 
 import { SSE_INITIAL_BACKOFF_MS, SSE_MAX_BACKOFF_MS, SSE_MAX_RETRIES } from '@/config/constants';
-import type { FullRecommendationData, NotificationItem, SSEErrorCode } from '@/types';
+import type {
+  FullRecommendationData,
+  NotificationItem,
+  Recommendation,
+  RecommendationDelta,
+  SSEErrorCode,
+} from '@/types';
 
 interface UseSSEConnectionResult {
   data: FullRecommendationData | null;
@@ -10,6 +16,30 @@ interface UseSSEConnectionResult {
   error: SSEErrorCode | string | null;
 }
 
+/**
+ * 将后端 recommendations_delta 差量应用到当前推荐数据。
+ * items 给出变化字段的新值（可以是 null），removed 列出被删除的字段。
+ */
+function applyRecommendationDelta(
+  prev: FullRecommendationData,
+  delta: RecommendationDelta,
+): FullRecommendationData {
+  const next: FullRecommendationData = { ...prev, ...delta.fields };
+  if (delta.items || delta.removed) {
+    next.recommendations = next.recommendations.map((item, index) => {
+      const patch = delta.items?.[String(index)];
+      const removed = delta.removed?.[String(index)];
+      if (!patch && !removed) return item;
+      const merged: Record<string, unknown> = { ...item, ...patch };
+      for (const key of removed ?? []) {
+        delete merged[key];
+      }
+      return merged as unknown as Recommendation;
+    });
+  }
+  return next;
+}
+
 export function useSSEConnection(url: string | null): UseSSEConnectionResult {
   const [data, setData] = useState<FullRecommendationData | null>(null);
   const [notifications, setNotifications] = useState<NotificationItem[]>([]);
@@ -24,8 +54,16 @@ export function useSSEConnection(url: string | null): UseSSEConnectionResult {
     let stopped = false;
     let backoff = SSE_INITIAL_BACKOFF_MS;
     let retryCount = 0;
+    // 最近收到的事件 ID，手动重建连接时带上以便后端只补发错过的事件
+    let lastEventId: string | null = null;
     const maxBackoff = SSE_MAX_BACKOFF_MS;
 
+    const trackEventId = (event: MessageEvent) => {
+      if (event.lastEventId) {
+        lastEventId = event.lastEventId;
+      }
+    };
+
     const scheduleReconnect = () => {
       if (stopped || reconnectTimer) return;
 
@@ -56,7 +94,11 @@ export function useSSEConnection(url: string | null): UseSSEConnectionResult {
 
       let es: EventSource;
       try {
-        es = new EventSource(url);
+        const target = new URL(url);
+        if (lastEventId) {
+          target.searchParams.set('lastEventId', lastEventId);
+        }
+        es = new EventSource(target.toString());
       } catch (e) {
         console.error('Invalid SSE URL:', e);
         setError('config_error');
@@ -81,6 +123,7 @@ export function useSSEConnection(url: string | null): UseSSEConnectionResult {
 
       // 处理推荐数据事件
       es.addEventListener('recommendations', (event) => {
+        trackEventId(event);
         try {
           const parsed = JSON.parse(event.data);
           // 数据格式: { "recommendations": ..., "is_riichi": ... }
@@ -90,8 +133,20 @@ export function useSSEConnection(url: string | null): UseSSEConnectionResult {
         }
       });
 
+      // 处理推荐差量事件（以 delta=1 连接时，首条推荐之后只推送变化部分）
+      es.addEventListener('recommendations_delta', (event) => {
+        trackEventId(event);
+        try {
+          const delta: RecommendationDelta = JSON.parse(event.data);
+          setData((prev) => (prev ? applyRecommendationDelta(prev, delta) : prev));
+        } catch (e) {
+          console.error('Failed to parse recommendations delta', e);
+        }
+      });
+
       // 处理通知事件
       es.addEventListener('notification', (event) => {
+        trackEventId(event);
         try {
           const parsed = JSON.parse(event.data);
           // 预期格式: { "list": [...] }
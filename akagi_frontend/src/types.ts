@@ -20,6 +20,12 @@ export interface FullRecommendationData {
   circuit_open: boolean;
 }
 
+export interface RecommendationDelta {
+  fields?: Partial<FullRecommendationData>;
+  items?: Record<string, Partial<Record<keyof Recommendation, unknown>>>;
+  removed?: Record<string, (keyof Recommendation)[]>;
+}
+
 export interface NotificationItem {
   level?: string;
   code: string;